@@ -83,6 +83,7 @@ async def initialize_systems():
         return None, None
 
     documents = rag_system.load_documents(str(doc_path))
+    documents = rag_system.deduplicate_documents(documents)
     rag_system.build_index(documents)
     console.print("[green][OK] Traditional RAG initialized[/green]\n")
 
@@ -100,13 +101,13 @@ async def initialize_systems():
     await kg_system.graphiti.build_indices_and_constraints()
 
     # Check if we should rebuild the graph
-    stats = kg_system.get_graph_statistics()
+    stats = await kg_system.get_graph_statistics_async()
     if stats['total_nodes'] > 0:
         console.print(f"[yellow]Found existing graph with {stats['total_nodes']} nodes[/yellow]")
         rebuild = Confirm.ask("Do you want to rebuild the knowledge graph?", default=False)
         if rebuild:
             kg_system.clear_graph()
-            stats = kg_system.get_graph_statistics()
+            stats = await kg_system.get_graph_statistics_async()
 
     # Build knowledge graph if needed
     if stats['total_nodes'] == 0:
@@ -115,7 +116,7 @@ async def initialize_systems():
         doc_texts = [doc.page_content for doc in documents]
         await kg_system.add_documents_to_graph(doc_texts, source="api_documentation")
 
-        stats = kg_system.get_graph_statistics()
+        stats = await kg_system.get_graph_statistics_async()
         console.print(f"[green][OK] Knowledge Graph initialized[/green]")
         console.print(f"  - Nodes: {stats['total_nodes']}")
         console.print(f"  - Relationships: {stats['total_relationships']}")
@@ -241,7 +242,7 @@ async def main():
         elif choice == "4":
             await interactive_mode(rag_system, kg_system)
         elif choice == "5":
-            stats = kg_system.get_graph_statistics()
+            stats = await kg_system.get_graph_statistics_async()
             console.print("\n[bold cyan]Knowledge Graph Statistics:[/bold cyan]")
             console.print(f"  - Total Nodes: {stats['total_nodes']}")
             console.print(f"  - Total Relationships: {stats['total_relationships']}")
@@ -249,7 +250,7 @@ async def main():
             console.print(f"  - Episodes: {stats['num_episodes']}")
         elif choice == "6":
             console.print("\n[bold green]Thank you for using the demo![/bold green]")
-            kg_system.close()
+            await kg_system.aclose()
             break
 
 
@@ -2,12 +2,12 @@
 
 import os
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from graphiti_core import Graphiti
 from graphiti_core.nodes import EpisodeType
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from langchain_openai import ChatOpenAI
 
 
@@ -20,7 +20,8 @@ class KnowledgeGraphRAG:
         neo4j_user: str,
         neo4j_password: str,
         openai_api_key: str,
-        model_name: str = "gpt-4-turbo-preview"
+        model_name: str = "gpt-4-turbo-preview",
+        stats_ttl: float = 5.0
     ):
         """
         Initialize Knowledge Graph RAG system.
@@ -31,18 +32,27 @@ class KnowledgeGraphRAG:
             neo4j_password: Neo4j password
             openai_api_key: OpenAI API key
             model_name: LLM model to use
+            stats_ttl: Seconds to cache graph statistics for
         """
         self.neo4j_uri = neo4j_uri
         self.neo4j_user = neo4j_user
         self.neo4j_password = neo4j_password
         self.openai_api_key = openai_api_key
         self.model_name = model_name
+        self.stats_ttl = stats_ttl
 
-        # Initialize Neo4j driver
+        # Initialize Neo4j drivers (async one serves calls made from async code paths)
         self.driver = GraphDatabase.driver(
             neo4j_uri,
             auth=(neo4j_user, neo4j_password)
         )
+        self.async_driver = AsyncGraphDatabase.driver(
+            neo4j_uri,
+            auth=(neo4j_user, neo4j_password)
+        )
+
+        # Cached (timestamp, statistics) from the last statistics query
+        self._stats_cache: Optional[Tuple[float, Dict[str, int]]] = None
 
         # Initialize Graphiti with new API (v0.3.6+)
         from graphiti_core.llm_client import OpenAIClient
@@ -75,6 +85,7 @@ class KnowledgeGraphRAG:
         """Clear all nodes and relationships from the graph."""
         with self.driver.session() as session:
             session.run("MATCH (n) DETACH DELETE n")
+        self.invalidate_statistics()
         print("Graph cleared")
 
     async def add_documents_to_graph(
@@ -105,6 +116,8 @@ class KnowledgeGraphRAG:
             if (i + 1) % 10 == 0:
                 print(f"  Processed {i + 1}/{len(documents)} chunks...")
 
+        self.invalidate_statistics()
+
         build_time = time.time() - start_time
         print(f"Knowledge graph built in {build_time:.2f} seconds")
 
@@ -220,38 +233,91 @@ Answer:"""
             result = session.run(query, entity_name=entity_name)
             return [dict(record) for record in result]
 
-    def get_graph_statistics(self) -> Dict[str, int]:
+    # Each CALL subquery is a single-label / any-type count, which Neo4j answers
+    # from its count store instead of scanning the graph; all four come back
+    # in one round-trip.
+    STATISTICS_QUERY = """
+    CALL { MATCH (n) RETURN count(n) AS total_nodes }
+    CALL { MATCH ()-[r]->() RETURN count(r) AS total_relationships }
+    CALL { MATCH (n:Entity) RETURN count(n) AS num_entities }
+    CALL { MATCH (n:Episode) RETURN count(n) AS num_episodes }
+    RETURN total_nodes, total_relationships, num_entities, num_episodes
+    """
+
+    def invalidate_statistics(self) -> None:
+        """Drop cached graph statistics so the next call re-queries Neo4j."""
+        self._stats_cache = None
+
+    def _cached_statistics(self) -> Optional[Dict[str, int]]:
+        """Return cached statistics if they are younger than stats_ttl."""
+        if self._stats_cache is None:
+            return None
+        cached_at, stats = self._stats_cache
+        if time.monotonic() - cached_at > self.stats_ttl:
+            return None
+        return dict(stats)
+
+    def _store_statistics(self, record) -> Dict[str, int]:
+        """Cache and return statistics from a STATISTICS_QUERY record."""
+        stats = {
+            "total_nodes": record["total_nodes"],
+            "total_relationships": record["total_relationships"],
+            "num_entities": record["num_entities"],
+            "num_episodes": record["num_episodes"]
+        }
+        self._stats_cache = (time.monotonic(), stats)
+        return dict(stats)
+
+    def get_graph_statistics(self, use_cache: bool = True) -> Dict[str, int]:
         """
         Get statistics about the knowledge graph.
 
+        Prefer get_graph_statistics_async from async code; this blocks on the
+        sync driver.
+
+        Args:
+            use_cache: Whether to serve results cached within stats_ttl
+
         Returns:
             Dictionary with graph statistics
         """
+        if use_cache:
+            cached = self._cached_statistics()
+            if cached is not None:
+                return cached
+
         with self.driver.session() as session:
-            # Count nodes
-            node_result = session.run("MATCH (n) RETURN count(n) as count")
-            num_nodes = node_result.single()["count"]
+            record = session.run(self.STATISTICS_QUERY).single()
 
-            # Count relationships
-            rel_result = session.run("MATCH ()-[r]->() RETURN count(r) as count")
-            num_relationships = rel_result.single()["count"]
+        return self._store_statistics(record)
 
-            # Count entities
-            entity_result = session.run("MATCH (n:Entity) RETURN count(n) as count")
-            num_entities = entity_result.single()["count"]
+    async def get_graph_statistics_async(self, use_cache: bool = True) -> Dict[str, int]:
+        """
+        Get statistics about the knowledge graph without blocking the event loop.
 
-            # Count episodes
-            episode_result = session.run("MATCH (n:Episode) RETURN count(n) as count")
-            num_episodes = episode_result.single()["count"]
+        Args:
+            use_cache: Whether to serve results cached within stats_ttl
 
-        return {
-            "total_nodes": num_nodes,
-            "total_relationships": num_relationships,
-            "num_entities": num_entities,
-            "num_episodes": num_episodes
-        }
+        Returns:
+            Dictionary with graph statistics
+        """
+        if use_cache:
+            cached = self._cached_statistics()
+            if cached is not None:
+                return cached
+
+        async with self.async_driver.session() as session:
+            result = await session.run(self.STATISTICS_QUERY)
+            record = await result.single()
+
+        return self._store_statistics(record)
 
     def close(self) -> None:
-        """Close the Neo4j driver connection."""
+        """Close the sync Neo4j driver connection (use aclose from async code)."""
         self.driver.close()
         print("Neo4j connection closed")
+
+    async def aclose(self) -> None:
+        """Close both Neo4j driver connections."""
+        await self.async_driver.close()
+        self.close()
@@ -2,5 +2,7 @@
 
 from .rag_pipeline import TraditionalRAG
 from .query import query_rag
+from .dedup import MinHashDeduplicator
+from .lexical import BM25Index
 
-__all__ = ['TraditionalRAG', 'query_rag']
+__all__ = ['TraditionalRAG', 'query_rag', 'MinHashDeduplicator', 'BM25Index']
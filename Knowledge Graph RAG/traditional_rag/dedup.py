@@ -0,0 +1,195 @@
+"""Near-duplicate chunk elimination using MinHash and LSH banding."""
+
+import re
+import random
+import hashlib
+import struct
+import time
+from typing import List, Dict, Any, Tuple, Set
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN_RE = re.compile(r"\w+")
+# Probability that a pair exactly at the threshold shares at least one LSH band
+_TARGET_RECALL = 0.99
+
+
+def _hash_shingle(shingle: str) -> int:
+    """Stable 64-bit hash of a shingle (independent of PYTHONHASHSEED)."""
+    return struct.unpack("<Q", hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest())[0]
+
+
+def _lsh_params(threshold: float, num_perm: int, recall: float = _TARGET_RECALL) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) biased towards recall at the threshold.
+
+    A pair with Jaccard similarity s becomes a candidate with probability
+    1 - (1 - s^rows)^bands. Candidates are verified with exact Jaccard, so
+    extra candidates only cost time while missed ones are lost duplicates:
+    choose the most selective banding (most rows) that still catches a pair
+    at exactly the threshold with probability >= recall. The S-curve then
+    crosses well below the threshold (about 0.6 for a threshold of 0.8).
+
+    Args:
+        threshold: Target Jaccard similarity
+        num_perm: Number of MinHash permutations
+        recall: Minimum candidate probability for a pair at the threshold
+
+    Returns:
+        Tuple of (bands, rows_per_band)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1.0 - (1.0 - threshold ** rows) ** bands >= recall:
+            best = (bands, rows)
+    return best
+
+
+class MinHashDeduplicator:
+    """Detect and merge near-duplicate text chunks before they are embedded."""
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            threshold: Jaccard similarity at or above which chunks are merged
+            num_perm: Number of MinHash permutations
+            shingle_size: Number of words per shingle
+            seed: Seed for the permutation coefficients
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _lsh_params(threshold, num_perm)
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def shingles(self, text: str) -> Set[str]:
+        """
+        Build the set of word shingles for a text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Set of shingle strings
+        """
+        tokens = _TOKEN_RE.findall(text.lower())
+        if len(tokens) < self.shingle_size:
+            return {" ".join(tokens)} if tokens else set()
+        return {
+            " ".join(tokens[i:i + self.shingle_size])
+            for i in range(len(tokens) - self.shingle_size + 1)
+        }
+
+    def signature(self, shingles: Set[str]) -> List[int]:
+        """
+        Compute the MinHash signature of a shingle set.
+
+        Args:
+            shingles: Set of shingles
+
+        Returns:
+            List of num_perm minimum hash values
+        """
+        hashes = [_hash_shingle(s) for s in shingles]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        ]
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """Split a signature into hashable LSH band keys."""
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def deduplicate(self, documents: List[Any]) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        Drop near-duplicate documents, keeping the first occurrence.
+
+        Each kept document gets ``merged_chunk_ids`` and ``merged_sources`` in its
+        metadata listing the chunks folded into it (including itself).
+
+        Args:
+            documents: LangChain Documents (anything with page_content and metadata)
+
+        Returns:
+            Tuple of (kept documents, dedup statistics)
+        """
+        start_time = time.time()
+
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        kept: List[Any] = []
+        kept_shingles: List[Set[str]] = []
+        candidates_checked = 0
+
+        for doc in documents:
+            doc_shingles = self.shingles(doc.page_content)
+            keys = self._band_keys(self.signature(doc_shingles))
+
+            # Collect previously kept chunks that share at least one band
+            candidates = set()
+            for key in keys:
+                candidates.update(buckets.get(key, ()))
+
+            match = None
+            for idx in sorted(candidates):
+                candidates_checked += 1
+                other = kept_shingles[idx]
+                union = len(doc_shingles | other)
+                jaccard = len(doc_shingles & other) / union if union else 1.0
+                if jaccard >= self.threshold:
+                    match = idx
+                    break
+
+            if match is not None:
+                representative = kept[match]
+                representative.metadata["merged_chunk_ids"].append(doc.metadata.get("chunk_id"))
+                source = doc.metadata.get("source")
+                if source not in representative.metadata["merged_sources"]:
+                    representative.metadata["merged_sources"].append(source)
+                continue
+
+            doc.metadata["merged_chunk_ids"] = [doc.metadata.get("chunk_id")]
+            doc.metadata["merged_sources"] = [doc.metadata.get("source")]
+            kept.append(doc)
+            kept_shingles.append(doc_shingles)
+            for key in keys:
+                buckets.setdefault(key, []).append(len(kept) - 1)
+
+        chars_before = sum(len(doc.page_content) for doc in documents)
+        chars_after = sum(len(doc.page_content) for doc in kept)
+        stats = {
+            "input_chunks": len(documents),
+            "output_chunks": len(kept),
+            "removed_chunks": len(documents) - len(kept),
+            "chars_before": chars_before,
+            "chars_after": chars_after,
+            "reduction_ratio": 1 - (chars_after / chars_before) if chars_before else 0.0,
+            "candidates_checked": candidates_checked,
+            "threshold": self.threshold,
+            "lsh_bands": self.bands,
+            "lsh_rows": self.rows,
+            "dedup_time": time.time() - start_time
+        }
+        return kept, stats
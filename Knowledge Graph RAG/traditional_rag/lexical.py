@@ -0,0 +1,152 @@
+"""In-process BM25 inverted index and reciprocal rank fusion helpers."""
+
+import re
+import math
+import heapq
+from collections import Counter
+from typing import List, Dict, Tuple, Any, Iterable
+
+
+# Raw tokens keep path separators, dots and underscores so identifiers stay whole
+_RAW_TOKEN_RE = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_./:-]*[A-Za-z0-9_]|[A-Za-z0-9_]|/[A-Za-z0-9_](?:[A-Za-z0-9_./:-]*[A-Za-z0-9_])?")
+_PART_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+# Identifier shapes: URL paths, CamelCase names, snake_case / dotted names
+_IDENTIFIER_RE = re.compile(
+    r"^(/[\w.{}:-]+)+/?$"
+    r"|^[A-Z][a-z0-9]+(?:[A-Z][a-z0-9]*)+$"
+    r"|^[A-Za-z][A-Za-z0-9]*(?:[_.][A-Za-z0-9]+)+$"
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenize text for lexical search.
+
+    Every raw token is emitted whole (lowercased) so exact identifiers such as
+    ``/api/v1/files/multipart/initiate`` or ``QuotaManager`` match precisely,
+    followed by its path/snake_case/CamelCase sub-parts for partial matches.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens
+    """
+    tokens = []
+    for raw in _RAW_TOKEN_RE.findall(text):
+        whole = raw.lower()
+        tokens.append(whole)
+        parts = []
+        for part in _PART_RE.findall(raw):
+            parts.extend(p.lower() for p in _CAMEL_RE.findall(part))
+        if len(parts) > 1 or (parts and parts[0] != whole):
+            tokens.extend(parts)
+    return tokens
+
+
+def is_identifier_query(query: str, max_terms: int = 3) -> bool:
+    """
+    Check whether a query looks like an identifier lookup.
+
+    Args:
+        query: Search query
+        max_terms: Maximum number of whitespace-separated terms
+
+    Returns:
+        True if the query is short and contains an identifier-shaped term
+    """
+    terms = [t.strip("`'\"?!,;()") for t in query.split()]
+    terms = [t for t in terms if t]
+    if not terms or len(terms) > max_terms:
+        return False
+    return any(_IDENTIFIER_RE.match(t) for t in terms)
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index held in process memory."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty BM25 index.
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+        self.avg_doc_length = 0.0
+
+    def build(self, texts: Iterable[str]) -> None:
+        """
+        Build the index from document texts; positions are the document IDs.
+
+        Args:
+            texts: Document texts in index order
+        """
+        self.postings = {}
+        self.doc_lengths = []
+
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.doc_lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+
+        num_docs = len(self.doc_lengths)
+        self.avg_doc_length = sum(self.doc_lengths) / num_docs if num_docs else 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.doc_lengths) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[int, float]]:
+        """
+        Score documents against a query.
+
+        Args:
+            query: Search query
+            k: Number of results
+
+        Returns:
+            List of (document ID, score) pairs, best first
+        """
+        if not self.doc_lengths:
+            return []
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_id, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(rankings: List[List[Any]], k: int = 60) -> List[Tuple[Any, float]]:
+    """
+    Fuse several ranked lists with reciprocal rank fusion.
+
+    Args:
+        rankings: Ranked lists of hashable keys, best first
+        k: RRF damping constant
+
+    Returns:
+        List of (key, fused score) pairs, best first
+    """
+    fused: Dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
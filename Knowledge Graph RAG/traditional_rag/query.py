@@ -26,6 +26,11 @@ def query_rag(rag_system: TraditionalRAG, question: str, verbose: bool = True) -
         print(f"\nAnswer:\n{result['answer']}")
         print(f"\nMetrics:")
         print(f"  - Query Time: {result['metrics']['query_time']:.2f}s")
+        print(f"  - Retrieval Path: {result['metrics']['retrieval_method']}")
+        if 'retrieval_time' in result['metrics']:
+            print(f"  - Retrieval Time: {result['metrics']['retrieval_time']:.3f}s "
+                  f"(lexical {result['metrics']['lexical_time']:.3f}s, vector {result['metrics']['vector_time']:.3f}s)")
+            print(f"  - Generation Time: {result['metrics']['generation_time']:.2f}s")
         print(f"  - Source Chunks: {result['metrics']['num_source_chunks']}")
         print(f"  - Answer Tokens: {result['metrics']['answer_tokens']}")
         print("\nSource Chunks:")
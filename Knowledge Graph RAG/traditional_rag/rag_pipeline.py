@@ -2,7 +2,7 @@
 
 import os
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from pathlib import Path
 
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
@@ -12,6 +12,9 @@ from langchain.chains import RetrievalQA
 from langchain.docstore.document import Document
 from langchain.prompts import PromptTemplate
 
+from .dedup import MinHashDeduplicator
+from .lexical import BM25Index, is_identifier_query, reciprocal_rank_fusion
+
 
 class TraditionalRAG:
     """Traditional RAG system using vector similarity search."""
@@ -22,7 +25,10 @@ class TraditionalRAG:
         model_name: str = "gpt-4-turbo-preview",
         embedding_model: str = "text-embedding-3-small",
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        dedup_threshold: float = 0.8,
+        retrieval_mode: str = "hybrid",
+        top_k: int = 4
     ):
         """
         Initialize Traditional RAG system.
@@ -33,12 +39,21 @@ class TraditionalRAG:
             embedding_model: Embedding model to use
             chunk_size: Size of text chunks
             chunk_overlap: Overlap between chunks
+            dedup_threshold: Jaccard similarity at which chunks count as near-duplicates
+            retrieval_mode: "hybrid" (BM25 + vector fused with RRF) or "vector"
+            top_k: Number of chunks to retrieve
         """
+        if retrieval_mode not in ("hybrid", "vector"):
+            raise ValueError("retrieval_mode must be 'hybrid' or 'vector'")
+
         self.openai_api_key = openai_api_key
         self.model_name = model_name
         self.embedding_model = embedding_model
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.dedup_threshold = dedup_threshold
+        self.retrieval_mode = retrieval_mode
+        self.top_k = top_k
 
         # Initialize components
         self.embeddings = OpenAIEmbeddings(
@@ -58,8 +73,16 @@ class TraditionalRAG:
             separators=["\n\n", "\n", " ", ""]
         )
 
+        self.deduplicator = MinHashDeduplicator(threshold=dedup_threshold)
+        self.dedup_stats: Dict[str, Any] = {}
+
         self.vectorstore = None
         self.qa_chain = None
+        self.prompt = None
+
+        # Lexical index over the same chunks as the FAISS index (same order)
+        self.bm25 = BM25Index()
+        self.documents: List[Document] = []
 
     def load_documents(self, file_path: str) -> List[Document]:
         """
@@ -86,6 +109,29 @@ class TraditionalRAG:
         print(f"Loaded {len(documents)} chunks from {file_path}")
         return documents
 
+    def deduplicate_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Remove near-duplicate chunks before they are embedded.
+
+        Kept chunks record the chunk IDs and sources they absorbed in the
+        ``merged_chunk_ids`` and ``merged_sources`` metadata fields.
+
+        Args:
+            documents: List of LangChain Documents
+
+        Returns:
+            Deduplicated list of LangChain Documents
+        """
+        unique_docs, self.dedup_stats = self.deduplicator.deduplicate(documents)
+
+        stats = self.dedup_stats
+        print(
+            f"Deduplicated {stats['input_chunks']} -> {stats['output_chunks']} chunks "
+            f"(removed {stats['removed_chunks']}, {stats['reduction_ratio']:.1%} fewer characters to embed) "
+            f"in {stats['dedup_time']:.2f} seconds"
+        )
+        return unique_docs
+
     def build_index(self, documents: List[Document]) -> None:
         """
         Build FAISS vector index from documents.
@@ -104,9 +150,18 @@ class TraditionalRAG:
         build_time = time.time() - start_time
         print(f"FAISS index built in {build_time:.2f} seconds")
 
+        self._build_lexical_index(documents)
+
         # Create QA chain
         self._create_qa_chain()
 
+    def _build_lexical_index(self, documents: List[Document]) -> None:
+        """Build the BM25 inverted index alongside the FAISS index."""
+        start_time = time.time()
+        self.documents = list(documents)
+        self.bm25.build(doc.page_content for doc in self.documents)
+        print(f"BM25 index built over {len(self.documents)} chunks in {time.time() - start_time:.2f} seconds")
+
     def _create_qa_chain(self) -> None:
         """Create the QA chain with custom prompt."""
         prompt_template = """You are a helpful AI assistant answering questions about the CloudStore API documentation.
@@ -120,7 +175,7 @@ Question: {question}
 
 Answer: """
 
-        PROMPT = PromptTemplate(
+        self.prompt = PromptTemplate(
             template=prompt_template,
             input_variables=["context", "question"]
         )
@@ -128,11 +183,64 @@ Answer: """
         self.qa_chain = RetrievalQA.from_chain_type(
             llm=self.llm,
             chain_type="stuff",
-            retriever=self.vectorstore.as_retriever(search_kwargs={"k": 4}),
+            retriever=self.vectorstore.as_retriever(search_kwargs={"k": self.top_k}),
             return_source_documents=True,
-            chain_type_kwargs={"prompt": PROMPT}
+            chain_type_kwargs={"prompt": self.prompt}
         )
 
+    @staticmethod
+    def _doc_key(doc: Document) -> tuple:
+        """Key that identifies a chunk across the FAISS and BM25 indexes."""
+        return (doc.metadata.get("source"), doc.metadata.get("chunk_id"))
+
+    def hybrid_search(self, query: str, k: int = 4) -> Tuple[List[Document], Dict[str, Any]]:
+        """
+        Retrieve chunks with BM25 and vector search fused by reciprocal rank fusion.
+
+        Identifier-looking queries (URL paths, CamelCase or snake_case names)
+        take a lexical-only fast path that skips the embedding request. If
+        BM25 finds nothing for such a query, the hybrid path is used instead.
+
+        Args:
+            query: Search query
+            k: Number of results
+
+        Returns:
+            Tuple of (documents, retrieval metrics)
+        """
+        if not self.vectorstore:
+            raise ValueError("Index not built. Call build_index() first.")
+
+        fetch_k = k * 3
+        metrics: Dict[str, Any] = {"lexical_time": 0.0, "vector_time": 0.0}
+
+        start_time = time.time()
+        lexical_hits = self.bm25.search(query, k=fetch_k)
+        metrics["lexical_time"] = time.time() - start_time
+        lexical_docs = [self.documents[doc_id] for doc_id, _ in lexical_hits]
+
+        if lexical_docs and is_identifier_query(query):
+            metrics["retrieval_path"] = "lexical_fast_path"
+            metrics["retrieval_time"] = metrics["lexical_time"]
+            return lexical_docs[:k], metrics
+
+        start_time = time.time()
+        vector_docs = self.vectorstore.similarity_search(query, k=fetch_k)
+        metrics["vector_time"] = time.time() - start_time
+
+        by_key = {self._doc_key(doc): doc for doc in vector_docs}
+        for doc in lexical_docs:
+            by_key.setdefault(self._doc_key(doc), doc)
+
+        fused = reciprocal_rank_fusion([
+            [self._doc_key(doc) for doc in lexical_docs],
+            [self._doc_key(doc) for doc in vector_docs]
+        ])
+
+        metrics["retrieval_path"] = "hybrid_rrf"
+        metrics["retrieval_time"] = metrics["lexical_time"] + metrics["vector_time"]
+        return [by_key[key] for key, _ in fused[:k]], metrics
+
     def query(self, question: str) -> Dict[str, Any]:
         """
         Query the RAG system.
@@ -149,14 +257,26 @@ Answer: """
         print(f"\nQuerying Traditional RAG: {question}")
         start_time = time.time()
 
-        # Execute query
-        result = self.qa_chain.invoke({"query": question})
+        if self.retrieval_mode == "vector":
+            # Execute query
+            result = self.qa_chain.invoke({"query": question})
+
+            query_time = time.time() - start_time
+
+            # Extract results
+            answer = result['result']
+            source_docs = result['source_documents']
+            retrieval_metrics = {"retrieval_path": "vector_similarity"}
+        else:
+            source_docs, retrieval_metrics = self.hybrid_search(question, k=self.top_k)
 
-        query_time = time.time() - start_time
+            generation_start = time.time()
+            context = "\n\n".join(doc.page_content for doc in source_docs)
+            response = self.llm.invoke(self.prompt.format(context=context, question=question))
+            answer = response.content
+            retrieval_metrics["generation_time"] = time.time() - generation_start
 
-        # Extract results
-        answer = result['result']
-        source_docs = result['source_documents']
+            query_time = time.time() - start_time
 
         # Calculate metrics
         num_tokens = len(answer.split())  # Rough estimate
@@ -169,7 +289,8 @@ Answer: """
                 "query_time": query_time,
                 "num_source_chunks": num_chunks,
                 "answer_tokens": num_tokens,
-                "retrieval_method": "vector_similarity"
+                "retrieval_method": retrieval_metrics.pop("retrieval_path"),
+                **retrieval_metrics
             }
         }
 
@@ -202,5 +323,10 @@ Answer: """
             embeddings=self.embeddings,
             allow_dangerous_deserialization=True
         )
+        # Rebuild the lexical index from the chunks stored with the FAISS index
+        docstore = self.vectorstore.docstore
+        self._build_lexical_index([
+            docstore.search(doc_id) for doc_id in self.vectorstore.index_to_docstore_id.values()
+        ])
         self._create_qa_chain()
         print(f"Index loaded from {path}")
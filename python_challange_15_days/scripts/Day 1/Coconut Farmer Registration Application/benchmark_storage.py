@@ -0,0 +1,105 @@
+"""
+Benchmark the farmer storage engine.
+
+Measures write cost of the append-only log against rewriting the whole JSON
+file per change (the previous storage), and recovery time from a log only,
+a snapshot only, and a snapshot plus a log tail.
+
+    python benchmark_storage.py --farmers 100000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+from farmer_storage import LogStore
+
+
+def farmer_record(farmer_id: int, rng: random.Random) -> dict:
+    now = datetime.now().isoformat()
+    return {
+        "name": f"Farmer {farmer_id:07d}",
+        "age": rng.randint(18, 80),
+        "experience_level": "experienced and skilled",
+        "coconut_type": "premium coconuts",
+        "id": farmer_id,
+        "registration_date": now,
+        "last_updated": now
+    }
+
+
+def fill(store: LogStore, count: int, rng: random.Random, start_id: int = 1):
+    """Register farmers and wait until they are durable"""
+    for farmer_id in range(start_id, start_id + count):
+        entry = store.commit({"op": "add", "id": farmer_id, "farmer": farmer_record(farmer_id, rng)})
+    store.wait_durable(entry["seq"])
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def run(farmers: int, tail: int, legacy_writes: int, seed: int):
+    rng = random.Random(seed)
+    workdir = tempfile.mkdtemp(prefix="farmer_bench_")
+    path = os.path.join(workdir, "farmers_data.json")
+    try:
+        # Log writes: nothing is compacted while measuring
+        store = LogStore(path, compact_after=farmers + tail + 1, compact_interval=3600)
+        seconds, _ = timed(lambda: fill(store, farmers, rng))
+        print(f"log writes:            {farmers / seconds:12,.0f} changes/s ({seconds * 1e6 / farmers:.1f} µs each)")
+        store.close(compact=False)
+
+        seconds, store = timed(lambda: LogStore(path, compact_interval=3600))
+        print(f"recover from log only: {seconds:12.3f} s ({farmers:,} changes replayed)")
+        # A store that has only recovered never compacts, so write one change first
+        store.commit({"op": "update", "id": 1, "fields": {"age": 30}})
+        seconds, _ = timed(store.compact)
+        print(f"compact to snapshot:   {seconds:12.3f} s")
+        store.close(compact=False)
+
+        seconds, store = timed(lambda: LogStore(path, compact_interval=3600))
+        print(f"recover from snapshot: {seconds:12.3f} s ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+        fill(store, tail, rng, start_id=farmers + 1)
+        store.close(compact=False)
+        seconds, store = timed(lambda: LogStore(path, compact_interval=3600))
+        print(f"snapshot + {tail:,}-change log: {seconds:8.3f} s")
+        store.close(compact=False)
+
+        # Previous storage: the whole registry rewritten with indent=2 per change
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        legacy_path = os.path.join(workdir, "legacy.json")
+
+        def legacy():
+            for farmer_id in range(1, legacy_writes + 1):
+                data["farmers"][str(farmer_id)]["age"] = rng.randint(18, 80)
+                data["last_updated"] = datetime.now().isoformat()
+                with open(legacy_path, 'w') as f:
+                    json.dump(data, f, indent=2)
+
+        seconds, _ = timed(legacy)
+        print(f"full-file rewrites:    {legacy_writes / seconds:12,.1f} changes/s ({seconds * 1e3 / legacy_writes:.1f} ms each)")
+    finally:
+        shutil.rmtree(workdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the farmer log storage")
+    parser.add_argument("--farmers", type=int, default=100000, help="Farmers registered before measuring recovery")
+    parser.add_argument("--tail", type=int, default=10000, help="Changes logged after the snapshot")
+    parser.add_argument("--legacy-writes", type=int, default=20, help="Full-file rewrites to time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.farmers, args.tail, args.legacy_writes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
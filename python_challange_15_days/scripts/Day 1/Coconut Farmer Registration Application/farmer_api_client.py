@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_API_URL = "http://localhost:5000"
+
+# How long each kind of read is served from the cache (seconds)
+HEALTH_TTL = 5.0
+STATS_TTL = 5.0
+FARMER_TTL = 10.0
+# After this the farmer list is revalidated with its ETag, usually a bodyless 304
+FARMERS_TTL = 2.0
+PAGE_SIZE = 1000
+# Every field the farmer selector and the "View Database" page render
+FARMER_LIST_FIELDS = ("id", "name", "age", "experience_level", "coconut_type", "registration_date", "last_updated")
+
+ApiResponse = namedtuple("ApiResponse", ["status_code", "data"])
+
+
+class _Call:
+    """One in-flight request that identical concurrent requests wait for"""
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class FarmerAPIClient:
+    """
+    Client for the Coconut Farmer API, shared by every Streamlit session and rerun.
+
+    - One keep-alive requests.Session, so reruns reuse pooled connections.
+    - Reads are cached for a few seconds; the farmer list is revalidated
+      with If-None-Match instead of downloaded again.
+    - Identical reads issued while one is in flight wait for its result
+      instead of sending their own request.
+    - Writes made through the client clear the cache, so the next read
+      sees them. A read that was in flight during a write is not cached.
+
+    Network errors are raised as requests exceptions, as with requests itself.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 5, pool_size: int = 10):
+        self.base_url = (base_url or os.getenv("FARMER_API_URL", DEFAULT_API_URL)).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        # key -> (expiry on the monotonic clock, ApiResponse or farmer list)
+        self._cache: Dict[tuple, tuple] = {}
+        self._inflight: Dict[tuple, _Call] = {}
+        # Bumped by every write; results fetched across a write are not cached
+        self._generation = 0
+        # (ETag, farmers) of the last full farmer list
+        self._farmers: tuple = (None, None)
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def _fetch(self, key: tuple, ttl: float, load: Callable):
+        """Cached, coalesced call of load() for key"""
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call(self._generation)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = load()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+                if call.error is None and call.generation == self._generation:
+                    self._cache[key] = (time.monotonic() + ttl, call.result)
+            call.done.set()
+        return call.result
+
+    def _get(self, path: str, ttl: float) -> ApiResponse:
+        def load():
+            response = self.session.get(self._url(path), timeout=self.timeout)
+            return ApiResponse(response.status_code, response.json())
+        return self._fetch(("GET", path), ttl, load)
+
+    def invalidate(self):
+        """Forget every cached read (the farmer list is kept for ETag revalidation)"""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            # Later reads must not join requests sent before the write
+            self._inflight.clear()
+
+    def health(self) -> ApiResponse:
+        return self._get("/api/health", HEALTH_TTL)
+
+    def stats(self) -> ApiResponse:
+        return self._get("/api/stats", STATS_TTL)
+
+    def farmer(self, farmer_id: int) -> ApiResponse:
+        return self._get(f"/api/farmer/{farmer_id}", FARMER_TTL)
+
+    def farmers(self) -> Optional[List[Dict]]:
+        """Every farmer, or None if the API answered with an error"""
+        return self._fetch(("GET", "/api/farmers"), FARMERS_TTL, self._load_farmers)
+
+    def _load_farmers(self) -> Optional[List[Dict]]:
+        etag, farmers = self._farmers
+        params = {"limit": PAGE_SIZE, "fields": ",".join(FARMER_LIST_FIELDS)}
+        headers = {"If-None-Match": etag} if etag and farmers is not None else {}
+        response = self.session.get(self._url("/api/farmers"), params=params, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return farmers
+
+        etag = response.headers.get("ETag")
+        farmers = []
+        while response.status_code == 200:
+            data = response.json()
+            farmers.extend(data.get("farmers", []))
+            if not data.get("next_cursor"):
+                self._farmers = (etag, farmers)
+                return farmers
+            response = self.session.get(
+                self._url("/api/farmers"),
+                params={**params, "cursor": data["next_cursor"]},
+                timeout=self.timeout
+            )
+        return None
+
+    def _write(self, method: str, path: str, payload: Dict, timeout: float) -> ApiResponse:
+        try:
+            response = self.session.request(method, self._url(path), json=payload, timeout=timeout)
+            return ApiResponse(response.status_code, response.json())
+        finally:
+            # Even a failed or timed-out write may have changed the data
+            self.invalidate()
+
+    def register_farmer(self, name: str, age: int, timeout: float = 10) -> ApiResponse:
+        return self._write("POST", "/api/farmer", {"name": name, "age": age}, timeout)
+
+    def update_farmer(self, farmer_id: int, update_data: Dict, timeout: float = 10) -> ApiResponse:
+        return self._write("PUT", f"/api/farmer/{farmer_id}", update_data, timeout)
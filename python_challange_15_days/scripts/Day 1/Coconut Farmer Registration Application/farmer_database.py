@@ -0,0 +1,268 @@
+import atexit
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+from farmer_storage import LogStore
+from farmer_index import FarmerIndex
+
+logger = logging.getLogger(__name__)
+
+# Fields of a farmer record, in the order they are stored
+FARMER_FIELDS = ("id", "name", "age", "experience_level", "coconut_type", "registration_date", "last_updated")
+
+class DuplicateFarmerError(Exception):
+    """Raised when a name is already registered to another farmer"""
+    
+    def __init__(self, farmer_id: int):
+        super().__init__(f"Farmer with this name already exists (ID: {farmer_id})")
+        self.farmer_id = farmer_id
+
+def build_stats(total_farmers: int, age_sum: int, ages: Dict[int, int], experience_levels: Dict[str, int],
+                last_updated: Optional[str], next_id: int) -> Dict:
+    """The /api/stats payload from aggregate counts (ages maps age -> number of farmers)"""
+    return {
+        "total_farmers": total_farmers,
+        "average_age": round(age_sum / total_farmers, 1) if total_farmers else 0,
+        # Cumulative groups, as the dashboard has always reported them
+        "age_groups": {
+            "young": sum(count for age, count in ages.items() if age <= 25),
+            "prime": sum(count for age, count in ages.items() if age <= 40),
+            "experienced": sum(count for age, count in ages.items() if age <= 60),
+            "veteran": sum(count for age, count in ages.items() if age > 60)
+        },
+        "age_distribution": dict(sorted(ages.items())),
+        "experience_levels": dict(experience_levels),
+        "last_updated": last_updated,
+        "next_available_id": next_id
+    }
+
+class FarmerStorage(ABC):
+    """
+    What the Flask routes need from a farmer database.
+    
+    Implementations must be safe to share between request threads, return
+    records as new dicts, order results by ID and only acknowledge writes
+    once they are durable.
+    """
+    
+    @abstractmethod
+    def add_farmer(self, farmer_data: Dict) -> int:
+        """Store a new farmer, filling in id and timestamps; raises DuplicateFarmerError if the name is taken"""
+    
+    @abstractmethod
+    def add_farmers(self, farmers: List[Dict]) -> List[tuple]:
+        """
+        Store a batch of new farmers in one durable commit, in order
+        Returns (new id, None) per farmer, or (None, existing id) if the name was taken, including by an earlier farmer of the batch
+        """
+    
+    @abstractmethod
+    def update_farmer(self, farmer_id: int, updated_data: Dict) -> bool:
+        """Change existing fields of a farmer; False if unknown, DuplicateFarmerError if a new name is taken"""
+    
+    @abstractmethod
+    def delete_farmer(self, farmer_id: int) -> bool:
+        """Delete a farmer; False if unknown"""
+    
+    @abstractmethod
+    def get_farmer(self, farmer_id: int) -> Optional[Dict]:
+        """Farmer by ID, or None"""
+    
+    @abstractmethod
+    def get_all_farmers(self) -> List[Dict]:
+        """Every farmer"""
+    
+    @abstractmethod
+    def search_farmers(self, name: str = None, min_age: int = None, max_age: int = None) -> List[Dict]:
+        """Farmers whose name contains name (case insensitive) and whose age is in range"""
+    
+    @abstractmethod
+    def list_farmers(self, name: str = None, min_age: int = None, max_age: int = None,
+                     after: int = None, limit: int = None, fields: List[str] = None) -> tuple:
+        """One page of search results: (farmers, total matches, has more, version)"""
+    
+    @abstractmethod
+    def count(self) -> int:
+        """Number of registered farmers"""
+    
+    @abstractmethod
+    def get_stats(self) -> Dict:
+        """Statistics as returned by build_stats()"""
+    
+    @property
+    @abstractmethod
+    def version(self) -> int:
+        """Counter that changes with every write to the collection"""
+    
+    @abstractmethod
+    def close(self):
+        """Release files and connections"""
+
+class FarmerDatabase(FarmerStorage):
+    """
+    File-based database for farmer data: a JSON snapshot plus an append-only change log.
+    
+    Safe to share between request threads: changes (including the duplicate
+    name check and ID assignment) happen under one lock, and writers then
+    wait outside it until the log writer has made their change durable, so
+    concurrent registrations share fsyncs.
+    """
+    
+    def __init__(self, filename: str = "farmers_data.json", **store_options):
+        self.filename = filename
+        self.store = LogStore(filename, **store_options)
+        self.data = self.store.data
+        self.index = FarmerIndex(self.data["farmers"].values())
+        self._lock = threading.RLock()
+        atexit.register(self.close)
+    
+    def close(self):
+        """Write a final snapshot and close the log"""
+        self.store.close()
+    
+    def get_next_id(self) -> int:
+        """Get next available farmer ID"""
+        with self._lock:
+            next_id = self.data["next_id"]
+            self.data["next_id"] += 1
+            return next_id
+    
+    def add_farmer(self, farmer_data: Dict) -> int:
+        """Add new farmer to database; raises DuplicateFarmerError if the name is taken"""
+        with self._lock:
+            existing_id = self.index.find_name(farmer_data["name"])
+            if existing_id is not None:
+                raise DuplicateFarmerError(existing_id)
+            
+            farmer_id = self.get_next_id()
+            farmer_data["id"] = farmer_id
+            farmer_data["registration_date"] = datetime.now().isoformat()
+            farmer_data["last_updated"] = datetime.now().isoformat()
+            
+            entry = self.store.commit({"op": "add", "id": farmer_id, "farmer": farmer_data})
+            self.index.add(farmer_data)
+        self.store.wait_durable(entry["seq"])
+        
+        logger.info(f"Added new farmer: {farmer_data['name']} (ID: {farmer_id})")
+        return farmer_id
+    
+    def add_farmers(self, farmers: List[Dict]) -> List[tuple]:
+        """Add a batch of farmers, checking each name against the index; one wait for the log covers them all"""
+        results = []
+        entry = None
+        with self._lock:
+            now = datetime.now().isoformat()
+            for farmer_data in farmers:
+                existing_id = self.index.find_name(farmer_data["name"])
+                if existing_id is not None:
+                    results.append((None, existing_id))
+                    continue
+                
+                farmer_id = self.get_next_id()
+                farmer_data["id"] = farmer_id
+                farmer_data["registration_date"] = now
+                farmer_data["last_updated"] = now
+                entry = self.store.commit({"op": "add", "id": farmer_id, "farmer": farmer_data})
+                self.index.add(farmer_data)
+                results.append((farmer_id, None))
+        if entry is not None:
+            # The log writer groups the whole batch into as few fsyncs as it can
+            self.store.wait_durable(entry["seq"])
+        
+        logger.info(f"Added {sum(1 for farmer_id, _ in results if farmer_id)} farmers in bulk")
+        return results
+    
+    def update_farmer(self, farmer_id: int, updated_data: Dict) -> bool:
+        """Update existing farmer data; raises DuplicateFarmerError if a new name is taken"""
+        with self._lock:
+            farmer = self.data["farmers"].get(str(farmer_id))
+            if farmer is None:
+                return False
+            
+            if "name" in updated_data:
+                existing_id = self.index.find_name(updated_data["name"])
+                if existing_id is not None and existing_id != farmer_id:
+                    raise DuplicateFarmerError(existing_id)
+            
+            # Update only provided fields
+            fields = {key: value for key, value in updated_data.items() if key in farmer}
+            fields["last_updated"] = datetime.now().isoformat()
+            entry = self.store.commit({"op": "update", "id": farmer_id, "fields": fields})
+            if "name" in fields or "age" in fields:
+                self.index.remove(farmer_id)
+                self.index.add(farmer)
+        self.store.wait_durable(entry["seq"])
+        
+        logger.info(f"Updated farmer ID {farmer_id}")
+        return True
+    
+    def get_farmer(self, farmer_id: int) -> Optional[Dict]:
+        """Get farmer by ID (a copy, safe to use while other threads write)"""
+        with self._lock:
+            farmer = self.data["farmers"].get(str(farmer_id))
+            return dict(farmer) if farmer is not None else None
+    
+    def get_all_farmers(self) -> List[Dict]:
+        """Get all farmers"""
+        with self._lock:
+            return [dict(farmer) for farmer in self.data["farmers"].values()]
+    
+    def search_farmers(self, name: str = None, min_age: int = None, max_age: int = None) -> List[Dict]:
+        """Search farmers by name substring (case insensitive) and age range, in registration order"""
+        with self._lock:
+            farmers = self.data["farmers"]
+            return [dict(farmers[str(farmer_id)]) for farmer_id in self.index.search(name, min_age, max_age)]
+    
+    def count(self) -> int:
+        """Number of registered farmers"""
+        return self.data["aggregates"]["count"]
+    
+    def get_stats(self) -> Dict:
+        """Statistics computed from the running aggregates in O(1)"""
+        with self._lock:
+            aggregates = self.data["aggregates"]
+            return build_stats(
+                aggregates["count"],
+                aggregates["age_sum"],
+                {int(age): count for age, count in aggregates["ages"].items()},
+                aggregates["experience_levels"],
+                self.data.get("last_updated"),
+                self.data.get("next_id", 1)
+            )
+    
+    @property
+    def version(self) -> int:
+        """Counter that changes with every write to the collection"""
+        return self.store.seq
+    
+    def list_farmers(self, name: str = None, min_age: int = None, max_age: int = None,
+                     after: int = None, limit: int = None, fields: List[str] = None) -> tuple:
+        """
+        One page of search results with IDs greater than after, optionally reduced to some fields
+        Returns (farmers, total matches, has more, version the page was read at)
+        """
+        with self._lock:
+            ids, total = self.index.page(name, min_age, max_age, after=after,
+                                         limit=None if limit is None else limit + 1)
+            has_more = limit is not None and len(ids) > limit
+            farmers = self.data["farmers"]
+            records = (farmers[str(farmer_id)] for farmer_id in ids[:limit])
+            if fields:
+                page = [{key: farmer[key] for key in fields if key in farmer} for farmer in records]
+            else:
+                page = [dict(farmer) for farmer in records]
+            return page, total, has_more, self.version
+    
+    def delete_farmer(self, farmer_id: int) -> bool:
+        """Delete farmer by ID"""
+        with self._lock:
+            if str(farmer_id) not in self.data["farmers"]:
+                return False
+            entry = self.store.commit({"op": "delete", "id": farmer_id})
+            self.index.remove(farmer_id)
+        self.store.wait_durable(entry["seq"])
+        logger.info(f"Deleted farmer ID {farmer_id}")
+        return True
+
@@ -0,0 +1,148 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Set
+
+GRAM_SIZE = 3
+
+
+def name_key(name: str) -> str:
+    """Key under which names count as duplicates (case insensitive)"""
+    return name.strip().casefold()
+
+
+def name_grams(text: str) -> Set[str]:
+    """Character trigrams of a lower-cased name"""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class FarmerIndex:
+    """
+    Secondary indexes over the farmer records, kept in sync by FarmerDatabase.
+
+    - exact names: case-folded name -> farmer id, for uniqueness checks
+    - ids: sorted farmer ids, for keyset pagination
+    - ages: sorted (age, id) pairs, for range queries with bisect
+    - name trigrams: trigram -> ids, for case-insensitive substring search;
+      a query is looked up by its rarest trigrams and the few candidates
+      left are checked directly. Queries shorter than a trigram scan the
+      lower-cased names.
+    """
+
+    def __init__(self, farmers: Iterable[Dict] = ()):
+        self.ids_by_name: Dict[str, int] = {}
+        # id -> (name key, lower-cased name, age) as indexed
+        self.entries: Dict[int, tuple] = {}
+        self.ids: List[int] = []
+        self.ages: List[tuple] = []
+        self.grams: Dict[str, Set[int]] = {}
+        for farmer in farmers:
+            self._add_entry(farmer)
+            self.ids.append(farmer["id"])
+            self.ages.append((farmer["age"], farmer["id"]))
+        # Sorted once rather than insorted per farmer
+        self.ids.sort()
+        self.ages.sort()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _add_entry(self, farmer: Dict):
+        farmer_id = farmer["id"]
+        key, lower_name = name_key(farmer["name"]), farmer["name"].lower()
+        self.ids_by_name[key] = farmer_id
+        self.entries[farmer_id] = (key, lower_name, farmer["age"])
+        for gram in name_grams(lower_name):
+            self.grams.setdefault(gram, set()).add(farmer_id)
+
+    def add(self, farmer: Dict):
+        self._add_entry(farmer)
+        insort(self.ids, farmer["id"])
+        insort(self.ages, (farmer["age"], farmer["id"]))
+
+    def remove(self, farmer_id: int):
+        key, lower_name, age = self.entries.pop(farmer_id)
+        if self.ids_by_name.get(key) == farmer_id:
+            del self.ids_by_name[key]
+        position = bisect_left(self.ids, farmer_id)
+        if position < len(self.ids) and self.ids[position] == farmer_id:
+            del self.ids[position]
+        position = bisect_left(self.ages, (age, farmer_id))
+        if position < len(self.ages) and self.ages[position] == (age, farmer_id):
+            del self.ages[position]
+        for gram in name_grams(lower_name):
+            postings = self.grams[gram]
+            postings.discard(farmer_id)
+            if not postings:
+                del self.grams[gram]
+
+    def find_name(self, name: str) -> Optional[int]:
+        """ID of the farmer with exactly this name (ignoring case), or None"""
+        return self.ids_by_name.get(name_key(name))
+
+    def ids_with_name_containing(self, text: str) -> Set[int]:
+        text = text.lower()
+        if len(text) < GRAM_SIZE:
+            return {farmer_id for farmer_id, (_, name, _) in self.entries.items() if text in name}
+
+        postings = []
+        for gram in name_grams(text):
+            if gram not in self.grams:
+                return set()
+            postings.append(self.grams[gram])
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates &= other
+            if len(candidates) < 32:
+                break
+        return {farmer_id for farmer_id in candidates if text in self.entries[farmer_id][1]}
+
+    def search(self, name: Optional[str] = None, min_age: Optional[int] = None,
+               max_age: Optional[int] = None) -> List[int]:
+        """IDs (ascending, i.e. registration order) matching every given criterion"""
+        return self.page(name, min_age, max_age)[0]
+
+    def page(self, name: Optional[str] = None, min_age: Optional[int] = None, max_age: Optional[int] = None,
+             after: Optional[int] = None, limit: Optional[int] = None) -> tuple:
+        """
+        Matching IDs greater than after, ascending, at most limit of them.
+
+        Returns (ids, total matches). Unfiltered pages are sliced from the
+        sorted id list. An age range either has its ids sorted or, when it
+        covers most farmers, is applied while walking the id list from the
+        cursor, whichever touches fewer entries.
+        """
+        low = float('-inf') if min_age is None else min_age
+        high = float('inf') if max_age is None else max_age
+
+        if name:
+            ids = self.ids_with_name_containing(name)
+            if min_age is not None or max_age is not None:
+                # Name matches are few; check their ages rather than materialising the range
+                ids = [farmer_id for farmer_id in ids if low <= self.entries[farmer_id][2] <= high]
+            ids = sorted(ids)
+            total = len(ids)
+        elif min_age is None and max_age is None:
+            ids = self.ids
+            total = len(ids)
+        else:
+            start = bisect_left(self.ages, (low, float('-inf')))
+            end = bisect_right(self.ages, (high, float('inf')))
+            # An empty range (min_age > max_age) ends before it starts
+            total = max(0, end - start)
+            wanted = limit if limit is not None else total
+            # Walking ids from the cursor visits about wanted * n / total entries
+            if limit is not None and total and wanted * len(self.ids) / total < total:
+                position = 0 if after is None else bisect_right(self.ids, after)
+                found = []
+                for index in range(position, len(self.ids)):
+                    farmer_id = self.ids[index]
+                    if low <= self.entries[farmer_id][2] <= high:
+                        found.append(farmer_id)
+                        if len(found) == limit:
+                            break
+                return found, total
+            ids = sorted(farmer_id for _, farmer_id in self.ages[start:end])
+
+        position = 0 if after is None else bisect_right(ids, after)
+        end = len(ids) if limit is None else position + limit
+        return ids[position:end], total
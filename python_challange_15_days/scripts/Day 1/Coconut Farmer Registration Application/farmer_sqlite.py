@@ -0,0 +1,411 @@
+"""
+SQLite storage backend for the farmer API, and a migrator from the JSON store.
+
+Select it with FARMER_STORAGE=sqlite (and optionally FARMER_DB_PATH). Move
+an existing registry across once, with the server stopped:
+
+    python farmer_sqlite.py --from farmers_data.json --to farmers.db
+"""
+import argparse
+import atexit
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from farmer_database import FARMER_FIELDS, DuplicateFarmerError, FarmerStorage, build_stats
+from farmer_index import name_key
+from farmer_storage import recover_state
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ", ".join(FARMER_FIELDS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS farmers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL COLLATE NOCASE,
+    name_key TEXT NOT NULL,
+    -- name_lower is str.lower() of the name, what the JSON backend's substring search matches
+    -- (casefold would also make "ss" match "ß", and SQLite's lower() only folds ASCII)
+    name_lower TEXT NOT NULL,
+    age INTEGER NOT NULL,
+    experience_level TEXT NOT NULL,
+    coconut_type TEXT NOT NULL,
+    registration_date TEXT NOT NULL,
+    last_updated TEXT NOT NULL
+);
+-- NOCASE only folds ASCII, so the case-insensitive unique index is on the
+-- same case-folded key the JSON backend compares (farmer_index.name_key)
+CREATE UNIQUE INDEX IF NOT EXISTS farmers_name_key ON farmers (name_key);
+CREATE INDEX IF NOT EXISTS farmers_age ON farmers (age, id);
+
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value) WITHOUT ROWID;
+
+-- Running aggregates for /api/stats, kept current by the triggers below
+CREATE TABLE IF NOT EXISTS age_counts (age INTEGER PRIMARY KEY, farmers INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS experience_counts (experience_level TEXT PRIMARY KEY, farmers INTEGER NOT NULL);
+
+CREATE TRIGGER IF NOT EXISTS farmers_counted AFTER INSERT ON farmers BEGIN
+    INSERT INTO age_counts (age, farmers) VALUES (NEW.age, 1)
+        ON CONFLICT (age) DO UPDATE SET farmers = farmers + 1;
+    INSERT INTO experience_counts (experience_level, farmers) VALUES (NEW.experience_level, 1)
+        ON CONFLICT (experience_level) DO UPDATE SET farmers = farmers + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS farmers_uncounted AFTER DELETE ON farmers BEGIN
+    UPDATE age_counts SET farmers = farmers - 1 WHERE age = OLD.age;
+    DELETE FROM age_counts WHERE age = OLD.age AND farmers = 0;
+    UPDATE experience_counts SET farmers = farmers - 1 WHERE experience_level = OLD.experience_level;
+    DELETE FROM experience_counts WHERE experience_level = OLD.experience_level AND farmers = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS farmers_recounted AFTER UPDATE OF age, experience_level ON farmers BEGIN
+    UPDATE age_counts SET farmers = farmers - 1 WHERE age = OLD.age;
+    DELETE FROM age_counts WHERE age = OLD.age AND farmers = 0;
+    UPDATE experience_counts SET farmers = farmers - 1 WHERE experience_level = OLD.experience_level;
+    DELETE FROM experience_counts WHERE experience_level = OLD.experience_level AND farmers = 0;
+    INSERT INTO age_counts (age, farmers) VALUES (NEW.age, 1)
+        ON CONFLICT (age) DO UPDATE SET farmers = farmers + 1;
+    INSERT INTO experience_counts (experience_level, farmers) VALUES (NEW.experience_level, 1)
+        ON CONFLICT (experience_level) DO UPDATE SET farmers = farmers + 1;
+END;
+"""
+
+INSERT_FARMER = (
+    "INSERT INTO farmers "
+    "(id, name, name_key, name_lower, age, experience_level, coconut_type, registration_date, last_updated) "
+    "VALUES (:id, :name, :name_key, :name_lower, :age, :experience_level, :coconut_type, "
+    ":registration_date, :last_updated)"
+)
+
+
+def search_keys(name: str) -> Dict:
+    """The name_key and name_lower columns of a name"""
+    return {"name_key": name_key(name), "name_lower": name.lower()}
+
+
+class SQLiteFarmerDatabase(FarmerStorage):
+    """
+    Farmer registry in a SQLite database.
+
+    The database runs in WAL mode, so readers never wait for the writer,
+    and with synchronous=FULL, so a change is on disk before it is
+    acknowledged. Connections are pooled and shared between request
+    threads; every query is a constant, parameterised statement, so
+    sqlite3's per-connection statement cache prepares each one only once.
+    Writers are serialised by a lock and run in BEGIN IMMEDIATE
+    transactions, which also keeps other processes out while the
+    duplicate-name check and insert run.
+    """
+
+    def __init__(self, filename: str = "farmers.db"):
+        self.filename = filename
+        self._pool: List[sqlite3.Connection] = []
+        self._connections: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES "
+                "('next_id', 1), ('total_registrations', 0), ('last_updated', ?), ('version', 0)",
+                (datetime.now().isoformat(),)
+            )
+        with self._transaction(write=True) as conn:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(farmers)")}
+            if "name_lower" not in columns:
+                # Databases created before name_lower existed
+                conn.execute("ALTER TABLE farmers ADD COLUMN name_lower TEXT NOT NULL DEFAULT ''")
+                conn.executemany("UPDATE farmers SET name_lower = ? WHERE id = ?", [
+                    (row["name"].lower(), row["id"]) for row in conn.execute("SELECT id, name FROM farmers")
+                ])
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are opened explicitly
+        conn = sqlite3.connect(self.filename, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=FULL")
+        with self._pool_lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """A connection from the pool, returned to it afterwards"""
+        with self._pool_lock:
+            conn = self._pool.pop() if self._pool else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            with self._pool_lock:
+                self._pool.append(conn)
+
+    @contextmanager
+    def _transaction(self, write: bool = False):
+        """A connection inside a transaction; reads see one consistent snapshot"""
+        with self._connection() as conn:
+            lock = self._write_lock if write else None
+            if lock:
+                lock.acquire()
+            try:
+                conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            finally:
+                if lock:
+                    lock.release()
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, key: str):
+        return conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    @staticmethod
+    def _touch(conn: sqlite3.Connection, now: str):
+        """Record a write: bumps the version used for ETags"""
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'last_updated'", (now,))
+
+    @staticmethod
+    def _find_name(conn: sqlite3.Connection, name: str) -> Optional[int]:
+        row = conn.execute("SELECT id FROM farmers WHERE name_key = ?", (name_key(name),)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._pool_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._pool.clear()
+
+    def add_farmer(self, farmer_data: Dict) -> int:
+        """Add new farmer to database; raises DuplicateFarmerError if the name is taken"""
+        with self._transaction(write=True) as conn:
+            existing_id = self._find_name(conn, farmer_data["name"])
+            if existing_id is not None:
+                raise DuplicateFarmerError(existing_id)
+
+            farmer_id = self._meta(conn, "next_id")
+            farmer_data["id"] = farmer_id
+            farmer_data["registration_date"] = datetime.now().isoformat()
+            farmer_data["last_updated"] = datetime.now().isoformat()
+            conn.execute(INSERT_FARMER, dict(farmer_data, **search_keys(farmer_data["name"])))
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'next_id'", (farmer_id + 1,))
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'total_registrations'")
+            self._touch(conn, farmer_data["last_updated"])
+
+        logger.info(f"Added new farmer: {farmer_data['name']} (ID: {farmer_id})")
+        return farmer_id
+
+    def add_farmers(self, farmers: List[Dict]) -> List[tuple]:
+        """Add a batch of farmers in one transaction, so the whole batch costs one fsync"""
+        results, rows = [], []
+        taken = {}
+        now = datetime.now().isoformat()
+        with self._transaction(write=True) as conn:
+            next_id = self._meta(conn, "next_id")
+            for farmer_data in farmers:
+                key = name_key(farmer_data["name"])
+                existing_id = taken.get(key)
+                if existing_id is None:
+                    existing_id = self._find_name(conn, farmer_data["name"])
+                if existing_id is not None:
+                    results.append((None, existing_id))
+                    continue
+
+                farmer_data["id"] = taken[key] = next_id
+                farmer_data["registration_date"] = now
+                farmer_data["last_updated"] = now
+                rows.append(dict(farmer_data, **search_keys(farmer_data["name"])))
+                results.append((next_id, None))
+                next_id += 1
+
+            if rows:
+                conn.executemany(INSERT_FARMER, rows)
+                conn.execute("UPDATE meta SET value = ? WHERE key = 'next_id'", (next_id,))
+                conn.execute("UPDATE meta SET value = value + ? WHERE key = 'total_registrations'", (len(rows),))
+                self._touch(conn, now)
+
+        logger.info(f"Added {len(rows)} farmers in bulk")
+        return results
+
+    def update_farmer(self, farmer_id: int, updated_data: Dict) -> bool:
+        """Update existing farmer data; raises DuplicateFarmerError if a new name is taken"""
+        # Only known columns reach the SQL text, so there are few distinct statements
+        fields = {key: value for key, value in updated_data.items() if key in FARMER_FIELDS and key != "id"}
+        fields["last_updated"] = datetime.now().isoformat()
+        if "name" in fields:
+            fields.update(search_keys(fields["name"]))
+        assignments = ", ".join(f"{column} = :{column}" for column in fields)
+
+        with self._transaction(write=True) as conn:
+            if "name" in fields:
+                existing_id = self._find_name(conn, fields["name"])
+                if existing_id is not None and existing_id != farmer_id:
+                    raise DuplicateFarmerError(existing_id)
+
+            cursor = conn.execute(f"UPDATE farmers SET {assignments} WHERE id = :farmer_id",
+                                  dict(fields, farmer_id=farmer_id))
+            if cursor.rowcount == 0:
+                return False
+            self._touch(conn, fields["last_updated"])
+
+        logger.info(f"Updated farmer ID {farmer_id}")
+        return True
+
+    def delete_farmer(self, farmer_id: int) -> bool:
+        """Delete farmer by ID"""
+        with self._transaction(write=True) as conn:
+            if conn.execute("DELETE FROM farmers WHERE id = ?", (farmer_id,)).rowcount == 0:
+                return False
+            self._touch(conn, datetime.now().isoformat())
+        logger.info(f"Deleted farmer ID {farmer_id}")
+        return True
+
+    def get_farmer(self, farmer_id: int) -> Optional[Dict]:
+        """Get farmer by ID"""
+        with self._connection() as conn:
+            row = conn.execute(f"SELECT {COLUMNS} FROM farmers WHERE id = ?", (farmer_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_all_farmers(self) -> List[Dict]:
+        """Get all farmers, in registration order"""
+        with self._connection() as conn:
+            return [dict(row) for row in conn.execute(f"SELECT {COLUMNS} FROM farmers ORDER BY id")]
+
+    def search_farmers(self, name: str = None, min_age: int = None, max_age: int = None) -> List[Dict]:
+        """Search farmers by name substring (case insensitive) and age range, in registration order"""
+        return self.list_farmers(name, min_age, max_age)[0]
+
+    @staticmethod
+    def _filters(name: Optional[str], min_age: Optional[int], max_age: Optional[int]) -> tuple:
+        """WHERE clause and parameters for the search filters"""
+        conditions, params = [], {}
+        if name:
+            # Lower-cased exactly like the JSON backend's name search
+            conditions.append("instr(name_lower, :name) > 0")
+            params["name"] = name.lower()
+        if min_age is not None:
+            conditions.append("age >= :min_age")
+            params["min_age"] = min_age
+        if max_age is not None:
+            conditions.append("age <= :max_age")
+            params["max_age"] = max_age
+        return " AND ".join(conditions) or "1", params
+
+    def list_farmers(self, name: str = None, min_age: int = None, max_age: int = None,
+                     after: int = None, limit: int = None, fields: List[str] = None) -> tuple:
+        """
+        One page of search results with IDs greater than after, optionally reduced to some fields
+        Returns (farmers, total matches, has more, version the page was read at)
+        """
+        columns = ", ".join(field for field in FARMER_FIELDS if field in fields) if fields else COLUMNS
+        where, params = self._filters(name, min_age, max_age)
+
+        with self._transaction() as conn:
+            if name:
+                total = conn.execute(f"SELECT COUNT(*) FROM farmers WHERE {where}", params).fetchone()[0]
+            else:
+                # Age filters alone are answered from the age histogram
+                total = conn.execute(
+                    f"SELECT COALESCE(SUM(farmers), 0) FROM age_counts WHERE {where}", params
+                ).fetchone()[0]
+            # Keyset pagination: one row past the page tells whether there is more (LIMIT -1 is no limit)
+            rows = conn.execute(
+                f"SELECT {columns} FROM farmers WHERE {where} AND id > :after ORDER BY id LIMIT :limit",
+                dict(params, after=after or 0, limit=-1 if limit is None else limit + 1)
+            ).fetchall()
+            version = self._meta(conn, "version")
+
+        has_more = limit is not None and len(rows) > limit
+        return [dict(row) for row in rows[:limit]], total, has_more, version
+
+    def count(self) -> int:
+        """Number of registered farmers"""
+        with self._connection() as conn:
+            return conn.execute("SELECT COALESCE(SUM(farmers), 0) FROM age_counts").fetchone()[0]
+
+    def get_stats(self) -> Dict:
+        """Statistics from the aggregate tables, without reading the farmer rows"""
+        with self._transaction() as conn:
+            ages = dict(conn.execute("SELECT age, farmers FROM age_counts").fetchall())
+            experience_levels = dict(conn.execute("SELECT experience_level, farmers FROM experience_counts").fetchall())
+            last_updated = self._meta(conn, "last_updated")
+            next_id = self._meta(conn, "next_id")
+        total_farmers = sum(ages.values())
+        age_sum = sum(age * count for age, count in ages.items())
+        return build_stats(total_farmers, age_sum, ages, experience_levels, last_updated, next_id)
+
+    @property
+    def version(self) -> int:
+        """Counter that changes with every write to the collection"""
+        with self._connection() as conn:
+            return self._meta(conn, "version")
+
+
+def migrate_json(json_path: str, db_path: str) -> int:
+    """
+    Copy a JSON registry (snapshot plus log) into an empty SQLite database.
+
+    IDs, dates, the next ID and the registration count are kept. The copy
+    happens in one transaction, so a failure leaves the database empty.
+    Returns the number of farmers copied.
+    """
+    data, seq, _, _ = recover_state(json_path)
+    farmers = sorted(data["farmers"].values(), key=lambda farmer: farmer["id"])
+
+    # Registries from before the case-insensitive duplicate check may hold such pairs
+    seen, clashes = {}, []
+    for farmer in farmers:
+        key = name_key(farmer["name"])
+        if key in seen:
+            clashes.append(f"{farmer['name']!r} (ID {farmer['id']}) and {seen[key]['name']!r} (ID {seen[key]['id']})")
+        seen[key] = farmer
+    if clashes:
+        raise ValueError("Names differing only in case must be renamed before migrating: " + "; ".join(clashes))
+
+    db = SQLiteFarmerDatabase(db_path)
+    try:
+        with db._transaction(write=True) as conn:
+            if conn.execute("SELECT COUNT(*) FROM farmers").fetchone()[0]:
+                raise ValueError(f"{db_path} already contains farmers; migrate into a new database")
+            conn.executemany(INSERT_FARMER, (
+                {**{field: farmer.get(field) for field in FARMER_FIELDS}, **search_keys(farmer["name"])}
+                for farmer in farmers
+            ))
+            conn.executemany("UPDATE meta SET value = ? WHERE key = ?", [
+                (data["next_id"], "next_id"),
+                (data.get("total_registrations", len(farmers)), "total_registrations"),
+                (data.get("last_updated"), "last_updated"),
+                (seq, "version")
+            ])
+    finally:
+        db.close()
+
+    logger.info(f"Migrated {len(farmers)} farmers from {json_path} to {db_path}")
+    return len(farmers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the farmer JSON store to SQLite")
+    parser.add_argument("--from", dest="source", default="farmers_data.json", help="JSON snapshot (its log is replayed)")
+    parser.add_argument("--to", dest="target", default="farmers.db", help="New SQLite database")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    count = migrate_json(args.source, args.target)
+    print(f"Migrated {count} farmers to {args.target}. Start the API with FARMER_STORAGE=sqlite FARMER_DB_PATH={args.target}")
+
+
+if __name__ == "__main__":
+    main()
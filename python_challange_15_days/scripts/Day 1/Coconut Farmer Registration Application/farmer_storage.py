@@ -0,0 +1,335 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def empty_state() -> Dict:
+    """State of a registry with no farmers"""
+    return {
+        "farmers": {},
+        "next_id": 1,
+        "total_registrations": 0,
+        "last_updated": datetime.now().isoformat(),
+        "aggregates": compute_aggregates([])
+    }
+
+
+def compute_aggregates(farmers) -> Dict:
+    """Running statistics for a set of farmers, from scratch"""
+    aggregates = {"count": 0, "age_sum": 0, "ages": {}, "experience_levels": {}}
+    for farmer in farmers:
+        _tally(aggregates, farmer, 1)
+    return aggregates
+
+
+def _tally(aggregates: Dict, farmer: Dict, sign: int):
+    """Add (sign=1) or remove (sign=-1) one farmer from the aggregates"""
+    aggregates["count"] += sign
+    aggregates["age_sum"] += sign * farmer["age"]
+    # Ages are stored as string keys so the snapshot JSON round-trips unchanged
+    for bucket, key in (("ages", str(farmer["age"])), ("experience_levels", farmer.get("experience_level"))):
+        counts = aggregates[bucket]
+        counts[key] = counts.get(key, 0) + sign
+        if not counts[key]:
+            del counts[key]
+
+
+def apply_operation(data: Dict, op: Dict):
+    """Apply one logged operation (add, update or delete) to the in-memory state and its aggregates"""
+    farmers = data["farmers"]
+    aggregates = data["aggregates"]
+    farmer_key = str(op["id"])
+    if op["op"] == "add":
+        if farmer_key in farmers:
+            _tally(aggregates, farmers[farmer_key], -1)
+        farmers[farmer_key] = op["farmer"]
+        _tally(aggregates, op["farmer"], 1)
+        data["next_id"] = max(data["next_id"], op["id"] + 1)
+        data["total_registrations"] += 1
+    elif op["op"] == "update":
+        if farmer_key in farmers:
+            _tally(aggregates, farmers[farmer_key], -1)
+            farmers[farmer_key].update(op["fields"])
+            _tally(aggregates, farmers[farmer_key], 1)
+    elif op["op"] == "delete":
+        farmer = farmers.pop(farmer_key, None)
+        if farmer is not None:
+            _tally(aggregates, farmer, -1)
+    else:
+        raise ValueError(f"Unknown operation: {op['op']}")
+    data["last_updated"] = op["ts"]
+
+
+def log_segments(snapshot_path: str) -> List[tuple]:
+    """(generation, path) of a snapshot's log segments on disk, oldest first"""
+    segments = []
+    for path in glob.glob(glob.escape(snapshot_path) + ".*.log"):
+        generation = path[len(snapshot_path) + 1:-len(".log")]
+        if generation.isdigit():
+            segments.append((int(generation), path))
+    return sorted(segments)
+
+
+def recover_state(snapshot_path: str) -> tuple:
+    """
+    Load a snapshot and replay its log without opening anything for writing.
+
+    Returns (data, last seq, last segment generation, changes replayed).
+    """
+    if os.path.exists(snapshot_path):
+        try:
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            # Starting empty would let the next compaction overwrite the real data
+            logger.error(f"Error loading snapshot {snapshot_path}: {e}")
+            raise
+    else:
+        data = empty_state()
+    seq = data.pop("log_seq", 0)
+    if "aggregates" not in data:
+        # Snapshots written before aggregates existed
+        data["aggregates"] = compute_aggregates(data["farmers"].values())
+
+    segments = log_segments(snapshot_path)
+    replayed = 0
+    for _, path in segments:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring incomplete entry at {path}:{line_number}")
+                    break
+                if op["seq"] > seq:
+                    apply_operation(data, op)
+                    seq = op["seq"]
+                    replayed += 1
+
+    if replayed:
+        logger.info(f"Replayed {replayed} logged changes from {len(segments)} segment(s)")
+    return data, seq, segments[-1][0] if segments else 0, replayed
+
+
+class LogStore:
+    """
+    Farmer registry state kept in memory and persisted as a snapshot plus an append-only log.
+
+    commit() applies a change to the in-memory state under a lock and
+    queues it as one JSON line; a single writer thread appends everything
+    queued so far to the current log segment with one write and one fsync
+    (group commit), then wakes the callers waiting in wait_durable(). It
+    also compacts: the state is written to a new snapshot through a
+    temporary file and the segments it covers are deleted. On start the
+    snapshot is loaded and newer log entries are replayed; a torn last
+    line from a crash is ignored.
+
+    A group that fails to write stays queued, ahead of later changes, and is
+    retried in a new segment; wait_durable() keeps waiting for it until
+    durable_timeout passes.
+    """
+
+    def __init__(self, snapshot_path: str, commit_interval: float = 0.002, max_batch: int = 10000,
+                 compact_after: int = 10000, compact_interval: float = 300.0, durable_timeout: float = 30.0):
+        self.snapshot_path = snapshot_path
+        # How long the writer lets a group gather after the first change arrives
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.compact_after = compact_after
+        self.compact_interval = compact_interval
+        self.durable_timeout = durable_timeout
+
+        # _lock guards the state, seq and queue; _file_lock the segment file
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._durable = threading.Condition()
+        self._pending: List[tuple] = []
+        self._has_pending = threading.Event()
+        self._failure = None
+        self._last_compaction = time.monotonic()
+
+        self.data, self._seq, generation, self._ops_in_log = recover_state(snapshot_path)
+        self._durable_seq = self._seq
+        # New writes always start a fresh segment, never after a torn line
+        self._generation = generation
+        self._file = None
+        self._open_next_segment()
+        # Only a process that has written compacts, so one that merely loaded
+        # the data (such as Flask's reloader parent) never replaces a newer
+        # snapshot with its stale state
+        self._written = False
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._writer, name="farmer-log-writer", daemon=True)
+        self._thread.start()
+
+    def _segment_path(self, generation: int) -> str:
+        return f"{self.snapshot_path}.{generation:06d}.log"
+
+    def _segments(self) -> List[tuple]:
+        return log_segments(self.snapshot_path)
+
+    def _open_next_segment(self):
+        self._generation += 1
+        self._file = open(self._segment_path(self._generation), 'a', encoding='utf-8')
+
+    def _close_segment(self):
+        file, self._file = self._file, None
+        if file is not None:
+            try:
+                file.close()
+            except OSError:
+                # After a failed write the buffered rest may not flush either
+                pass
+
+    def commit(self, op: Dict) -> Dict:
+        """
+        Apply an operation to the state and queue it for the log; returns the entry.
+
+        The change is visible at once but only durable after
+        wait_durable(entry["seq"]) returns.
+        """
+        with self._lock:
+            self._seq += 1
+            entry = {"seq": self._seq, "ts": datetime.now().isoformat(), **op}
+            apply_operation(self.data, entry)
+            self._pending.append((self._seq, json.dumps(entry, separators=(',', ':')) + "\n"))
+            self._ops_in_log += 1
+            self._written = True
+            self._has_pending.set()
+        return entry
+
+    def wait_durable(self, seq: int):
+        """
+        Block until the entry with this seq (and every earlier one) is fsynced.
+
+        Raises IOError if that takes longer than durable_timeout because
+        writes keep failing; the entry stays queued and is still retried.
+        """
+        deadline = time.monotonic() + self.durable_timeout
+        with self._durable:
+            while self._durable_seq < seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise IOError(f"Writing the farmer log failed ({self._failure}); "
+                                  f"the change is kept and will be retried")
+                self._durable.wait(remaining)
+
+    def _take_pending(self, limit: Optional[int] = None) -> List[tuple]:
+        with self._lock:
+            batch = self._pending[:limit]
+            del self._pending[:len(batch)]
+            if not self._pending:
+                self._has_pending.clear()
+        return batch
+
+    def _write(self, batch: List[tuple]):
+        """
+        Append a group of entries with one fsync and acknowledge them (holding _file_lock).
+
+        On failure the group goes back to the front of the queue and the
+        segment is closed: it may end in a partly written line, and recovery
+        stops reading a segment there, so the retry goes to a new one.
+        """
+        if not batch:
+            return
+        try:
+            if self._file is None:
+                self._open_next_segment()
+            self._file.write("".join(line for _, line in batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except Exception as e:
+            logger.error(f"Error writing farmer log: {e}")
+            with self._lock:
+                self._pending[:0] = batch
+                self._has_pending.set()
+            self._close_segment()
+            with self._durable:
+                self._failure = e
+            raise
+        with self._durable:
+            self._durable_seq = batch[-1][0]
+            self._failure = None
+            self._durable.notify_all()
+
+    def compact(self) -> bool:
+        """Write a snapshot of the current state and delete the log it replaces"""
+        with self._file_lock:
+            with self._lock:
+                if self._ops_in_log == 0 or not self._written:
+                    return False
+                snapshot = json.dumps({**self.data, "log_seq": self._seq}, separators=(',', ':'))
+                covered_ops = self._ops_in_log
+                # Taken with the snapshot: a change committed after it must not
+                # land in a segment that is deleted below
+                batch = self._pending[:]
+                self._pending.clear()
+                self._has_pending.clear()
+            # Everything queued up to the snapshot goes to the old segment; later
+            # entries start the next one, so segments stay in seq order
+            self._write(batch)
+            self._close_segment()
+            covered_generation = self._generation
+            self._open_next_segment()
+
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            with self._lock:
+                self._ops_in_log -= covered_ops
+
+        for generation, path in self._segments():
+            if generation <= covered_generation:
+                os.remove(path)
+        self._last_compaction = time.monotonic()
+        return True
+
+    def _writer(self):
+        while True:
+            self._has_pending.wait(timeout=1.0)
+            stopping = self._stop.is_set()
+            try:
+                if self._has_pending.is_set():
+                    if self.commit_interval and not stopping:
+                        time.sleep(self.commit_interval)
+                    with self._file_lock:
+                        self._write(self._take_pending(self.max_batch))
+                if self._written and (self._ops_in_log >= self.compact_after or
+                                      time.monotonic() - self._last_compaction >= self.compact_interval):
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Error in farmer log writer: {e}")
+                time.sleep(1.0)
+            if stopping:
+                return
+
+    def close(self, compact: bool = True):
+        """Write out everything queued, stop the writer, then compact (if this process wrote) and close the log"""
+        self._stop.set()
+        self._has_pending.set()
+        self._thread.join()
+        if compact:
+            self.compact()
+        with self._file_lock:
+            self._write(self._take_pending())
+            self._close_segment()
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the last change"""
+        return self._seq
+
+    def log_size(self) -> int:
+        """Changes logged since the last snapshot"""
+        return self._ops_in_log
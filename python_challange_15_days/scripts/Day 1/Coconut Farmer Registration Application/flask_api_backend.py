@@ -1,10 +1,14 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, stream_with_context
 from flask_cors import CORS
 import logging
-from datetime import datetime
-import json
 import os
-from typing import Dict, List, Optional
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import Dict, Iterator
+from farmer_database import FARMER_FIELDS, DuplicateFarmerError, FarmerDatabase, FarmerStorage
+from farmer_sqlite import SQLiteFarmerDatabase
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,110 +17,29 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-class FarmerDatabase:
-    """Simple file-based database for farmer data"""
-    
-    def __init__(self, filename: str = "farmers_data.json"):
-        self.filename = filename
-        self.data = self._load_data()
-    
-    def _load_data(self) -> Dict:
-        """Load data from JSON file"""
-        try:
-            if os.path.exists(self.filename):
-                with open(self.filename, 'r') as f:
-                    return json.load(f)
-            else:
-                # Initialize with empty structure
-                return {
-                    "farmers": {},
-                    "next_id": 1,
-                    "total_registrations": 0,
-                    "last_updated": datetime.now().isoformat()
-                }
-        except Exception as e:
-            logger.error(f"Error loading data: {e}")
-            return {"farmers": {}, "next_id": 1, "total_registrations": 0}
-    
-    def _save_data(self):
-        """Save data to JSON file"""
-        try:
-            self.data["last_updated"] = datetime.now().isoformat()
-            with open(self.filename, 'w') as f:
-                json.dump(self.data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving data: {e}")
-    
-    def get_next_id(self) -> int:
-        """Get next available farmer ID"""
-        next_id = self.data["next_id"]
-        self.data["next_id"] += 1
-        return next_id
-    
-    def add_farmer(self, farmer_data: Dict) -> int:
-        """Add new farmer to database"""
-        farmer_id = self.get_next_id()
-        farmer_data["id"] = farmer_id
-        farmer_data["registration_date"] = datetime.now().isoformat()
-        farmer_data["last_updated"] = datetime.now().isoformat()
-        
-        self.data["farmers"][str(farmer_id)] = farmer_data
-        self.data["total_registrations"] += 1
-        self._save_data()
-        
-        logger.info(f"Added new farmer: {farmer_data['name']} (ID: {farmer_id})")
-        return farmer_id
-    
-    def update_farmer(self, farmer_id: int, updated_data: Dict) -> bool:
-        """Update existing farmer data"""
-        farmer_key = str(farmer_id)
-        if farmer_key not in self.data["farmers"]:
-            return False
-        
-        # Update only provided fields
-        for key, value in updated_data.items():
-            if key in self.data["farmers"][farmer_key]:
-                self.data["farmers"][farmer_key][key] = value
-        
-        self.data["farmers"][farmer_key]["last_updated"] = datetime.now().isoformat()
-        self._save_data()
-        
-        logger.info(f"Updated farmer ID {farmer_id}")
-        return True
-    
-    def get_farmer(self, farmer_id: int) -> Optional[Dict]:
-        """Get farmer by ID"""
-        return self.data["farmers"].get(str(farmer_id))
-    
-    def get_all_farmers(self) -> List[Dict]:
-        """Get all farmers"""
-        return list(self.data["farmers"].values())
-    
-    def search_farmers(self, name: str = None, min_age: int = None, max_age: int = None) -> List[Dict]:
-        """Search farmers by criteria"""
-        farmers = self.get_all_farmers()
-        
-        if name:
-            farmers = [f for f in farmers if name.lower() in f["name"].lower()]
-        if min_age is not None:
-            farmers = [f for f in farmers if f["age"] >= min_age]
-        if max_age is not None:
-            farmers = [f for f in farmers if f["age"] <= max_age]
-            
-        return farmers
-    
-    def delete_farmer(self, farmer_id: int) -> bool:
-        """Delete farmer by ID"""
-        farmer_key = str(farmer_id)
-        if farmer_key in self.data["farmers"]:
-            del self.data["farmers"][farmer_key]
-            self._save_data()
-            logger.info(f"Deleted farmer ID {farmer_id}")
-            return True
-        return False
+def open_database() -> FarmerStorage:
+    """Storage backend chosen by FARMER_STORAGE: "json" (default) or "sqlite" (FARMER_DB_PATH)"""
+    storage = os.getenv("FARMER_STORAGE", "json").lower()
+    if storage == "sqlite":
+        return SQLiteFarmerDatabase(os.getenv("FARMER_DB_PATH", "farmers.db"))
+    if storage != "json":
+        raise ValueError(f"Unknown FARMER_STORAGE {storage!r}; use json or sqlite")
+    return FarmerDatabase()
 
 # Initialize database
-db = FarmerDatabase()
+db = open_database()
+
+MAX_PAGE_SIZE = 1000
+# Rows validated and committed together by /api/farmers/bulk
+BULK_BATCH_SIZE = 500
+BULK_FORMATS = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+def not_modified(version: int):
+    """Empty 304 response for a collection version the client already has"""
+    response = app.response_class(status=304)
+    response.set_etag(str(version))
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 def get_experience_level(age: int) -> tuple:
     """Determine experience level and coconut type based on age"""
@@ -129,6 +52,41 @@ def get_experience_level(age: int) -> tuple:
     else:
         return "veteran and master", "golden harvest coconuts"
 
+def validate_registration(data: Dict) -> tuple:
+    """Apply the registration rules to one payload; returns (farmer_data, None) or (None, error message)"""
+    name = data.get('name') or ''
+    if not isinstance(name, str):
+        return None, "Name must be text"
+    name = name.strip()
+    age = data.get('age')
+    
+    # Validate name
+    if not name:
+        return None, "Name is required"
+        
+    if len(name) < 2:
+        return None, "Name must be at least 2 characters long"
+        
+    # Validate age
+    if age is None:
+        return None, "Age is required"
+        
+    try:
+        age = int(age)
+    except (ValueError, TypeError):
+        return None, "Age must be a number"
+        
+    if age < 18 or age > 80:
+        return None, "Age must be between 18 and 80"
+    
+    experience, coconut_type = get_experience_level(age)
+    return {
+        "name": name,
+        "age": age,
+        "experience_level": experience,
+        "coconut_type": coconut_type
+    }, None
+
 @app.route('/api/farmer', methods=['POST'])
 def register_farmer():
     """
@@ -143,50 +101,24 @@ def register_farmer():
             logger.error("No data received")
             return jsonify({"error": "No data provided"}), 400
             
-        name = data.get('name', '').strip()
-        age = data.get('age')
+        farmer_data, error = validate_registration(data)
+        if error:
+            return jsonify({"error": error}), 400
+        name, age = farmer_data["name"], farmer_data["age"]
+        experience, coconut_type = farmer_data["experience_level"], farmer_data["coconut_type"]
         
-        # Validate name
-        if not name:
-            return jsonify({"error": "Name is required"}), 400
-            
-        if len(name) < 2:
-            return jsonify({"error": "Name must be at least 2 characters long"}), 400
-            
-        # Validate age
-        if age is None:
-            return jsonify({"error": "Age is required"}), 400
-            
-        try:
-            age = int(age)
-        except (ValueError, TypeError):
-            return jsonify({"error": "Age must be a number"}), 400
-            
-        if age < 18 or age > 80:
-            return jsonify({"error": "Age must be between 18 and 80"}), 400
+        # Generate personalized message
+        greeting = f"Welcome, {name}! At {age} years young, you're {experience} in growing {coconut_type}!"
         
-        # Check for duplicate names (case insensitive)
-        existing_farmers = db.search_farmers(name=name)
-        if existing_farmers:
+        # The duplicate name check (case insensitive) happens atomically with the insert
+        try:
+            farmer_id = db.add_farmer(farmer_data)
+        except DuplicateFarmerError as e:
             return jsonify({
                 "error": "Farmer with this name already exists",
-                "existing_farmer_id": existing_farmers[0]["id"],
+                "existing_farmer_id": e.farmer_id,
                 "suggestion": "Use update endpoint to modify existing record"
             }), 409
-        
-        # Generate personalized message
-        experience, coconut_type = get_experience_level(age)
-        greeting = f"Welcome, {name}! At {age} years young, you're {experience} in growing {coconut_type}!"
-        
-        # Store farmer data
-        farmer_data = {
-            "name": name,
-            "age": age,
-            "experience_level": experience,
-            "coconut_type": coconut_type
-        }
-        
-        farmer_id = db.add_farmer(farmer_data)
         farmer_record = db.get_farmer(farmer_id)
         
         logger.info(f"New farmer registered: {name}, Age: {age}, ID: {farmer_id}")
@@ -203,6 +135,111 @@ def register_farmer():
         logger.error(f"Error registering farmer: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
+def read_ndjson_rows(lines: Iterator[str]) -> Iterator[tuple]:
+    """(row number, payload, parse error) per non-blank NDJSON line"""
+    row = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            yield row, None, "Invalid JSON"
+            continue
+        if not isinstance(data, dict):
+            yield row, None, "Each line must be a JSON object"
+            continue
+        yield row, data, None
+
+def read_csv_rows(reader: csv.DictReader) -> Iterator[tuple]:
+    """(row number, payload, None) per CSV record; empty cells count as missing"""
+    for row, record in enumerate(reader, 1):
+        yield row, {key: value for key, value in record.items() if key and value not in (None, '')}, None
+
+def bulk_register(rows: Iterator[tuple]) -> Iterator[str]:
+    """
+    Validate and register rows in batches, yielding one NDJSON result line per row in input order
+    and a final summary line; each batch is checked against the name index and committed at once
+    """
+    summary = {"rows": 0, "registered": 0, "duplicates": 0, "invalid": 0, "complete": False}
+    batch = []
+    
+    def commit_batch():
+        farmers = [farmer for _, farmer, _ in batch if farmer]
+        results = iter(db.add_farmers(farmers) if farmers else [])
+        lines = []
+        for row, farmer, error in batch:
+            if error:
+                summary["invalid"] += 1
+                result = {"row": row, "status": "error", "code": 400, "error": error}
+            else:
+                farmer_id, existing_id = next(results)
+                if farmer_id is None:
+                    summary["duplicates"] += 1
+                    result = {"row": row, "status": "error", "code": 409,
+                              "error": "Farmer with this name already exists", "existing_farmer_id": existing_id}
+                else:
+                    summary["registered"] += 1
+                    result = {"row": row, "status": "success", "farmer_id": farmer_id, "name": farmer["name"]}
+            lines.append(json.dumps(result) + "\n")
+        batch.clear()
+        return "".join(lines)
+    
+    try:
+        for row, data, error in rows:
+            summary["rows"] += 1
+            farmer_data = None
+            if error is None:
+                farmer_data, error = validate_registration(data)
+            batch.append((row, farmer_data, error))
+            if len(batch) >= BULK_BATCH_SIZE:
+                yield commit_batch()
+        if batch:
+            yield commit_batch()
+        summary["complete"] = True
+    except Exception as e:
+        # The status line has been sent; report the failure in the stream
+        logger.error(f"Error in bulk registration after {summary['rows']} rows: {str(e)}")
+        yield json.dumps({"status": "error", "error": "Internal server error"}) + "\n"
+    
+    logger.info(f"Bulk registration: {summary}")
+    yield json.dumps({"summary": summary}) + "\n"
+
+@app.route('/api/farmers/bulk', methods=['POST'])
+def bulk_register_farmers():
+    """
+    Register many farmers from a CSV (text/csv, header with name and age) or NDJSON
+    (application/x-ndjson, one {"name", "age"} object per line) request body
+    The body is read as it arrives and each row gets the same validation and duplicate
+    check as POST /api/farmer. Responds with an NDJSON stream: one result per row
+    ({"row", "status", "farmer_id"} or {"row", "status", "code", "error"}) and a summary line
+    """
+    try:
+        data_format = BULK_FORMATS.get(request.mimetype)
+        if data_format is None:
+            return jsonify({
+                "error": "Send the farmers as text/csv or application/x-ndjson",
+                "supported_types": list(BULK_FORMATS)
+            }), 415
+        
+        # utf-8-sig drops the byte order mark spreadsheet exports start with
+        lines = codecs.iterdecode(request.stream, "utf-8-sig")
+        if data_format == "csv":
+            reader = csv.DictReader(lines)
+            reader.fieldnames = [field.strip().lower() for field in reader.fieldnames or []]
+            if "name" not in reader.fieldnames or "age" not in reader.fieldnames:
+                return jsonify({"error": "CSV header must include name and age columns"}), 400
+            rows = read_csv_rows(reader)
+        else:
+            rows = read_ndjson_rows(lines)
+        
+        return app.response_class(stream_with_context(bulk_register(rows)), mimetype="application/x-ndjson")
+        
+    except Exception as e:
+        logger.error(f"Error starting bulk registration: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 @app.route('/api/farmer/<int:farmer_id>', methods=['PUT'])
 def update_farmer(farmer_id):
     """
@@ -230,11 +267,6 @@ def update_farmer(farmer_id):
             if len(name) < 2:
                 return jsonify({"error": "Name must be at least 2 characters long"}), 400
             
-            # Check for duplicate names (excluding current farmer)
-            existing_farmers = db.search_farmers(name=name)
-            if existing_farmers and any(f["id"] != farmer_id for f in existing_farmers):
-                return jsonify({"error": "Another farmer with this name already exists"}), 409
-            
             update_data["name"] = name
         
         if 'age' in data:
@@ -255,8 +287,11 @@ def update_farmer(farmer_id):
         if not update_data:
             return jsonify({"error": "No valid fields to update"}), 400
         
-        # Update farmer data
-        success = db.update_farmer(farmer_id, update_data)
+        # Update farmer data (rejected if another farmer has the new name)
+        try:
+            success = db.update_farmer(farmer_id, update_data)
+        except DuplicateFarmerError:
+            return jsonify({"error": "Another farmer with this name already exists"}), 409
         if not success:
             return jsonify({"error": "Failed to update farmer"}), 500
         
@@ -294,28 +329,66 @@ def get_farmer(farmer_id):
 
 @app.route('/api/farmers', methods=['GET'])
 def get_all_farmers():
-    """Get all registered farmers with optional filtering"""
+    """
+    Get registered farmers with optional filtering, pagination and field selection
+    Query: name, min_age, max_age, limit (1-1000; omit for all), cursor (next_cursor
+    of the previous page), fields (comma separated, e.g. id,name,age; id is always included)
+    The ETag changes with every write; sending it back in If-None-Match returns
+    304 Not Modified while the collection is unchanged.
+    """
     try:
+        # Answered before any lookup or serialisation
+        if request.if_none_match.contains(str(db.version)):
+            return not_modified(db.version)
+        
         name_filter = request.args.get('name', '').strip()
         min_age = request.args.get('min_age', type=int)
         max_age = request.args.get('max_age', type=int)
         
-        farmers = db.search_farmers(
+        limit = None
+        if 'limit' in request.args:
+            limit = request.args.get('limit', type=int)
+            if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+                return jsonify({"error": f"limit must be a number between 1 and {MAX_PAGE_SIZE}"}), 400
+        
+        cursor = request.args.get('cursor', '').strip()
+        if cursor and not cursor.isdigit():
+            return jsonify({"error": "Invalid cursor"}), 400
+        
+        fields = None
+        if request.args.get('fields'):
+            fields = ["id"] + [field.strip() for field in request.args['fields'].split(',') if field.strip() != "id"]
+            unknown = [field for field in fields if field not in FARMER_FIELDS]
+            if unknown:
+                return jsonify({
+                    "error": f"Unknown fields: {', '.join(unknown)}",
+                    "available_fields": list(FARMER_FIELDS)
+                }), 400
+        
+        farmers, total, has_more, version = db.list_farmers(
             name=name_filter if name_filter else None,
             min_age=min_age,
-            max_age=max_age
+            max_age=max_age,
+            after=int(cursor) if cursor else None,
+            limit=limit,
+            fields=fields
         )
         
-        return jsonify({
+        response = jsonify({
             "status": "success",
-            "total_farmers": len(farmers),
+            "total_farmers": total,
+            "count": len(farmers),
             "farmers": farmers,
+            "next_cursor": str(farmers[-1]["id"]) if has_more else None,
             "filters_applied": {
                 "name": name_filter,
                 "min_age": min_age,
                 "max_age": max_age
             }
-        }), 200
+        })
+        response.set_etag(str(version))
+        response.headers["Cache-Control"] = "no-cache"
+        return response, 200
         
     except Exception as e:
         logger.error(f"Error retrieving farmers: {str(e)}")
@@ -335,48 +408,16 @@ def delete_farmer(farmer_id):
 
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    """Get database statistics"""
-    all_farmers = db.get_all_farmers()
-    
-    # Initialize default statistics
-    stats = {
-        "total_farmers": 0,
-        "average_age": 0,
-        "age_groups": {
-            "young": 0,
-            "prime": 0,
-            "experienced": 0,
-            "veteran": 0
-        },
-        "last_updated": db.data.get("last_updated"),
-        "next_available_id": db.data.get("next_id", 1)
-    }
-    
-    if all_farmers:
-        total_farmers = len(all_farmers)
-        average_age = sum(f["age"] for f in all_farmers) / total_farmers
-        
-        # Update statistics with actual data
-        stats.update({
-            "total_farmers": total_farmers,
-            "average_age": round(average_age, 1),
-            "age_groups": {
-                "young": len([f for f in all_farmers if f["age"] <= 25]),
-                "prime": len([f for f in all_farmers if f["age"] <= 40]),
-                "experienced": len([f for f in all_farmers if f["age"] <= 60]),
-                "veteran": len([f for f in all_farmers if f["age"] > 60])
-            }
-        })
-    
+    """Get database statistics (from running aggregates, without reading the farmer records)"""
     return jsonify({
         "status": "success",
-        "statistics": stats
+        "statistics": db.get_stats()
     }), 200
 
 @app.route('/api/greeting', methods=['GET'])
 def get_greeting():
     """Return a generic greeting message"""
-    total_farmers = len(db.get_all_farmers())
+    total_farmers = db.count()
     return jsonify({
         "message": "🌴 Welcome to the Coconut Farmers Community! 🥥",
         "description": f"Join our community of {total_farmers} coconut growers sharing knowledge and resources",
@@ -386,12 +427,11 @@ def get_greeting():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint with database status"""
-    total_farmers = len(db.get_all_farmers())
     return jsonify({
         "status": "healthy", 
         "service": "Coconut Farmer API",
         "database": "operational",
-        "total_farmers": total_farmers,
+        "total_farmers": db.count(),
         "timestamp": datetime.now().isoformat()
     }), 200
 
@@ -399,12 +439,13 @@ if __name__ == '__main__':
     print("🌴 Starting Coconut Farmer API Server...")
     print("📍 API endpoints available:")
     print("   POST   /api/farmer              - Register new farmer")
+    print("   POST   /api/farmers/bulk        - Register farmers from CSV or NDJSON")
     print("   PUT    /api/farmer/<id>         - Update existing farmer")
     print("   GET    /api/farmer/<id>         - Get specific farmer")
-    print("   GET    /api/farmers             - List all farmers (with filters)")
+    print("   GET    /api/farmers             - List farmers (filters, cursor pages, fields, ETag)")
     print("   DELETE /api/farmer/<id>         - Delete farmer")
     print("   GET    /api/stats               - Get statistics")
     print("   GET    /api/greeting            - Get welcome message")
     print("   GET    /api/health              - Health check")
-    print(f"💾 Data file: {db.filename}")
+    print(f"💾 Data file: {db.filename} ({type(db).__name__})")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
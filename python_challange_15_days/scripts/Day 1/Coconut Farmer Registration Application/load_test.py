@@ -0,0 +1,106 @@
+"""
+Concurrent registration load test for the farmer backend.
+
+Serves the Flask app on a threaded local server backed by a temporary data
+file, registers farmers from many client threads at once and checks that
+every registration got a distinct, gap-free ID and survives a restart.
+Runs once with one fsync per change and once with group commit:
+
+    python load_test.py --clients 32 --farmers 2000
+"""
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+WORKDIR = tempfile.mkdtemp(prefix="farmer_load_")
+# The backend opens farmers_data.json in the working directory on import
+_cwd = os.getcwd()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(WORKDIR)
+import flask_api_backend as backend  # noqa: E402
+from farmer_storage import LogStore  # noqa: E402
+os.chdir(_cwd)
+
+MODES = {
+    "fsync per change": {"commit_interval": 0, "max_batch": 1},
+    "group commit": {}
+}
+
+
+def register_all(url: str, names: list, results: list, errors: list):
+    session = requests.Session()
+    for name in names:
+        try:
+            response = session.post(f"{url}/api/farmer", json={"name": name, "age": 18 + len(name) % 60}, timeout=30)
+            if response.status_code == 200:
+                results.append((name, response.json()["farmer_id"]))
+            else:
+                errors.append(f"{name}: HTTP {response.status_code} {response.text[:100]}")
+        except requests.RequestException as e:
+            errors.append(f"{name}: {e}")
+
+
+def run_mode(label: str, store_options: dict, clients: int, farmers: int) -> float:
+    path = os.path.join(WORKDIR, label.replace(" ", "_") + ".json")
+    backend.db = backend.FarmerDatabase(path, **store_options)
+    server = make_server("127.0.0.1", 0, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    names = [f"Load Farmer {label} {i:06d}" for i in range(farmers)]
+    results, errors = [], []
+    threads = [
+        threading.Thread(target=register_all, args=(url, names[i::clients], results, errors))
+        for i in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+    server.shutdown()
+    backend.db.close()
+
+    ids = sorted(farmer_id for _, farmer_id in results)
+    assert not errors, f"{len(errors)} failed registrations, e.g. {errors[:3]}"
+    assert ids == list(range(1, farmers + 1)), "IDs are not unique and contiguous"
+
+    # Everything acknowledged must be there after a restart
+    reloaded = LogStore(path)
+    stored = {farmer["name"]: farmer["id"] for farmer in reloaded.data["farmers"].values()}
+    reloaded.close(compact=False)
+    assert stored == dict(results), "Reloaded data does not match the acknowledged registrations"
+
+    print(f"{label:>18}: {farmers / seconds:8.1f} registrations/s "
+          f"({farmers} farmers, {clients} clients, {seconds:.2f} s) - IDs 1..{farmers} unique, data intact")
+    return farmers / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent registration load test for the farmer API")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent client threads")
+    parser.add_argument("--farmers", type=int, default=2000, help="Registrations per run")
+    args = parser.parse_args()
+
+    # Per-request log lines would dominate the measurement
+    for name in (backend.logger.name, "farmer_database"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    try:
+        rates = {label: run_mode(label, options, args.clients, args.farmers) for label, options in MODES.items()}
+        print(f"Group commit speed-up: {rates['group commit'] / rates['fsync per change']:.1f}x")
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import requests
 import time
 import json
 from datetime import datetime
+from farmer_api_client import FarmerAPIClient
 
 # Page configuration
 st.set_page_config(
@@ -60,6 +61,13 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_api_client() -> FarmerAPIClient:
+    """One API client (connection pool and read cache) for every session and rerun"""
+    return FarmerAPIClient()
+
+api = get_api_client()
+
 def initialize_session_state():
     """Initialize session state variables"""
     defaults = {
@@ -77,24 +85,24 @@ def initialize_session_state():
 def check_api_health():
     """Check if the Flask API is running"""
     try:
-        response = requests.get("http://localhost:5000/api/health", timeout=5)
+        response = api.health()
         st.session_state.api_status = "healthy" if response.status_code == 200 else "unhealthy"
         if st.session_state.api_status == "healthy":
-            st.session_state.health_data = response.json()
+            st.session_state.health_data = response.data
     except requests.exceptions.RequestException:
         st.session_state.api_status = "unreachable"
 
 def load_all_farmers():
-    """Load all farmers from API"""
+    """Load all farmers from API (cached by the client and re-downloaded only when changed)"""
     try:
-        response = requests.get("http://localhost:5000/api/farmers", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            st.session_state.all_farmers = data.get("farmers", [])
-            return True
+        farmers = api.farmers()
     except requests.exceptions.RequestException:
         st.session_state.all_farmers = []
-    return False
+        return False
+    if farmers is None:
+        return False
+    st.session_state.all_farmers = farmers
+    return True
 
 def coconut_animation():
     """Display coconut falling animation"""
@@ -172,19 +180,15 @@ def show_registration_form():
             
             with st.spinner("Registering your farm..."):
                 try:
-                    response = requests.post(
-                        "http://localhost:5000/api/farmer",
-                        json={"name": name.strip(), "age": age},
-                        timeout=10
-                    )
+                    response = api.register_farmer(name.strip(), age)
                     
                     if response.status_code == 200:
                         st.session_state.submitted = True
-                        st.session_state.farmer_data = response.json()
+                        st.session_state.farmer_data = response.data
                         st.session_state.current_mode = "register"
                         st.rerun()
                     elif response.status_code == 409:
-                        error_data = response.json()
+                        error_data = response.data
                         st.warning(f"⚠️ {error_data['error']}")
                         st.info(f"Existing Farmer ID: {error_data['existing_farmer_id']}")
                         if st.button("Switch to Update Mode"):
@@ -192,7 +196,7 @@ def show_registration_form():
                             st.session_state.selected_farmer_id = error_data['existing_farmer_id']
                             st.rerun()
                     else:
-                        error_data = response.json()
+                        error_data = response.data
                         st.error(f"❌ Registration failed: {error_data.get('error', 'Unknown error')}")
                         
                 except requests.exceptions.RequestException as e:
@@ -225,9 +229,9 @@ def show_update_form():
     
     # Get current farmer data
     try:
-        response = requests.get(f"http://localhost:5000/api/farmer/{selected_farmer_id}", timeout=5)
+        response = api.farmer(selected_farmer_id)
         if response.status_code == 200:
-            current_data = response.json()["farmer_data"]
+            current_data = response.data["farmer_data"]
         else:
             st.error("Failed to load farmer data")
             return
@@ -284,19 +288,15 @@ def show_update_form():
             
             with st.spinner("Updating farmer data..."):
                 try:
-                    response = requests.put(
-                        f"http://localhost:5000/api/farmer/{selected_farmer_id}",
-                        json=update_data,
-                        timeout=10
-                    )
+                    response = api.update_farmer(selected_farmer_id, update_data)
                     
                     if response.status_code == 200:
                         st.session_state.submitted = True
-                        st.session_state.farmer_data = response.json()
+                        st.session_state.farmer_data = response.data
                         st.session_state.current_mode = "update"
                         st.rerun()
                     else:
-                        error_data = response.json()
+                        error_data = response.data
                         st.error(f"❌ Update failed: {error_data.get('error', 'Unknown error')}")
                         
                 except requests.exceptions.RequestException as e:
@@ -365,9 +365,9 @@ def show_success_message():
 def show_database_stats():
     """Show database statistics in sidebar"""
     try:
-        response = requests.get("http://localhost:5000/api/stats", timeout=5)
+        response = api.stats()
         if response.status_code == 200:
-            data = response.json()
+            data = response.data
             
             # FIXED: Check if 'statistics' key exists in response
             if 'statistics' in data:
@@ -0,0 +1,103 @@
+import random
+
+from farmer_database import FarmerDatabase
+from farmer_index import FarmerIndex
+
+
+def open_database(tmp_path):
+    return FarmerDatabase(str(tmp_path / "farmers.json"), commit_interval=0, compact_interval=3600)
+
+
+def register(db, name, age, experience_level="Beginner"):
+    return db.add_farmer({"name": name, "age": age, "experience_level": experience_level,
+                          "coconut_type": "Tall"})
+
+
+def test_update_moves_name_and_age_entries(tmp_path):
+    db = open_database(tmp_path)
+    farmer_id = register(db, "Ravi Kumar", 30)
+    other_id = register(db, "Meena", 55)
+
+    assert db.update_farmer(farmer_id, {"name": "Suresh Babu", "age": 62})
+    assert db.index.find_name("ravi kumar") is None
+    assert db.index.find_name("SURESH BABU") == farmer_id
+    assert [f["id"] for f in db.search_farmers(name="ravi")] == []
+    assert [f["id"] for f in db.search_farmers(name="babu")] == [farmer_id]
+    assert [f["id"] for f in db.search_farmers(min_age=25, max_age=35)] == []
+    assert [f["id"] for f in db.search_farmers(min_age=60)] == [farmer_id]
+    assert [f["id"] for f in db.search_farmers(min_age=50)] == [farmer_id, other_id]
+    db.close()
+
+
+def test_delete_removes_every_entry(tmp_path):
+    db = open_database(tmp_path)
+    farmer_id = register(db, "Lakshmi", 41)
+    register(db, "Gopal", 41)
+
+    assert db.delete_farmer(farmer_id)
+    assert not db.delete_farmer(farmer_id)
+    assert db.index.find_name("Lakshmi") is None
+    assert farmer_id not in db.index.ids
+    assert all(farmer_id != entry_id for _, entry_id in db.index.ages)
+    assert all(farmer_id not in postings for postings in db.index.grams.values())
+    assert [f["name"] for f in db.search_farmers(min_age=41, max_age=41)] == ["Gopal"]
+
+    # The name is free again
+    assert register(db, "lakshmi", 29) != farmer_id
+    db.close()
+
+
+def expected_ids(farmers, name=None, min_age=None, max_age=None):
+    return sorted(
+        farmer["id"] for farmer in farmers
+        if (name is None or name.lower() in farmer["name"].lower())
+        and (min_age is None or farmer["age"] >= min_age)
+        and (max_age is None or farmer["age"] <= max_age)
+    )
+
+
+def test_index_matches_state_after_random_changes(tmp_path):
+    rng = random.Random(7)
+    syllables = ["ra", "vi", "ku", "mar", "la", "ksh", "mi", "go", "pal", "an", "na"]
+    db = open_database(tmp_path)
+
+    for _ in range(600):
+        farmers = db.get_all_farmers()
+        roll = rng.random()
+        name = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title()
+        if roll < 0.5 or not farmers:
+            if db.index.find_name(name) is None:
+                register(db, name, rng.randint(18, 80))
+        elif roll < 0.8:
+            farmer_id = rng.choice(farmers)["id"]
+            changes = {"age": rng.randint(18, 80)}
+            if db.index.find_name(name) is None:
+                changes["name"] = name
+            db.update_farmer(farmer_id, changes)
+        else:
+            db.delete_farmer(rng.choice(farmers)["id"])
+
+    farmers = db.get_all_farmers()
+    assert len(db.index) == len(farmers) == db.count()
+
+    # The incrementally maintained index equals one built from scratch
+    rebuilt = FarmerIndex(farmers)
+    assert db.index.entries == rebuilt.entries
+    assert db.index.ids_by_name == rebuilt.ids_by_name
+    assert db.index.ids == rebuilt.ids
+    assert db.index.ages == rebuilt.ages
+    assert db.index.grams == rebuilt.grams
+
+    for _ in range(200):
+        name = rng.choice([None, rng.choice(syllables), rng.choice(syllables)[:1], "".join(rng.sample(syllables, 2))])
+        min_age = rng.choice([None, rng.randint(18, 80)])
+        max_age = rng.choice([None, rng.randint(18, 80)])
+        assert db.index.search(name, min_age, max_age) == expected_ids(farmers, name, min_age, max_age)
+        ids, total = db.index.page(name, min_age, max_age, after=rng.choice([None, 50, 150]), limit=10)
+        assert total == len(expected_ids(farmers, name, min_age, max_age))
+    db.close()
+
+    # And the state survives a restart
+    reopened = open_database(tmp_path)
+    assert reopened.get_all_farmers() == farmers
+    reopened.close()
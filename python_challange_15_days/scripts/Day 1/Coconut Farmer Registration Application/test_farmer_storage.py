@@ -0,0 +1,100 @@
+import json
+import os
+
+from farmer_storage import LogStore, log_segments, recover_state
+
+
+def farmer(farmer_id, name, age=30, experience_level="Beginner"):
+    return {"id": farmer_id, "name": name, "age": age, "experience_level": experience_level}
+
+
+def add(store, farmer_id, name, age=30):
+    entry = store.commit({"op": "add", "id": farmer_id, "farmer": farmer(farmer_id, name, age)})
+    store.wait_durable(entry["seq"])
+    return entry
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = str(tmp_path / "farmers.json")
+    store = LogStore(path, commit_interval=0)
+    add(store, 1, "Asha")
+    add(store, 2, "Bala")
+    store.close(compact=False)
+
+    (_, segment), = log_segments(path)
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"seq":3,"ts":"2024-01-01T00:00:00","op":"add","id":3,"farmer":{"id":3,"na')
+
+    data, seq, generation, replayed = recover_state(path)
+    assert sorted(data["farmers"]) == ["1", "2"]
+    assert (seq, replayed) == (2, 2)
+
+    # A reopened store appends to a new segment, never after the torn line
+    store = LogStore(path, commit_interval=0)
+    add(store, 3, "Chitra")
+    store.close(compact=False)
+    assert len(log_segments(path)) == 2
+    data, seq, _, _ = recover_state(path)
+    assert sorted(data["farmers"]) == ["1", "2", "3"]
+    assert data["aggregates"]["count"] == 3
+
+
+def test_snapshot_log_seq_skips_covered_entries(tmp_path):
+    path = str(tmp_path / "farmers.json")
+    store = LogStore(path, commit_interval=0)
+    add(store, 1, "Asha", age=20)
+    add(store, 2, "Bala", age=40)
+    store.close(compact=False)
+
+    # A snapshot that already contains both changes, e.g. written just before a crash
+    # that left the segment behind
+    data, seq, _, _ = recover_state(path)
+    data["farmers"]["1"]["age"] = 99
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**data, "log_seq": seq}, f)
+
+    data, seq, _, replayed = recover_state(path)
+    assert replayed == 0
+    assert seq == 2
+    assert data["farmers"]["1"]["age"] == 99
+
+    store = LogStore(path, commit_interval=0)
+    entry = store.commit({"op": "update", "id": 2, "fields": {"age": 41}})
+    store.wait_durable(entry["seq"])
+    store.close(compact=False)
+
+    data, seq, _, replayed = recover_state(path)
+    assert (seq, replayed) == (3, 1)
+    assert data["farmers"]["1"]["age"] == 99
+    assert data["farmers"]["2"]["age"] == 41
+
+
+def test_compaction_deletes_covered_segments(tmp_path):
+    path = str(tmp_path / "farmers.json")
+    store = LogStore(path, commit_interval=0, compact_interval=3600)
+    for farmer_id in range(1, 6):
+        add(store, farmer_id, f"Farmer {farmer_id}")
+    old_segments = log_segments(path)
+
+    assert store.compact()
+    assert store.log_size() == 0
+    remaining = log_segments(path)
+    assert len(remaining) == 1
+    assert remaining[0][0] > old_segments[-1][0]
+    assert not any(os.path.exists(segment) for _, segment in old_segments)
+
+    add(store, 6, "Farmer 6")
+    store.close(compact=False)
+
+    data, seq, _, replayed = recover_state(path)
+    assert sorted(data["farmers"], key=int) == [str(farmer_id) for farmer_id in range(1, 7)]
+    assert (seq, replayed) == (6, 1)
+    assert data["aggregates"]["count"] == 6
+
+
+def test_compaction_is_skipped_without_changes(tmp_path):
+    path = str(tmp_path / "farmers.json")
+    store = LogStore(path, commit_interval=0)
+    assert not store.compact()
+    store.close()
+    assert not os.path.exists(path)
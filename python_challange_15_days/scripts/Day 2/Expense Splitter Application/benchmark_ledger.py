@@ -0,0 +1,90 @@
+"""
+Benchmark the expense ledger on a large group.
+
+Generates random expenses split by weights between random members, then
+times recording them, computing every balance and settling. Checks that
+the balances sum to zero, that the transfers settle everyone exactly and
+that a second run gives identical transfers:
+
+    python benchmark_ledger.py --expenses 100000 --people 10000
+"""
+import argparse
+import hashlib
+import time
+
+import numpy as np
+
+from expense_ledger import ExpenseLedger
+
+
+def build(expenses: int, people: int, max_split: int, seed: int, per_expense: bool) -> ExpenseLedger:
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(100, 500000, size=expenses)  # 1.00 to 5,000.00
+    sizes = rng.integers(2, max_split + 1, size=expenses)
+    share_expense = np.repeat(np.arange(expenses), sizes)
+    share_person = rng.integers(0, people, size=len(share_expense))
+    # Half the expenses are split equally, the rest by weights from 1 to 5
+    share_weight = np.where(share_expense % 2 == 0, 1, rng.integers(1, 6, size=len(share_expense)))
+    payer = rng.integers(0, people, size=expenses)
+
+    ledger = ExpenseLedger()
+    for index in range(people):
+        ledger.person(f"Member {index:05d}")
+    if not per_expense:
+        ledger.add_expense_arrays(amounts, share_expense, share_person, share_weight, payer=payer)
+        return ledger
+
+    # The same expenses through add_expense(), one call each (a member may appear twice, so weights are summed)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    for expense in range(expenses):
+        split = {}
+        for row in range(starts[expense], starts[expense] + sizes[expense]):
+            key = ledger.people[share_person[row]]
+            split[key] = split.get(key, 0) + int(share_weight[row])
+        ledger.add_expense(int(amounts[expense]) / 100, split, method="weights",
+                           paid_by=ledger.people[payer[expense]])
+    return ledger
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def run(expenses: int, people: int, max_split: int, seed: int, per_expense: bool) -> str:
+    seconds, ledger = timed(lambda: build(expenses, people, max_split, seed, per_expense))
+    how = "add_expense()" if per_expense else "add_expense_arrays()"
+    print(f"record {expenses:,} expenses with {how}: {seconds:8.3f} s")
+
+    seconds, balances = timed(ledger.balances)
+    print(f"split and balance {len(ledger.people):,} people:   {seconds:8.3f} s")
+    seconds, (debtor, creditor, cents) = timed(ledger.settlement_arrays)
+    print(f"settle:                            {seconds:8.3f} s ({len(cents):,} transfers)")
+
+    net = balances["net"].copy()
+    assert net.sum() == 0, "Balances do not sum to zero"
+    np.add.at(net, debtor, cents)
+    np.add.at(net, creditor, -cents)
+    assert not net.any(), "Transfers do not settle every balance"
+    digest = hashlib.sha256(np.stack([debtor, creditor, cents]).tobytes()).hexdigest()[:16]
+    print(f"everyone settled exactly; transfers digest {digest}")
+    return digest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the integer-cents expense ledger")
+    parser.add_argument("--expenses", type=int, default=100000)
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--max-split", type=int, default=8, help="Most people sharing one expense")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-expense", action="store_true", help="Record expenses one add_expense() call at a time")
+    args = parser.parse_args()
+    first = run(args.expenses, args.people, args.max_split, args.seed, args.per_expense)
+    second = run(args.expenses, args.people, args.max_split, args.seed, args.per_expense)
+    assert first == second, "Two runs gave different transfers"
+    print("second run identical")
+
+
+if __name__ == "__main__":
+    main()
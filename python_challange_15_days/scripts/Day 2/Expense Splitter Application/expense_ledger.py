@@ -0,0 +1,306 @@
+"""
+Integer-cents ledger for the expense splitter.
+
+Expenses are recorded in whole cents and split equally, by exact amounts,
+by percentages or by weights. Every split is rounded with the largest
+remainder method, so the shares of an expense always add up to its amount
+and nobody is off by a cent. Balances are computed for all expenses at once
+with NumPy, and settlements are exact and reproducible: the same expenses
+always give the same transfers.
+
+    ledger = ExpenseLedger()
+    ledger.add_expense(1200, ["Asha", "Ben", "Chen"], paid_by="Asha")
+    ledger.add_expense(90.50, {"Ben": 2, "Chen": 1}, method="weights", paid_by={"Ben": 50, "Chen": 40.50})
+    ledger.settlements()
+    # [{'from': 'Ben', 'to': 'Asha', 'amount': 41033}, {'from': 'Chen', 'to': 'Asha', 'amount': 38967}]
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Dict, Hashable, Iterable, List, Union
+
+import numpy as np
+
+SPLIT_METHODS = ("equal", "exact", "percent", "weights")
+# Percentages and weights are used to this many decimal places
+WEIGHT_PLACES = 6
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def _decimal(value) -> Decimal:
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Not a number: {value!r}")
+    if not number.is_finite():
+        raise ValueError(f"Not a finite number: {value!r}")
+    return number
+
+
+def to_cents(amount) -> int:
+    """Currency amount rounded to whole cents (half up), without float error"""
+    return int((_decimal(amount) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def integer_weights(values: Iterable) -> List[int]:
+    """Non-negative decimal weights (or percentages) scaled to integers with the same ratios"""
+    scale = Decimal(10) ** WEIGHT_PLACES
+    weights = [int((_decimal(value) * scale).quantize(Decimal(1), rounding=ROUND_HALF_UP)) for value in values]
+    if any(weight < 0 for weight in weights):
+        raise ValueError("Weights cannot be negative")
+    return weights
+
+
+def allocate(totals, expense, weights) -> np.ndarray:
+    """
+    Split each total in cents over its rows in proportion to their integer weights.
+
+    expense[i] is the index into totals that row i belongs to. Every row
+    gets floor(total * weight / total weight); the cents left over go one
+    each to the rows with the largest remainders, earlier rows first on a
+    tie. Each expense's shares add up to its total exactly.
+    """
+    totals = np.asarray(totals, dtype=np.int64)
+    expense = np.asarray(expense, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.int64)
+    if not len(weights):
+        return np.zeros(0, dtype=np.int64)
+    if int(totals.max(initial=0)) * int(weights.max()) > INT64_MAX:
+        raise ValueError("Amounts and weights too large to split exactly")
+
+    weight_sums = np.zeros(len(totals), dtype=np.int64)
+    np.add.at(weight_sums, expense, weights)
+    if (weight_sums[expense] == 0).any():
+        raise ValueError("Every expense needs a positive total weight")
+
+    shares, remainders = np.divmod(totals[expense] * weights, weight_sums[expense])
+    allocated = np.zeros(len(totals), dtype=np.int64)
+    np.add.at(allocated, expense, shares)
+    leftover = totals - allocated
+
+    # Rank rows within their expense by remainder (largest first), then by position
+    order = np.lexsort((np.arange(len(weights)), -remainders, expense))
+    grouped = expense[order]
+    rank = np.arange(len(order)) - np.searchsorted(grouped, grouped)
+    shares[order[rank < leftover[grouped]]] += 1
+    return shares
+
+
+def settle_balances(net) -> tuple:
+    """
+    Transfers that settle integer net balances: (debtor, creditor, cents) arrays.
+
+    The largest debtor pays the largest creditor until one of them is
+    settled, then the next in line takes over (ties in index order), which
+    needs at most one transfer fewer than there are people with a balance.
+    The greedy walk is computed at once by merging where each creditor's and
+    each debtor's running totals end. If the balances do not sum to zero,
+    the side with more is settled only as far as the other side reaches.
+    """
+    net = np.asarray(net, dtype=np.int64)
+    creditors = np.flatnonzero(net > 0)
+    debtors = np.flatnonzero(net < 0)
+    if not len(creditors) or not len(debtors):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    creditors = creditors[np.lexsort((creditors, -net[creditors]))]
+    debtors = debtors[np.lexsort((debtors, net[debtors]))]
+
+    credit_ends = np.cumsum(net[creditors])
+    debt_ends = np.cumsum(-net[debtors])
+    ends = np.union1d(credit_ends, debt_ends)
+    ends = ends[ends <= min(credit_ends[-1], debt_ends[-1])]
+    starts = np.concatenate(([0], ends[:-1]))
+    creditor = creditors[np.searchsorted(credit_ends, starts, side="right")]
+    debtor = debtors[np.searchsorted(debt_ends, starts, side="right")]
+    return debtor, creditor, ends - starts
+
+
+class ExpenseLedger:
+    """
+    Many expenses between many people, in integer cents.
+
+    People are any hashable keys (usually names) and are numbered in the
+    order they first appear. add_expense() takes one expense at a time;
+    add_expense_arrays() takes many at once as index arrays. Rounding and
+    balances are computed together when they are first asked for.
+    """
+
+    def __init__(self):
+        self.people: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+        self.amounts: List[int] = []
+        self.descriptions: List[str] = []
+        # Rows still in Python lists, and rows already in array chunks:
+        # weighted (expense, person, weight), fixed (expense, person, cents), paid (person, cents)
+        self._pending = {"weighted": ([], [], []), "fixed": ([], [], []), "paid": ([], [])}
+        self._chunks = {"weighted": [], "fixed": [], "paid": []}
+        self._balances = None
+
+    def person(self, key: Hashable) -> int:
+        """Index of a person, added if new"""
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.people)
+            self.people.append(key)
+        return index
+
+    def _changed(self):
+        self._balances = None
+
+    def add_payment(self, person: Hashable, amount) -> None:
+        """Money a person paid towards the group's expenses"""
+        cents = to_cents(amount)
+        if cents < 0:
+            raise ValueError("Payments cannot be negative")
+        persons, paid = self._pending["paid"]
+        persons.append(self.person(person))
+        paid.append(cents)
+        self._changed()
+
+    def add_expense(self, amount, split: Union[Iterable, Dict], method: str = "equal",
+                    paid_by: Union[Hashable, Dict, None] = None, description: str = "") -> int:
+        """
+        Record an expense and who owes it; returns its index.
+
+        split is a list of people for "equal", or maps people to their
+        amount ("exact", must add up to amount), percentage ("percent", must
+        add up to 100) or weight ("weights"). paid_by is one person who paid
+        it all, or maps people to what they paid (must add up to amount);
+        leave it out to record payments with add_payment().
+        """
+        if method not in SPLIT_METHODS:
+            raise ValueError(f"Unknown split method {method!r}; use one of {', '.join(SPLIT_METHODS)}")
+        cents = to_cents(amount)
+        if cents < 0:
+            raise ValueError("Amounts cannot be negative")
+
+        if method == "equal":
+            split = list(split)
+            if len(set(split)) != len(split):
+                raise ValueError("Each person can only be listed once")
+            values = [1] * len(split)
+        else:
+            split, values = list(split), list(split.values())
+        if not split:
+            raise ValueError("An expense must be split between at least one person")
+
+        if method == "exact":
+            shares = [to_cents(value) for value in values]
+            if any(share < 0 for share in shares) or sum(shares) != cents:
+                raise ValueError(f"Exact shares must be non-negative and add up to {cents / 100:.2f}")
+            rows, values = self._pending["fixed"], shares
+        else:
+            if method == "percent" and sum(_decimal(value) for value in values) != 100:
+                raise ValueError("Percentages must add up to 100")
+            values = integer_weights(values)
+            if not sum(values):
+                raise ValueError("Weights must not all be zero")
+            rows = self._pending["weighted"]
+
+        if paid_by is not None:
+            payments = paid_by if isinstance(paid_by, dict) else {paid_by: amount}
+            if sum(to_cents(value) for value in payments.values()) != cents:
+                raise ValueError(f"Payments must add up to {cents / 100:.2f}")
+
+        expense = len(self.amounts)
+        self.amounts.append(cents)
+        self.descriptions.append(description)
+        expenses, persons, row_values = rows
+        for key, value in zip(split, values):
+            expenses.append(expense)
+            persons.append(self.person(key))
+            row_values.append(value)
+        if paid_by is not None:
+            for key, value in payments.items():
+                self.add_payment(key, value)
+        self._changed()
+        return expense
+
+    def add_expense_arrays(self, amounts, share_expense, share_person, share_weight,
+                           payer=None) -> None:
+        """
+        Record many expenses at once, each split by integer weights.
+
+        amounts are in cents; share row i gives expense share_expense[i]
+        (counted from 0 within this call) to person share_person[i] (an index
+        from person()) with weight share_weight[i]. payer[j], if given, is
+        the person who paid expense j in full.
+        """
+        amounts = np.asarray(amounts, dtype=np.int64)
+        share_expense = np.asarray(share_expense, dtype=np.int64)
+        share_person = np.asarray(share_person, dtype=np.int64)
+        share_weight = np.asarray(share_weight, dtype=np.int64)
+        if (amounts < 0).any() or (share_weight < 0).any():
+            raise ValueError("Amounts and weights cannot be negative")
+        if len(share_person) and not 0 <= share_person.min() <= share_person.max() < len(self.people):
+            raise ValueError("Share rows refer to unknown people")
+        if len(share_expense) and not 0 <= share_expense.min() <= share_expense.max() < len(amounts):
+            raise ValueError("Share rows refer to unknown expenses")
+
+        if payer is not None:
+            payer = np.asarray(payer, dtype=np.int64)
+            if len(payer) != len(amounts) or (len(payer) and not 0 <= payer.min() <= payer.max() < len(self.people)):
+                raise ValueError("Need one known payer per expense")
+
+        self._flush()
+        offset = len(self.amounts)
+        self.amounts.extend(amounts.tolist())
+        self.descriptions.extend([""] * len(amounts))
+        self._chunks["weighted"].append((share_expense + offset, share_person, share_weight))
+        if payer is not None:
+            self._chunks["paid"].append((payer, amounts))
+        self._changed()
+
+    def _flush(self):
+        """Move rows from the Python lists into array chunks"""
+        for kind, columns in self._pending.items():
+            if columns[0]:
+                self._chunks[kind].append(tuple(np.array(column, dtype=np.int64) for column in columns))
+                for column in columns:
+                    column.clear()
+
+    def _rows(self, kind: str) -> tuple:
+        chunks = self._chunks[kind]
+        if len(chunks) > 1:
+            self._chunks[kind] = chunks = [tuple(np.concatenate(column) for column in zip(*chunks))]
+        if chunks:
+            return chunks[0]
+        return tuple(np.zeros(0, dtype=np.int64) for _ in range(2 if kind == "paid" else 3))
+
+    def balances(self) -> Dict[str, np.ndarray]:
+        """Per person (in people order) cents paid, cents owed and net (paid - owed)"""
+        if self._balances is None:
+            self._flush()
+            count = len(self.people)
+            owed = np.zeros(count, dtype=np.int64)
+            expense, person, weight = self._rows("weighted")
+            np.add.at(owed, person, allocate(self.amounts, expense, weight))
+            _, person, cents = self._rows("fixed")
+            np.add.at(owed, person, cents)
+            paid = np.zeros(count, dtype=np.int64)
+            person, cents = self._rows("paid")
+            np.add.at(paid, person, cents)
+            self._balances = {"paid": paid, "owed": owed, "net": paid - owed}
+        return self._balances
+
+    @property
+    def discrepancy(self) -> int:
+        """Cents paid minus cents owed over all expenses; 0 when every expense is paid for"""
+        balances = self.balances()
+        return int(balances["paid"].sum() - balances["owed"].sum())
+
+    def settlement_arrays(self) -> tuple:
+        """(debtor, creditor, cents) arrays of the transfers that settle the ledger"""
+        return settle_balances(self.balances()["net"])
+
+    def settlements(self) -> List[Dict]:
+        """Transfers that settle the ledger, as {"from", "to", "amount" (cents)}"""
+        debtor, creditor, cents = self.settlement_arrays()
+        return [
+            {"from": self.people[source], "to": self.people[target], "amount": amount}
+            for source, target, amount in zip(debtor.tolist(), creditor.tolist(), cents.tolist())
+        ]
+
+
+def equal_shares(amount, count: int) -> List[int]:
+    """An amount split equally between count people, in cents that add up to it exactly"""
+    return allocate([to_cents(amount)], [0] * count, [1] * count).tolist()
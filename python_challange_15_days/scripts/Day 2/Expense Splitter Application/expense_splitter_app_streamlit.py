@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import json
+from expense_ledger import ExpenseLedger, equal_shares
 
 # Page configuration
 st.set_page_config(
@@ -61,66 +62,52 @@ if 'expense_history' not in st.session_state:
     st.session_state.expense_history = []
 
 def calculate_split(total_amount, people_data):
-    """Calculate expense split and settlements"""
+    """Calculate expense split and settlements (in whole cents, see expense_ledger.py)"""
     num_people = len(people_data)
     per_person = total_amount / num_people
     
+    # People are keyed by position, so two people with the same name stay separate
+    ledger = ExpenseLedger()
+    ledger.add_expense(total_amount, range(num_people))
+    for i, person in enumerate(people_data):
+        ledger.add_payment(i, person['contribution'])
+    cents = ledger.balances()
+    
     # Calculate balances
     balances = []
-    total_paid = 0
-    
-    for person in people_data:
-        name = person['name']
-        paid = person['contribution']
-        total_paid += paid
-        balance = paid - per_person
+    for i, person in enumerate(people_data):
+        balance = int(cents['net'][i])
         
         status = 'settled'
-        if balance > 0.01:
+        if balance > 0:
             status = 'credit'
-        elif balance < -0.01:
+        elif balance < 0:
             status = 'debt'
         
         balances.append({
-            'name': name,
-            'paid': paid,
-            'should_pay': per_person,
-            'balance': balance,
+            'name': person['name'],
+            'paid': int(cents['paid'][i]) / 100,
+            'should_pay': int(cents['owed'][i]) / 100,
+            'balance': balance / 100,
             'status': status
         })
     
-    # Calculate settlements (minimize transactions)
-    creditors = sorted([b for b in balances if b['balance'] > 0.01], 
-                      key=lambda x: x['balance'], reverse=True)
-    debtors = sorted([b for b in balances if b['balance'] < -0.01], 
-                     key=lambda x: x['balance'])
-    
-    settlements = []
-    creditors = [{**c} for c in creditors]
-    debtors = [{**d} for d in debtors]
-    
-    ci, di = 0, 0
-    while ci < len(creditors) and di < len(debtors):
-        amount = min(creditors[ci]['balance'], -debtors[di]['balance'])
-        settlements.append({
-            'from': debtors[di]['name'],
-            'to': creditors[ci]['name'],
-            'amount': amount
-        })
-        creditors[ci]['balance'] -= amount
-        debtors[di]['balance'] += amount
-        
-        if abs(creditors[ci]['balance']) < 0.01:
-            ci += 1
-        if abs(debtors[di]['balance']) < 0.01:
-            di += 1
+    # Calculate settlements (largest debts against largest credits)
+    settlements = [
+        {
+            'from': people_data[settlement['from']]['name'],
+            'to': people_data[settlement['to']]['name'],
+            'amount': settlement['amount'] / 100
+        }
+        for settlement in ledger.settlements()
+    ]
     
     return {
         'per_person': per_person,
-        'total_paid': total_paid,
+        'total_paid': int(cents['paid'].sum()) / 100,
         'balances': balances,
         'settlements': settlements,
-        'is_balanced': abs(total_paid - total_amount) < 0.01
+        'is_balanced': ledger.discrepancy == 0
     }
 
 def export_to_text(total_amount, results, expense_name):
@@ -324,9 +311,9 @@ if num_people > 0:
         else:
             # For equal split, set contributions
             if split_type == "Equal Split":
-                per_person = total_amount / num_people
-                for person in people_data:
-                    person['contribution'] = per_person
+                # Whole cents that add up to the total (e.g. 100 / 3 -> 33.34, 33.33, 33.33)
+                for person, share in zip(people_data, equal_shares(total_amount, num_people)):
+                    person['contribution'] = share / 100
             
             results = calculate_split(total_amount, people_data)
             
@@ -355,7 +342,7 @@ if num_people > 0:
                 st.metric(
                     "Total Paid",
                     f"{currency_symbol}{results['total_paid']:.2f}",
-                    delta=f"{results['total_paid'] - total_amount:.2f}" if abs(results['total_paid'] - total_amount) > 0.01 else "Balanced"
+                    delta="Balanced" if results['is_balanced'] else f"{results['total_paid'] - total_amount:.2f}"
                 )
             
             with metric_col4:
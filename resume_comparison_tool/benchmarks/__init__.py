@@ -0,0 +1 @@
+"""Synthetic-corpus benchmarks for the resume comparison tool (run with `python -m benchmarks`)"""
@@ -0,0 +1,3 @@
+from .run_benchmarks import main
+
+main()
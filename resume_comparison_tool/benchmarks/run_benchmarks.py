@@ -0,0 +1,345 @@
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import socket
+import platform
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import requests
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from text_extraction import SUPPORTED_FORMATS, extract_files, get_content_hash
+from similarity_engine import SIMILARITY_BACKENDS, find_similar_pairs
+from resume_comparison import ResumeComparator
+from .synthetic_corpus import FORMATS, generate_corpus
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None where the resource module is missing)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_isolated(func, *args, **kwargs):
+    """Run func in a fresh process so its peak memory is measured on its own"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(func, *args, **kwargs).result()
+
+
+def pair_metrics(predicted, expected):
+    """Precision, recall and F1 of predicted name pairs against ground-truth pairs"""
+    predicted = {tuple(sorted(pair)) for pair in predicted}
+    expected = {tuple(sorted(pair)) for pair in expected}
+    true_positives = len(predicted & expected)
+    precision = true_positives / len(predicted) if predicted else 1.0
+    recall = true_positives / len(expected) if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'f1': round(f1, 4),
+        'true_positives': true_positives,
+        'false_positives': len(predicted) - true_positives,
+        'false_negatives': len(expected) - true_positives
+    }
+
+
+def corpus_paths(corpus_dir):
+    return sorted(
+        os.path.join(corpus_dir, name) for name in os.listdir(corpus_dir)
+        if os.path.splitext(name)[1].lower() in SUPPORTED_FORMATS
+    )
+
+
+def bench_hashing(paths):
+    """MD5 throughput over the corpus bytes (files already read into memory)"""
+    contents = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            contents.append(f.read())
+    total_bytes = sum(len(content) for content in contents)
+
+    start = time.perf_counter()
+    for content in contents:
+        get_content_hash(content)
+    elapsed = time.perf_counter() - start
+    return {
+        'files': len(contents),
+        'megabytes': round(total_bytes / 1e6, 3),
+        'seconds': round(elapsed, 4),
+        'megabytes_per_second': round(total_bytes / 1e6 / elapsed, 1) if elapsed else None
+    }
+
+
+def bench_extraction(paths, workers):
+    """Extraction throughput per format, and for the whole corpus cold and with a warm cache"""
+    results = {'workers': workers, 'by_format': {}}
+    for suffix in sorted(SUPPORTED_FORMATS):
+        subset = [path for path in paths if path.lower().endswith(suffix)]
+        if not subset:
+            continue
+        start = time.perf_counter()
+        errors = sum(1 for result in extract_files(subset, workers=workers) if result['error'])
+        elapsed = time.perf_counter() - start
+        results['by_format'][suffix.lstrip('.')] = {
+            'files': len(subset),
+            'errors': errors,
+            'seconds': round(elapsed, 3),
+            'files_per_second': round(len(subset) / elapsed, 1)
+        }
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, 'cache.db')
+        for label in ('cold_cache', 'warm_cache'):
+            start = time.perf_counter()
+            for _ in extract_files(paths, workers=workers, cache_path=cache_path):
+                pass
+            elapsed = time.perf_counter() - start
+            results[label] = {
+                'files': len(paths),
+                'seconds': round(elapsed, 3),
+                'files_per_second': round(len(paths) / elapsed, 1)
+            }
+    return results
+
+
+def bench_similarity(paths, expected_pairs, thresholds, backends, workers):
+    """Pairwise comparison time and precision/recall per backend, LSH setting and threshold"""
+    names, texts = [], []
+    for result in extract_files(paths, workers=workers):
+        names.append(os.path.basename(result['path']))
+        texts.append(result['text'])
+
+    results = []
+    for backend in backends:
+        for use_lsh in ((True, False) if backend == 'sequence' else (False,)):
+            for threshold in thresholds:
+                start = time.perf_counter()
+                pairs, stats = find_similar_pairs(names, texts, threshold, use_lsh=use_lsh, backend=backend)
+                elapsed = time.perf_counter() - start
+                results.append({
+                    'backend': backend,
+                    'use_lsh': use_lsh,
+                    'lsh_skipped': stats.get('lsh_skipped', False),
+                    'threshold': threshold,
+                    'seconds': round(elapsed, 3),
+                    'total_pairs': stats['total_pairs'],
+                    'candidate_pairs': stats['candidate_pairs'],
+                    'skipped_by_length': stats.get('skipped_by_length', 0),
+                    'pairs_found': len(pairs),
+                    **pair_metrics([(pair['file1'], pair['file2']) for pair in pairs], expected_pairs)
+                })
+    return results
+
+
+def _run_comparator(corpus_dir, threshold, workers, out_of_core):
+    start = time.perf_counter()
+    comparator = ResumeComparator(corpus_dir, workers=workers, use_cache=False, out_of_core=out_of_core)
+    with contextlib.redirect_stdout(io.StringIO()):
+        comparator.load_resumes()
+        loaded = time.perf_counter()
+        pairs = comparator.compare_resumes(similarity_threshold=threshold)
+    finished = time.perf_counter()
+    comparator.close()
+    return {
+        'load_seconds': round(loaded - start, 3),
+        'compare_seconds': round(finished - loaded, 3),
+        'pairs': [(pair['file1'], pair['file2']) for pair in pairs],
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def bench_comparator(corpus_dir, expected_pairs, threshold, workers):
+    """End-to-end ResumeComparator runs (in memory and out of core), each in its own process"""
+    results = []
+    for out_of_core in (False, True):
+        run = run_isolated(_run_comparator, corpus_dir, threshold, workers, out_of_core)
+        pairs = run.pop('pairs')
+        results.append({
+            'out_of_core': out_of_core,
+            'threshold': threshold,
+            **run,
+            'pairs_found': len(pairs),
+            **pair_metrics(pairs, expected_pairs)
+        })
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _process_tree_peak_rss_mb(pid):
+    """Sum of VmHWM over a process and its children (Linux only, else None)"""
+    total_kb = 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        total_kb += int(line.split()[1])
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pending.extend(int(child) for child in f.read().split())
+    except OSError:
+        return None
+    return round(total_kb / 1024, 1)
+
+
+def bench_api(paths, expected_pairs, threshold, backends, workers):
+    """Time POST /compare-resumes against a local uvicorn server, per backend"""
+    port = _free_port()
+    data_dir = tempfile.mkdtemp(prefix='resume_bench_')
+    env = dict(os.environ, RESUME_DATA_DIR=data_dir, RESUME_CPU_TIME_LIMIT='3600')
+    if workers:
+        env['RESUME_POOL_WORKERS'] = str(workers)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=SCRIPTS_DIR, env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    results = []
+    try:
+        for _ in range(100):
+            try:
+                if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                    break
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.2)
+        else:
+            raise RuntimeError("API server did not start")
+
+        for backend in backends:
+            files = []
+            for path in paths:
+                with open(path, 'rb') as f:
+                    files.append(('files', (os.path.basename(path), f.read())))
+            start = time.perf_counter()
+            response = requests.post(
+                f"{url}/compare-resumes",
+                files=files,
+                params={'similarity_threshold': threshold, 'backend': backend},
+                timeout=3600
+            )
+            elapsed = time.perf_counter() - start
+            response.raise_for_status()
+            result = response.json()
+            results.append({
+                'backend': backend,
+                'threshold': threshold,
+                'seconds': round(elapsed, 3),
+                'files_per_second': round(len(paths) / elapsed, 1),
+                'pairs_found': len(result['similar_pairs']),
+                **pair_metrics([(pair['file1'], pair['file2']) for pair in result['similar_pairs']], expected_pairs),
+                'server_peak_rss_mb': _process_tree_peak_rss_mb(server.pid)
+            })
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def run_benchmarks(sizes=(100,), formats=FORMATS, thresholds=(0.8, 0.9, 0.95), backends=SIMILARITY_BACKENDS,
+                   family_size=4, max_edit_rate=0.05, workers=None, include_comparator=True,
+                   include_api=True, corpus_root=None, seed=0):
+    """Generate one corpus per size, benchmark it and return the report dict"""
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'config': {
+            'sizes': list(sizes), 'formats': list(formats), 'thresholds': list(thresholds),
+            'backends': list(backends), 'family_size': family_size, 'max_edit_rate': max_edit_rate,
+            'workers': workers, 'seed': seed
+        },
+        'runs': []
+    }
+
+    root = corpus_root or tempfile.mkdtemp(prefix='resume_corpus_')
+    try:
+        for size in sizes:
+            corpus_dir = os.path.join(root, f"corpus_{size}")
+            print(f"Generating {size} resumes in {corpus_dir}...")
+            manifest = generate_corpus(corpus_dir, num_resumes=size, family_size=family_size,
+                                       max_edit_rate=max_edit_rate, formats=formats, seed=seed)
+            expected = manifest['duplicate_pairs']
+            paths = corpus_paths(corpus_dir)
+            run = {'num_resumes': size, 'duplicate_pairs': len(expected)}
+
+            print("  hashing...")
+            run['hashing'] = bench_hashing(paths)
+            print("  extraction...")
+            run['extraction'] = bench_extraction(paths, workers)
+            print("  similarity...")
+            run['similarity'] = bench_similarity(paths, expected, thresholds, backends, workers)
+            if include_comparator:
+                print("  ResumeComparator...")
+                run['comparator'] = bench_comparator(corpus_dir, expected, max(thresholds), workers)
+            if include_api:
+                print("  FastAPI /compare-resumes...")
+                run['api'] = bench_api(paths, expected, max(thresholds), backends, workers)
+            report['runs'].append(run)
+    finally:
+        if corpus_root is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume comparison tool on synthetic corpora")
+    parser.add_argument('--sizes', default='100', help="comma-separated corpus sizes (default: 100)")
+    parser.add_argument('--formats', default=','.join(FORMATS), help="comma-separated file formats")
+    parser.add_argument('--thresholds', default='0.8,0.9,0.95', help="comma-separated similarity thresholds")
+    parser.add_argument('--backends', default=','.join(SIMILARITY_BACKENDS), help="comma-separated backends")
+    parser.add_argument('--family-size', type=int, default=4, help="near-duplicates per family")
+    parser.add_argument('--max-edit-rate', type=float, default=0.05, help="max share of words edited per variant")
+    parser.add_argument('--workers', type=int, default=None, help="extraction / API pool processes")
+    parser.add_argument('--skip-comparator', action='store_true', help="skip the ResumeComparator runs")
+    parser.add_argument('--skip-api', action='store_true', help="skip the FastAPI runs")
+    parser.add_argument('--corpus-dir', default=None, help="keep generated corpora in this folder")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_report.json', help="JSON report path")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        sizes=[int(size) for size in args.sizes.split(',')],
+        formats=args.formats.split(','),
+        thresholds=[float(threshold) for threshold in args.thresholds.split(',')],
+        backends=args.backends.split(','),
+        family_size=args.family_size,
+        max_edit_rate=args.max_edit_rate,
+        workers=args.workers,
+        include_comparator=not args.skip_comparator,
+        include_api=not args.skip_api,
+        corpus_root=args.corpus_dir,
+        seed=args.seed
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import os
+import json
+import random
+import shutil
+import docx
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+FIRST_NAMES = ["Aarav", "Maria", "James", "Priya", "Chen", "Fatima", "Lucas", "Aisha", "Noah", "Elena",
+               "Rahul", "Sofia", "Daniel", "Mei", "Omar", "Grace", "Ivan", "Zara", "Mateo", "Hana"]
+LAST_NAMES = ["Sharma", "Garcia", "Smith", "Patel", "Wang", "Khan", "Silva", "Okafor", "Brown", "Petrova",
+              "Gupta", "Rossi", "Miller", "Tanaka", "Haddad", "Kim", "Novak", "Ali", "Lopez", "Sato"]
+TITLES = ["Software Engineer", "Data Analyst", "Product Manager", "DevOps Engineer", "Data Scientist",
+          "Frontend Developer", "Backend Developer", "QA Engineer", "Business Analyst", "ML Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises",
+             "Hooli", "Pied Piper", "Vandelay Industries", "Soylent Systems", "Cyberdyne", "Tyrell Corp"]
+SKILLS = ["Python", "Java", "SQL", "JavaScript", "React", "Docker", "Kubernetes", "AWS", "Azure", "GCP",
+          "Pandas", "NumPy", "TensorFlow", "PyTorch", "FastAPI", "Django", "Flask", "Spark", "Airflow",
+          "Tableau", "Power BI", "Git", "Linux", "Terraform", "Kafka", "Redis", "PostgreSQL", "MongoDB",
+          "TypeScript", "Go", "C++", "Excel", "Jira", "Scrum", "CI/CD", "REST APIs", "GraphQL", "Snowflake"]
+VERBS = ["Designed", "Built", "Led", "Implemented", "Optimised", "Migrated", "Automated", "Maintained",
+         "Delivered", "Improved", "Developed", "Launched", "Refactored", "Scaled", "Integrated", "Owned"]
+OBJECTS = ["a data pipeline", "the billing service", "an internal dashboard", "the customer portal",
+           "a recommendation model", "the CI/CD workflow", "a reporting platform", "the search backend",
+           "a mobile API", "the payments integration", "an ETL framework", "the monitoring stack",
+           "a feature store", "the onboarding flow", "a microservice architecture", "the test suite"]
+OUTCOMES = ["reducing latency by {n}%", "cutting costs by {n}%", "serving {n}k daily users",
+            "improving accuracy by {n}%", "saving {n} hours per week", "increasing revenue by {n}%",
+            "reducing incidents by {n}%", "for {n} enterprise clients", "with {n}% test coverage"]
+DEGREES = ["B.Sc. Computer Science", "M.Sc. Data Science", "B.Tech Information Technology",
+           "MBA", "B.E. Electronics", "M.S. Software Engineering", "B.A. Economics"]
+UNIVERSITIES = ["State University", "Institute of Technology", "City College", "National University",
+                "Polytechnic Institute", "University of Science"]
+
+FORMATS = ('txt', 'docx', 'pdf')
+
+
+def generate_resume(rng):
+    """A random resume as a list of lines"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    title = rng.choice(TITLES)
+    lines = [
+        name,
+        f"{title} | {name.lower().replace(' ', '.')}{rng.randint(1, 99)}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        "",
+        "SUMMARY",
+        f"{title} with {rng.randint(2, 15)} years of experience in {', '.join(rng.sample(SKILLS, 3))}.",
+        "",
+        "EXPERIENCE",
+    ]
+    for _ in range(rng.randint(2, 4)):
+        start = rng.randint(2008, 2021)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {start + rng.randint(1, 4)})")
+        for _ in range(rng.randint(3, 6)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 80))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}, {outcome}.")
+        lines.append("")
+    lines += [
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, rng.randint(6, 14))),
+        "",
+        "EDUCATION",
+        f"{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)} ({rng.randint(2000, 2020)})",
+    ]
+    return lines
+
+
+def mutate_resume(rng, lines, edit_rate):
+    """Near-duplicate of a resume: about edit_rate of its words replaced, dropped or inserted"""
+    vocabulary = SKILLS + VERBS + [word for phrase in OBJECTS for word in phrase.split()]
+    mutated = []
+    for line in lines:
+        words = []
+        for word in line.split(" "):
+            roll = rng.random()
+            if roll < edit_rate / 3:
+                words.append(rng.choice(vocabulary))
+            elif roll < 2 * edit_rate / 3:
+                continue
+            elif roll < edit_rate:
+                words += [word, rng.choice(vocabulary)]
+            else:
+                words.append(word)
+        mutated.append(" ".join(words))
+    return mutated
+
+
+def write_resume(path, lines, file_format):
+    """Write resume lines as a TXT, DOCX or PDF file"""
+    if file_format == 'txt':
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines))
+    elif file_format == 'docx':
+        document = docx.Document()
+        for line in lines:
+            document.add_paragraph(line)
+        document.save(path)
+    elif file_format == 'pdf':
+        pdf = canvas.Canvas(path, pagesize=letter)
+        width, height = letter
+        y = height - 50
+        for line in lines:
+            if y < 50:
+                pdf.showPage()
+                y = height - 50
+            pdf.drawString(50, y, line)
+            y -= 14
+        pdf.save()
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+
+def generate_corpus(output_dir, num_resumes=200, family_size=4, duplicate_fraction=0.5,
+                    max_edit_rate=0.05, exact_copy_rate=0.1, formats=FORMATS, seed=0):
+    """
+    Write a synthetic resume corpus with known near-duplicate families.
+
+    duplicate_fraction of the resumes belong to families of up to
+    family_size near-duplicates (each variant edits up to max_edit_rate of
+    the base resume's words, or is a byte-identical copy with probability
+    exact_copy_rate); the rest are unique. Files cycle through formats.
+    Writes manifest.json next to the files and returns the manifest dict:
+    files (name -> family, format, edit_rate, exact_copy_of) and the
+    ground-truth near-duplicate pairs.
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    files = {}
+    family_members = []
+    duplicated = int(num_resumes * duplicate_fraction)
+    index = 0
+
+    def add(lines, family, edit_rate, exact_copy_of=None, file_format=None):
+        nonlocal index
+        file_format = file_format or formats[index % len(formats)]
+        name = f"resume_{index:06d}.{file_format}"
+        if exact_copy_of:
+            # Same bytes (PDF and DOCX embed timestamps, so regenerating would differ)
+            shutil.copyfile(os.path.join(output_dir, exact_copy_of), os.path.join(output_dir, name))
+        else:
+            write_resume(os.path.join(output_dir, name), lines, file_format)
+        files[name] = {'family': family, 'format': file_format, 'edit_rate': edit_rate,
+                       'exact_copy_of': exact_copy_of}
+        index += 1
+        return name
+
+    family = 0
+    while index < duplicated:
+        base = generate_resume(rng)
+        base_name = add(base, family, 0.0)
+        members = [base_name]
+        for _ in range(min(family_size, duplicated - index + 1) - 1):
+            if rng.random() < exact_copy_rate:
+                members.append(add(base, family, 0.0, exact_copy_of=base_name,
+                                   file_format=files[base_name]['format']))
+            else:
+                edit_rate = round(rng.uniform(0.0, max_edit_rate), 4)
+                members.append(add(mutate_resume(rng, base, edit_rate), family, edit_rate))
+        family_members.append(members)
+        family += 1
+
+    while index < num_resumes:
+        add(generate_resume(rng), family, 0.0)
+        family += 1
+
+    pairs = sorted(
+        (min(a, b), max(a, b))
+        for members in family_members
+        for x, a in enumerate(members)
+        for b in members[x + 1:]
+    )
+    manifest = {
+        'config': {
+            'num_resumes': num_resumes, 'family_size': family_size,
+            'duplicate_fraction': duplicate_fraction, 'max_edit_rate': max_edit_rate,
+            'exact_copy_rate': exact_copy_rate, 'formats': list(formats), 'seed': seed
+        },
+        'files': files,
+        'duplicate_pairs': pairs
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
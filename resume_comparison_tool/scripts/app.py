@@ -1,12 +1,51 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-import hashlib
-from difflib import SequenceMatcher
-import PyPDF2
-import docx
-import io
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import uuid
 from pydantic import BaseModel
+from similarity_engine import SIMILARITY_BACKENDS
+from comparison_service import (ComparisonInputError, CPUTimeLimitExceeded, add_to_corpus, query_corpus,
+                                run_comparison, store_uploads)
+from comparison_jobs import FAILED, TERMINAL_STATUSES, JobStore, run_comparison_job
+from resume_corpus import ResumeCorpus
+from text_extraction import DATA_DIR, ExtractionCache
+from reports import BUILT_FORMATS, REPORT_MEDIA_TYPES, ReportStore, build_cached_report
+
+# Worker pool settings
+POOL_WORKERS = int(os.getenv("RESUME_POOL_WORKERS", os.cpu_count() or 1))
+MAX_CONCURRENT_COMPARISONS = int(os.getenv("RESUME_MAX_CONCURRENT_COMPARISONS", POOL_WORKERS))
+CPU_TIME_LIMIT = float(os.getenv("RESUME_CPU_TIME_LIMIT", 120))
+# Wall-clock backstop for the cooperative CPU limit: a comparison still running
+# after this many seconds has the request pool's workers killed
+COMPARISON_TIMEOUT = float(os.getenv("RESUME_COMPARISON_TIMEOUT", CPU_TIME_LIMIT * 2))
+
+# Background job settings
+MAX_ACTIVE_JOBS = int(os.getenv("RESUME_MAX_ACTIVE_JOBS", POOL_WORKERS * 4))
+JOB_CPU_TIME_LIMIT = float(os.getenv("RESUME_JOB_CPU_TIME_LIMIT")) if os.getenv("RESUME_JOB_CPU_TIME_LIMIT") else None
+JOB_RETENTION_SECONDS = int(os.getenv("RESUME_JOB_RETENTION_SECONDS", 24 * 3600))
+# Every API process sends a heartbeat this often; queued or running jobs of a
+# process silent for JOB_OWNER_TIMEOUT seconds (crashed or killed) are failed
+JOB_HEARTBEAT_SECONDS = float(os.getenv("RESUME_JOB_HEARTBEAT_SECONDS", 10))
+JOB_OWNER_TIMEOUT = float(os.getenv("RESUME_JOB_OWNER_TIMEOUT", 60))
+JOB_NOT_STARTED_ERROR = "The job was cancelled before it started because its worker pool shut down"
+
+# Stored uploads unused for this long are evicted (RESUME_UPLOAD_MAX_ENTRIES optionally caps their number)
+UPLOAD_RETENTION_SECONDS = int(os.getenv("RESUME_UPLOAD_RETENTION_SECONDS", 7 * 24 * 3600))
+UPLOAD_MAX_ENTRIES = int(os.getenv("RESUME_UPLOAD_MAX_ENTRIES")) if os.getenv("RESUME_UPLOAD_MAX_ENTRIES") else None
+
+# Persistent resume corpus
+CORPUS_DIR = os.getenv("RESUME_CORPUS_DIR", os.path.join(DATA_DIR, "corpus"))
 
 app = FastAPI(title="Resume Comparison API")
 
@@ -24,48 +63,214 @@ class ComparisonResult(BaseModel):
     similar_pairs: List[dict]
     summary: dict
 
-class ResumeProcessor:
-    @staticmethod
-    def extract_text_from_pdf(file_content: bytes) -> str:
-        """Extract text from PDF bytes"""
-        try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text.strip()
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
-    
-    @staticmethod
-    def extract_text_from_docx(file_content: bytes) -> str:
-        """Extract text from DOCX bytes"""
-        try:
-            docx_file = io.BytesIO(file_content)
-            doc = docx.Document(docx_file)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text.strip()
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error reading DOCX: {str(e)}")
-    
-    @staticmethod
-    def extract_text_from_txt(file_content: bytes) -> str:
-        """Extract text from TXT bytes"""
+class ConcurrencyLimiter:
+    """Non-blocking counter of in-flight comparisons (used from the event loop only)"""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+    
+    def try_acquire(self) -> bool:
+        if self.active >= self.limit:
+            return False
+        self.active += 1
+        return True
+    
+    def release(self) -> None:
+        self.active -= 1
+
+class JobSubmitted(BaseModel):
+    job_id: str
+    status: str
+
+class HashList(BaseModel):
+    hashes: List[str]
+
+class FileRef(BaseModel):
+    name: str
+    hash: str
+
+class HashedFiles(BaseModel):
+    files: List[FileRef]
+
+comparison_slots = ConcurrencyLimiter(MAX_CONCURRENT_COMPARISONS)
+job_store = JobStore(os.path.join(DATA_DIR, "jobs.db"))
+corpus = ResumeCorpus(CORPUS_DIR)
+upload_cache = ExtractionCache(os.path.join(DATA_DIR, "uploads.db"))
+SPOOL_DIR = os.path.join(DATA_DIR, "spool")
+os.makedirs(SPOOL_DIR, exist_ok=True)
+report_store = ReportStore(os.path.join(DATA_DIR, "reports"))
+# Identifies the jobs this API process queued
+JOB_OWNER = f"{os.getpid()}-{uuid.uuid4().hex}"
+_maintenance_task = None
+
+def _report_worker_pid(pids) -> None:
+    pids.put(os.getpid())
+
+class KillableProcessPool(ProcessPoolExecutor):
+    """ProcessPoolExecutor whose workers report their PIDs on start-up, so a stuck pool can be killed"""
+    
+    def __init__(self, max_workers: int):
+        context = multiprocessing.get_context()
+        self._reported_pids = context.SimpleQueue()
+        super().__init__(max_workers=max_workers, mp_context=context,
+                         initializer=_report_worker_pid, initargs=(self._reported_pids,))
+    
+    def terminate(self) -> None:
+        """Kill every worker (a running task cannot be cancelled) and shut the pool down"""
+        pids = set()
+        while not self._reported_pids.empty():
+            pids.add(self._reported_pids.get())
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                # Already gone
+                pass
+        self.shutdown(wait=False, cancel_futures=True)
+
+class WorkerPool:
+    """A process pool created on first use and replaced when it breaks or is killed"""
+    
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = None
+    
+    def get(self) -> KillableProcessPool:
+        if self._executor is None:
+            self._executor = KillableProcessPool(self.max_workers)
+        return self._executor
+    
+    def reset(self, executor: KillableProcessPool, terminate: bool = False) -> None:
+        """Replace a broken (or, with terminate, stuck) executor; the next get() starts a fresh one"""
+        # Another request may already have replaced it
+        if self._executor is executor:
+            self._executor = None
+        if terminate:
+            executor.terminate()
+        else:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def submit(self, call):
+        """Submit call, replacing an executor broken by a dead worker once"""
+        executor = self.get()
         try:
-            return file_content.decode('utf-8').strip()
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error reading TXT: {str(e)}")
+            return executor.submit(call)
+        except BrokenProcessPool:
+            self.reset(executor)
+            return self.get().submit(call)
     
-    @staticmethod
-    def get_file_hash(file_content: bytes) -> str:
-        """Calculate MD5 hash"""
-        return hashlib.md5(file_content).hexdigest()
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+# Synchronous requests and background jobs use separate pools: a request that
+# times out gets its pool's workers killed, which must never touch running jobs
+request_pool = WorkerPool(POOL_WORKERS)
+job_pool = WorkerPool(POOL_WORKERS)
+
+def maintain_stores() -> None:
+    """Heartbeat for this process's jobs, fail jobs of dead processes, purge old jobs and evict unused uploads"""
+    job_store.heartbeat(JOB_OWNER)
+    job_store.fail_orphaned(JOB_OWNER_TIMEOUT)
+    job_store.purge(JOB_RETENTION_SECONDS)
+    upload_cache.evict(max_age_seconds=UPLOAD_RETENTION_SECONDS, max_entries=UPLOAD_MAX_ENTRIES)
+
+async def run_maintenance():
+    while True:
+        try:
+            await run_in_threadpool(maintain_stores)
+        except sqlite3.Error:
+            # Database busy or locked; try again on the next beat
+            pass
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+
+@app.on_event("startup")
+async def start_maintenance():
+    global _maintenance_task
+    _maintenance_task = asyncio.create_task(run_maintenance())
+
+@app.on_event("shutdown")
+def shutdown_worker_pools():
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+    request_pool.shutdown()
+    # Jobs whose futures are cancelled here are marked failed by their done callback
+    job_pool.shutdown()
+    job_store.remove_owner(JOB_OWNER)
+    job_store.fail_orphaned(JOB_OWNER_TIMEOUT)
+
+def validate_comparison_request(files: list, backend: str) -> None:
+    if backend not in SIMILARITY_BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown backend '{backend}'. Use one of: {', '.join(SIMILARITY_BACKENDS)}"
+        )
     
-    @staticmethod
-    def calculate_similarity(text1: str, text2: str) -> float:
-        """Calculate similarity ratio"""
-        return SequenceMatcher(None, text1, text2).ratio()
+    if len(files) < 2:
+        raise HTTPException(status_code=400, detail="Please upload at least 2 files")
+
+def discard_spooled(spooled: list) -> None:
+    """Delete the files of (filename, path) pairs returned by spool_uploads"""
+    for _, path in spooled:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+async def spool_uploads(files: List[UploadFile], chunk_size: int = 1024 * 1024) -> list:
+    """
+    Copy uploads to disk in chunks; returns (filename, path) pairs
+    - The caller deletes the files with discard_spooled once the workers are done with them
+    - If an upload fails partway, the files already written are deleted
+    """
+    spooled = []
+    try:
+        for file in files:
+            path = os.path.join(SPOOL_DIR, uuid.uuid4().hex)
+            spooled.append((file.filename, path))
+            with open(path, 'wb') as out:
+                while chunk := await file.read(chunk_size):
+                    out.write(chunk)
+    except BaseException:
+        discard_spooled(spooled)
+        raise
+    return spooled
+
+async def run_in_pool(func, *args, timeout: Optional[float] = None, **kwargs):
+    """
+    Run CPU-bound request work in the request pool, mapping bad input to 400
+    - If a worker died (BrokenProcessPool), or the call was still queued when another call's
+      timeout killed the pool, the pool is rebuilt and the call retried once
+    - After timeout seconds the call is cancelled, or the request pool's workers killed
+      if it is running, and 503 is returned; background jobs run in their own pool
+    """
+    call = partial(func, *args, **kwargs)
+    for attempt in range(2):
+        pool = request_pool.get()
+        try:
+            future = pool.submit(call)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except ComparisonInputError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except BrokenProcessPool:
+            request_pool.reset(pool)
+            if attempt:
+                raise HTTPException(status_code=503, detail="A worker process crashed. Please retry.")
+        except asyncio.CancelledError:
+            # Only a pool shutdown cancels our future; otherwise the request itself was cancelled
+            if not future.cancelled():
+                raise
+            if attempt:
+                raise HTTPException(status_code=503, detail="The worker pool was restarted. Please retry.")
+        except asyncio.TimeoutError:
+            if not future.cancel():
+                request_pool.reset(pool, terminate=True)
+            raise HTTPException(
+                status_code=503,
+                detail=f"Request did not finish within {timeout:g} seconds. Please retry with less work.",
+                headers={"Retry-After": "30"}
+            )
 
 @app.get("/")
 async def root():
@@ -74,92 +279,318 @@ async def root():
 @app.post("/compare-resumes", response_model=ComparisonResult)
 async def compare_resumes(
     files: List[UploadFile] = File(...),
-    similarity_threshold: float = 0.95
+    similarity_threshold: float = 0.95,
+    use_lsh: bool = True,
+    backend: str = "sequence",
+    top_k: Optional[int] = None
 ):
     """
     Compare multiple resumes
     - Detects exact duplicates
     - Finds similar resumes based on threshold
+    - use_lsh: only run the exact check on MinHash LSH candidate pairs
+    - backend: "sequence" (SequenceMatcher) or "tfidf" (sparse TF-IDF cosine)
+    - top_k: with the tfidf backend, keep only each resume's top_k matches
     """
-    if len(files) < 2:
-        raise HTTPException(status_code=400, detail="Please upload at least 2 files")
+    validate_comparison_request(files, backend)
     
-    processor = ResumeProcessor()
-    resumes = {}
+    # Refuse new work instead of queueing it behind a saturated pool
+    if not comparison_slots.try_acquire():
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy comparing other uploads. Please retry shortly.",
+            headers={"Retry-After": "5"}
+        )
     
-    # Process all uploaded files
-    for file in files:
-        file_content = await file.read()
-        filename = file.filename
-        
-        # Determine file type and extract text
-        if filename.lower().endswith('.pdf'):
-            text = processor.extract_text_from_pdf(file_content)
-        elif filename.lower().endswith('.docx'):
-            text = processor.extract_text_from_docx(file_content)
-        elif filename.lower().endswith('.txt'):
-            text = processor.extract_text_from_txt(file_content)
-        else:
-            continue
+    spooled = []
+    try:
+        # Uploads go to disk; workers read one file at a time
+        spooled = await spool_uploads(files)
         
-        resumes[filename] = {
-            'text': text,
-            'hash': processor.get_file_hash(file_content),
-            'size': len(file_content)
-        }
+        # Parsing and similarity are CPU-bound: run them in the process pool so
+        # the event loop keeps serving /health and other requests
+        result = await run_in_pool(
+            run_comparison,
+            spooled,
+            similarity_threshold=similarity_threshold,
+            use_lsh=use_lsh,
+            backend=backend,
+            top_k=top_k,
+            cpu_time_limit=CPU_TIME_LIMIT,
+            timeout=COMPARISON_TIMEOUT
+        )
+    except CPUTimeLimitExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{e}. Upload fewer files or use the tfidf backend."
+        )
+    finally:
+        discard_spooled(spooled)
+        comparison_slots.release()
     
-    if len(resumes) < 2:
+    return ComparisonResult(**result)
+
+async def start_comparison_job(files: list, params: dict, upload_cache_path: Optional[str] = None) -> JobSubmitted:
+    """
+    Queue a comparison job in the job pool
+    - files are spooled (filename, path) uploads, deleted once the job is done,
+      or (filename, hash) references when upload_cache_path is given
+    """
+    if await run_in_threadpool(job_store.count_active) >= MAX_ACTIVE_JOBS:
         raise HTTPException(
-            status_code=400, 
-            detail="Need at least 2 valid files (PDF, DOCX, or TXT)"
+            status_code=503,
+            detail="Too many comparison jobs are queued. Please retry shortly.",
+            headers={"Retry-After": "10"}
         )
     
-    # Find exact duplicates by hash
-    hash_groups = {}
-    for name, data in resumes.items():
-        file_hash = data['hash']
-        if file_hash in hash_groups:
-            hash_groups[file_hash].append(name)
-        else:
-            hash_groups[file_hash] = [name]
-    
-    exact_duplicates = [files for files in hash_groups.values() if len(files) > 1]
-    
-    # Find similar resumes
-    similar_pairs = []
-    resume_names = list(resumes.keys())
-    
-    for i in range(len(resume_names)):
-        for j in range(i + 1, len(resume_names)):
-            name1, name2 = resume_names[i], resume_names[j]
-            text1 = resumes[name1]['text']
-            text2 = resumes[name2]['text']
-            
-            if not text1 or not text2:
-                continue
-            
-            similarity = processor.calculate_similarity(text1, text2)
-            
-            if similarity >= similarity_threshold:
-                similar_pairs.append({
-                    'file1': name1,
-                    'file2': name2,
-                    'similarity': round(similarity * 100, 2)
-                })
-    
-    # Create summary
-    summary = {
-        'total_files': len(resumes),
-        'unique_files': len(hash_groups),
-        'exact_duplicate_groups': len(exact_duplicates),
-        'similar_pairs_found': len(similar_pairs),
-        'similarity_threshold': similarity_threshold * 100
+    job_id = await run_in_threadpool(job_store.create, params, files_total=len(files), owner=JOB_OWNER)
+    
+    future = job_pool.submit(
+        partial(run_comparison_job, job_store.db_path, job_id, files, params, JOB_CPU_TIME_LIMIT, upload_cache_path)
+    )
+    
+    def record_crash(done_future):
+        # The job records its own outcome; this only catches dead worker processes
+        # and jobs cancelled before they started by a pool shutdown
+        if done_future.cancelled():
+            job_store.update(job_id, status=FAILED, stage=FAILED, error=JOB_NOT_STARTED_ERROR)
+        elif done_future.exception() is not None:
+            job_store.update(job_id, status=FAILED, stage=FAILED, error=str(done_future.exception()))
+        if upload_cache_path is None:
+            discard_spooled(files)
+    
+    future.add_done_callback(record_crash)
+    return JobSubmitted(job_id=job_id, status="queued")
+
+@app.post("/jobs", response_model=JobSubmitted, status_code=202)
+async def submit_comparison_job(
+    files: List[UploadFile] = File(...),
+    similarity_threshold: float = 0.95,
+    use_lsh: bool = True,
+    backend: str = "sequence",
+    top_k: Optional[int] = None
+):
+    """
+    Start a resume comparison in the background
+    - Same parameters as /compare-resumes
+    - Poll GET /jobs/{job_id} or stream GET /jobs/{job_id}/events for progress
+    - Fetch GET /jobs/{job_id}/result when completed, DELETE /jobs/{job_id} to cancel
+    """
+    validate_comparison_request(files, backend)
+    params = {
+        'similarity_threshold': similarity_threshold,
+        'use_lsh': use_lsh,
+        'backend': backend,
+        'top_k': top_k
     }
+    spooled = await spool_uploads(files)
+    try:
+        return await start_comparison_job(spooled, params)
+    except BaseException:
+        # The job was never queued, so nothing else will delete the files
+        discard_spooled(spooled)
+        raise
+
+@app.post("/uploads/check")
+async def check_uploads(request: HashList):
+    """Return the file hashes the server has not stored yet (upload only those)"""
+    return {"missing": await run_in_threadpool(upload_cache.missing, request.hashes)}
+
+@app.post("/uploads")
+async def upload_files(files: List[UploadFile] = File(...)):
+    """
+    Store uploaded files for later comparisons by hash
+    - Files are parsed once; their text is kept under the MD5 hash of their bytes
+    - Uploads are spooled to disk and parsed one at a time, so memory does not grow with the batch
+    """
+    spooled = await spool_uploads(files)
+    try:
+        stored = await run_in_pool(store_uploads, upload_cache.db_path, spooled)
+    finally:
+        discard_spooled(spooled)
+    return {"stored": stored}
+
+@app.post("/jobs/by-hash", response_model=JobSubmitted, status_code=202)
+async def submit_comparison_job_by_hash(
+    request: HashedFiles,
+    similarity_threshold: float = 0.95,
+    use_lsh: bool = True,
+    backend: str = "sequence",
+    top_k: Optional[int] = None
+):
+    """
+    Start a background comparison of previously stored uploads
+    - Body: {"files": [{"name": ..., "hash": ...}]}, hashes as returned by POST /uploads
+    - Same query parameters as POST /jobs; nothing is uploaded or parsed again
+    """
+    validate_comparison_request(request.files, backend)
+    missing = await run_in_threadpool(upload_cache.missing, [ref.hash for ref in request.files])
+    if missing:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown file hashes, upload these files first: {', '.join(missing)}"
+        )
+    
+    refs = [(ref.name, ref.hash) for ref in request.files]
+    params = {
+        'similarity_threshold': similarity_threshold,
+        'use_lsh': use_lsh,
+        'backend': backend,
+        'top_k': top_k
+    }
+    return await start_comparison_job(refs, params, upload_cache_path=upload_cache.db_path)
+
+async def get_job_or_404(job_id: str, include_result: bool = False) -> dict:
+    job = await run_in_threadpool(job_store.get, job_id, include_result=include_result)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Job status and progress (files parsed, pairs compared, overall 0-1)"""
+    return await get_job_or_404(job_id)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, interval: float = 0.5):
+    """Stream job status snapshots as newline-delimited JSON until the job finishes"""
+    await get_job_or_404(job_id)
+    
+    async def events():
+        last = None
+        while True:
+            job = await run_in_threadpool(job_store.get, job_id)
+            if job is None:
+                break
+            snapshot = json.dumps(job)
+            if snapshot != last:
+                yield snapshot + "\n"
+                last = snapshot
+            if job['status'] in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(interval)
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.get("/jobs/{job_id}/result", response_model=ComparisonResult)
+async def get_job_result(job_id: str):
+    """Comparison result of a completed job"""
+    job = await get_job_or_404(job_id, include_result=True)
+    if job['status'] != "completed":
+        detail = job['error'] or f"Job is {job['status']}"
+        raise HTTPException(status_code=409, detail=detail)
+    return ComparisonResult(**job['result'])
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    await get_job_or_404(job_id)
+    if not await run_in_threadpool(job_store.request_cancel, job_id):
+        raise HTTPException(status_code=409, detail="Job has already finished")
+    return await get_job_or_404(job_id)
+
+@app.get("/corpus")
+async def get_corpus_stats():
+    """Number of resumes stored in the corpus"""
+    return {"resumes": await run_in_threadpool(len, corpus)}
+
+@app.post("/corpus/resumes")
+async def add_corpus_resumes(files: List[UploadFile] = File(...)):
+    """
+    Add resumes to the persistent corpus
+    - Files already stored (same content hash) are reported with added = false
+    """
+    spooled = await spool_uploads(files)
+    try:
+        added = await run_in_pool(add_to_corpus, CORPUS_DIR, spooled)
+    finally:
+        discard_spooled(spooled)
+    return {"resumes": added, "corpus_size": await run_in_threadpool(len, corpus)}
+
+@app.delete("/corpus/resumes/{file_hash}")
+async def remove_corpus_resume(file_hash: str):
+    """Remove a resume from the corpus by content hash"""
+    if not await run_in_threadpool(corpus.remove, file_hash):
+        raise HTTPException(status_code=404, detail=f"Resume {file_hash} not found in corpus")
+    return {"removed": file_hash, "corpus_size": await run_in_threadpool(len, corpus)}
+
+@app.post("/corpus/query")
+async def query_corpus_resumes(
+    file: UploadFile = File(...),
+    min_similarity: float = 0.5,
+    limit: int = 20,
+    exact: bool = False,
+    add: bool = False
+):
+    """
+    Find stored resumes similar to one new upload
+    - Only resumes sharing a MinHash LSH bucket with the upload are scored, unless
+      min_similarity is below the corpus' indexed Jaccard threshold; then every resume is
+    - Scores are TF-IDF cosine; exact: also compute the SequenceMatcher ratio and rank by it
+    - add: store the upload in the corpus after querying
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    
+    spooled = await spool_uploads([file])
+    try:
+        return await run_in_pool(
+            query_corpus,
+            CORPUS_DIR,
+            *spooled[0],
+            min_similarity=min_similarity,
+            limit=limit,
+            exact=exact,
+            add=add
+        )
+    finally:
+        discard_spooled(spooled)
+
+@app.post("/reports")
+async def register_report(result: ComparisonResult):
+    """
+    Store a comparison result for report downloads
+    - Returns a report_id (hash of the result); the same result always gets the same id
+    - Download with GET /reports/{report_id}?format=json|txt|csv|docx|pdf
+    """
+    report_id = report_store.save_result(result.model_dump())
+    return {"report_id": report_id, "formats": list(REPORT_MEDIA_TYPES)}
+
+@app.get("/reports/{report_id}")
+async def download_report(report_id: str, format: str = "json"):
+    """
+    Download a report of a stored result
+    - txt, json and csv are streamed as they are written; docx and pdf are built in the worker pool
+    - Every report is cached by result hash and format, so repeated downloads are served from disk
+    """
+    if format not in REPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{format}'. Use one of: {', '.join(REPORT_MEDIA_TYPES)}"
+        )
+    try:
+        cached_path = report_store.report_path(report_id, format)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    file_name = f"resume_report_{report_id[:12]}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
+    if cached_path:
+        return FileResponse(cached_path, media_type=REPORT_MEDIA_TYPES[format], headers=headers)
+    
+    if format in BUILT_FORMATS:
+        if report_store.load_result(report_id) is None:
+            raise HTTPException(status_code=404, detail=f"Report {report_id} not found")
+        path = await run_in_pool(build_cached_report, report_store.root_dir, report_id, format)
+        return FileResponse(path, media_type=REPORT_MEDIA_TYPES[format], headers=headers)
     
-    return ComparisonResult(
-        exact_duplicates=exact_duplicates,
-        similar_pairs=similar_pairs,
-        summary=summary
+    result = report_store.load_result(report_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Report {report_id} not found")
+    return StreamingResponse(
+        report_store.stream_report(report_id, result, format),
+        media_type=REPORT_MEDIA_TYPES[format],
+        headers=headers
     )
 
 @app.get("/health")
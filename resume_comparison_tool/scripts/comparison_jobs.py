@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+from comparison_service import (ComparisonInputError, CPUBudget, CPUTimeLimitExceeded, compare_extracted,
+                                extract_resumes, load_uploads)
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = 'queued', 'running', 'completed', 'failed', 'cancelled'
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+TERMINAL_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+# Share of the progress bar spent on parsing vs comparing
+PARSE_WEIGHT = 0.3
+
+ORPHANED_ERROR = "The server process running this job stopped"
+
+
+class JobCancelled(Exception):
+    """The job was cancelled while running"""
+
+
+class JobStore:
+    """
+    Comparison jobs kept in SQLite.
+
+    Any process (API workers, pool workers) can open the same database, so
+    status, progress, cancellation and results work no matter which process
+    runs the job or serves the request.
+
+    Each job records the API process (owner) that queued it, and owners keep
+    a heartbeat in the owners table; active jobs of owners that stopped
+    beating are failed by fail_orphaned().
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT, "
+                "files_done INTEGER DEFAULT 0, files_total INTEGER DEFAULT 0, "
+                "pairs_done INTEGER DEFAULT 0, pairs_total INTEGER DEFAULT 0, "
+                "params TEXT, result TEXT, error TEXT, cancel_requested INTEGER DEFAULT 0, "
+                "created_at REAL, updated_at REAL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'owner' not in columns:
+                try:
+                    conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+                except sqlite3.OperationalError:
+                    # Another process added it first
+                    pass
+            conn.execute("CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, heartbeat_at REAL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def create(self, params, files_total, owner=None):
+        """Register a queued job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, stage, files_total, params, owner, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, QUEUED, files_total, json.dumps(params), owner, now, now)
+            )
+        return job_id
+
+    def update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id, include_result=False):
+        """Job status dict (with overall progress 0-1), or None if unknown"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job['params'] = json.loads(job['params'] or '{}')
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        del job['owner']
+        result = job.pop('result')
+        if include_result:
+            job['result'] = json.loads(result) if result else None
+
+        file_progress = job['files_done'] / job['files_total'] if job['files_total'] else 0.0
+        pair_progress = job['pairs_done'] / job['pairs_total'] if job['pairs_total'] else 0.0
+        if job['status'] == COMPLETED:
+            job['progress'] = 1.0
+        elif job['stage'] == 'comparing':
+            job['progress'] = PARSE_WEIGHT + (1 - PARSE_WEIGHT) * pair_progress
+        else:
+            job['progress'] = PARSE_WEIGHT * file_progress
+        return job
+
+    def request_cancel(self, job_id):
+        """Flag a job for cancellation; returns False if it is unknown or already finished"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? "
+                "WHERE id = ? AND status IN (?, ?)",
+                (time.time(), job_id, *ACTIVE_STATUSES)
+            )
+        return cursor.rowcount > 0
+
+    def is_cancel_requested(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def count_active(self):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+            ).fetchone()[0]
+
+    def heartbeat(self, owner):
+        """Record that the owner process is alive"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO owners (owner, heartbeat_at) VALUES (?, ?) "
+                "ON CONFLICT (owner) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                (owner, time.time())
+            )
+
+    def remove_owner(self, owner):
+        """Forget an owner that is shutting down, so its remaining jobs count as orphaned"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM owners WHERE owner = ?", (owner,))
+
+    def fail_orphaned(self, owner_timeout_seconds):
+        """
+        Fail queued and running jobs whose owner has not sent a heartbeat for
+        owner_timeout_seconds (or that have no owner); returns how many.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM owners WHERE heartbeat_at < ?", (now - owner_timeout_seconds,))
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, error = ?, updated_at = ? "
+                "WHERE status IN (?, ?) AND (owner IS NULL OR owner NOT IN (SELECT owner FROM owners))",
+                (FAILED, FAILED, ORPHANED_ERROR, now, *ACTIVE_STATUSES)
+            )
+        return cursor.rowcount
+
+    def purge(self, older_than_seconds):
+        """Delete finished jobs last updated more than older_than_seconds ago"""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                (*TERMINAL_STATUSES, time.time() - older_than_seconds)
+            )
+
+
+class JobReporter:
+    """Throttled progress writer and cancellation check for a running job"""
+
+    def __init__(self, store, job_id, budget, interval=0.25):
+        self.store = store
+        self.job_id = job_id
+        self.budget = budget
+        self.interval = interval
+        self._last = 0.0
+
+    def _due(self, force):
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            return True
+        return False
+
+    def _check(self):
+        self.budget.check()
+        if self.store.is_cancel_requested(self.job_id):
+            raise JobCancelled()
+
+    def files(self, done, total):
+        if self._due(done == total):
+            self._check()
+            self.store.update(self.job_id, stage='parsing', files_done=done, files_total=total)
+
+    def pairs(self, done, total):
+        if self._due(done == total):
+            self._check()
+            self.store.update(self.job_id, stage='comparing', pairs_done=done, pairs_total=total)
+
+
+def run_comparison_job(db_path, job_id, files, params, cpu_time_limit=None, upload_cache_path=None):
+    """
+    Run one comparison job inside a worker process, recording progress and outcome in the store.
+
+    files are (filename, path) pairs of uploads spooled to disk, or
+    (filename, hash) references to stored uploads when upload_cache_path is given.
+    """
+    store = JobStore(db_path)
+    if store.is_cancel_requested(job_id):
+        store.update(job_id, status=CANCELLED, stage=CANCELLED)
+        return
+
+    store.update(job_id, status=RUNNING, stage='parsing')
+    reporter = JobReporter(store, job_id, CPUBudget(cpu_time_limit))
+    try:
+        if upload_cache_path:
+            resumes = load_uploads(upload_cache_path, files, progress_callback=reporter.files)
+        else:
+            resumes = extract_resumes(files, progress_callback=reporter.files)
+        result = compare_extracted(resumes, progress_callback=reporter.pairs, **params)
+    except JobCancelled:
+        store.update(job_id, status=CANCELLED, stage=CANCELLED)
+    except (ComparisonInputError, CPUTimeLimitExceeded) as e:
+        store.update(job_id, status=FAILED, stage=FAILED, error=str(e))
+    except Exception as e:
+        store.update(job_id, status=FAILED, stage=FAILED, error=f"Unexpected error: {e}")
+    else:
+        store.update(job_id, status=COMPLETED, stage=COMPLETED, result=json.dumps(result))
@@ -0,0 +1,228 @@
+import os
+import time
+from text_extraction import SUPPORTED_FORMATS, ExtractionCache, extract_text_from_bytes, get_content_hash
+from similarity_engine import find_similar_pairs
+from resume_corpus import ResumeCorpus
+
+FORMAT_NAMES = {'.pdf': 'PDF', '.docx': 'DOCX', '.txt': 'TXT'}
+
+
+class ComparisonInputError(Exception):
+    """The uploaded files cannot be compared (unreadable file or too few valid files)"""
+
+
+class CPUTimeLimitExceeded(Exception):
+    """A comparison used more CPU time than its limit"""
+
+
+class CPUBudget:
+    """Cooperative per-request CPU time limit, checked between units of work"""
+
+    def __init__(self, limit_seconds=None):
+        self.limit_seconds = limit_seconds
+        self.start = time.process_time()
+
+    def check(self, *args):
+        if self.limit_seconds is not None and time.process_time() - self.start > self.limit_seconds:
+            raise CPUTimeLimitExceeded(
+                f"Comparison exceeded the CPU time limit of {self.limit_seconds} seconds"
+            )
+
+
+def extract_resumes(files, budget=None, progress_callback=None):
+    """
+    Extract text from uploads spooled to disk, given as (filename, path) pairs.
+
+    Each file is read only while it is parsed, so one upload is in memory at
+    a time. Files with unsupported extensions are skipped; unreadable
+    supported files raise ComparisonInputError. progress_callback(done, total)
+    is called before each file and once at the end.
+    """
+    resumes = {}
+    for done, (filename, path) in enumerate(files):
+        if progress_callback:
+            progress_callback(done, len(files))
+        suffix = os.path.splitext(filename)[1].lower()
+        if suffix not in SUPPORTED_FORMATS:
+            continue
+
+        with open(path, 'rb') as f:
+            file_content = f.read()
+        try:
+            text = extract_text_from_bytes(filename, file_content)
+        except Exception as e:
+            raise ComparisonInputError(f"Error reading {FORMAT_NAMES[suffix]}: {str(e)}")
+
+        resumes[filename] = {
+            'text': text,
+            'hash': get_content_hash(file_content),
+            'size': len(file_content)
+        }
+        if budget:
+            budget.check()
+
+    if progress_callback:
+        progress_callback(len(files), len(files))
+    return resumes
+
+
+def store_uploads(cache_path, spooled_files):
+    """
+    Parse uploads spooled to disk and keep their text in the upload cache.
+
+    spooled_files are (filename, path) pairs; files are parsed and stored
+    one at a time, so only one upload is in memory.
+    Returns [{'name', 'hash'}] for stored files.
+    """
+    cache = ExtractionCache(cache_path)
+    stored = []
+    for spooled in spooled_files:
+        resumes = extract_resumes([spooled])
+        cache.put_many([(data['hash'], data['text']) for data in resumes.values()])
+        stored.extend({'name': name, 'hash': data['hash']} for name, data in resumes.items())
+    return stored
+
+
+def load_uploads(cache_path, refs, progress_callback=None):
+    """
+    Resumes for (filename, hash) references to previously stored uploads.
+
+    Nothing is parsed again. Raises ComparisonInputError naming any hash
+    that is not in the upload cache.
+    """
+    texts = ExtractionCache(cache_path).get_many(file_hash for _, file_hash in refs)
+    unknown = [file_hash for _, file_hash in refs if file_hash not in texts]
+    if unknown:
+        raise ComparisonInputError(f"Unknown file hashes, upload these files first: {', '.join(unknown)}")
+
+    resumes = {name: {'text': texts[file_hash], 'hash': file_hash} for name, file_hash in refs}
+    if progress_callback:
+        progress_callback(len(refs), len(refs))
+    return resumes
+
+
+def compare_extracted(resumes, similarity_threshold=0.95, use_lsh=True, backend='sequence',
+                      top_k=None, progress_callback=None):
+    """Find exact duplicates and similar pairs among extracted resumes (API result format)"""
+    if len(resumes) < 2:
+        raise ComparisonInputError("Need at least 2 valid files (PDF, DOCX, or TXT)")
+
+    # Find exact duplicates by hash
+    hash_groups = {}
+    for name, data in resumes.items():
+        hash_groups.setdefault(data['hash'], []).append(name)
+    exact_duplicates = [names for names in hash_groups.values() if len(names) > 1]
+
+    # Find similar resumes
+    resume_names = list(resumes.keys())
+    pairs, pair_stats = find_similar_pairs(
+        resume_names,
+        [resumes[name]['text'] for name in resume_names],
+        similarity_threshold,
+        use_lsh=use_lsh,
+        backend=backend,
+        top_k=top_k,
+        progress_callback=progress_callback,
+        progress_every=100
+    )
+    similar_pairs = [
+        {**pair, 'similarity': round(pair['similarity'] * 100, 2)}
+        for pair in pairs
+    ]
+
+    # Create summary
+    summary = {
+        'total_files': len(resumes),
+        'unique_files': len(hash_groups),
+        'exact_duplicate_groups': len(exact_duplicates),
+        'similar_pairs_found': len(similar_pairs),
+        'similarity_threshold': similarity_threshold * 100,
+        'total_pairs': pair_stats['total_pairs'],
+        'candidate_pairs': pair_stats['candidate_pairs'],
+        'skipped_by_length': pair_stats.get('skipped_by_length', 0),
+        'similarity_backend': backend
+    }
+    if 'cascade' in pair_stats:
+        summary['cascade'] = pair_stats['cascade']
+    if 'skipped_by_lsh' in pair_stats:
+        summary['skipped_by_lsh'] = pair_stats['skipped_by_lsh']
+    if pair_stats.get('lsh_skipped'):
+        summary['lsh_skipped'] = True
+
+    return {
+        'exact_duplicates': exact_duplicates,
+        'similar_pairs': similar_pairs,
+        'summary': summary
+    }
+
+
+def run_comparison(files, similarity_threshold=0.95, use_lsh=True, backend='sequence',
+                   top_k=None, cpu_time_limit=None):
+    """
+    Parse and compare spooled (filename, path) uploads; runs inside a worker process.
+
+    Raises ComparisonInputError for bad input and CPUTimeLimitExceeded when
+    the work takes more than cpu_time_limit seconds of CPU time.
+    """
+    budget = CPUBudget(cpu_time_limit)
+    resumes = extract_resumes(files, budget)
+    return compare_extracted(
+        resumes,
+        similarity_threshold=similarity_threshold,
+        use_lsh=use_lsh,
+        backend=backend,
+        top_k=top_k,
+        progress_callback=budget.check
+    )
+
+
+def add_to_corpus(corpus_dir, files):
+    """
+    Parse spooled (filename, path) uploads and store them in the corpus.
+
+    Returns one entry per supported file with its hash and whether it was
+    newly added (False when the same file content was already stored).
+    """
+    corpus = ResumeCorpus(corpus_dir)
+    resumes = extract_resumes(files)
+    return [
+        {'name': name, 'hash': data['hash'], 'added': corpus.add(name, data['hash'], data['text'])}
+        for name, data in resumes.items()
+    ]
+
+
+def query_corpus(corpus_dir, filename, path, min_similarity=0.5, limit=20, exact=False, add=False):
+    """
+    Find stored resumes similar to one uploaded file, spooled to path.
+
+    The uploaded file itself is excluded from its matches; with add=True it
+    is stored in the corpus after the query. Returns the API result dict.
+    """
+    resumes = extract_resumes([(filename, path)])
+    if not resumes:
+        raise ComparisonInputError("Please upload a PDF, DOCX, or TXT file")
+    data = resumes[filename]
+
+    corpus = ResumeCorpus(corpus_dir)
+    already_stored = data['hash'] in corpus
+    matches, stats = corpus.query(
+        data['text'],
+        min_similarity=min_similarity,
+        limit=limit,
+        exact=exact,
+        exclude_hash=data['hash']
+    )
+    added = corpus.add(filename, data['hash'], data['text']) if add else False
+
+    return {
+        'file': filename,
+        'hash': data['hash'],
+        'already_stored': already_stored,
+        'added': added,
+        'matches': [
+            {**match, 'similarity': round(match['similarity'] * 100, 2),
+             'tfidf_similarity': round(match['tfidf_similarity'] * 100, 2)}
+            for match in matches
+        ],
+        'summary': {**stats, 'min_similarity': min_similarity * 100, 'exact': exact}
+    }
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+from datetime import datetime, timezone
+from text_extraction import DATA_DIR, SUPPORTED_FORMATS, extract_files
+from resume_corpus import ResumeCorpus
+from similarity_engine import estimate_jaccard_threshold
+
+STATE_VERSION = 1
+# Files processed between state checkpoints during a scan
+CHECKPOINT_EVERY = 100
+
+
+def scan_resume_files(folder, skip_hidden=True):
+    """Map of relative path -> (mtime_ns, size) for supported files; hidden folders are skipped"""
+    found = {}
+    pending = [folder]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if skip_hidden and entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_FORMATS:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                found[os.path.relpath(entry.path, folder)] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+class ResumeFolderWatcher:
+    """
+    Incrementally compare a folder of resumes as files appear, change or disappear.
+
+    Each new or modified file is extracted, checked against a persistent
+    ResumeCorpus (so it is only compared with plausible matches, not the
+    whole folder) and then added to it. Findings are appended to a JSONL
+    event log. The state file records each file's mtime, size and hash, and
+    is checkpointed every CHECKPOINT_EVERY files, so after a restart (or a
+    crash mid-scan) only files not yet recorded are processed. Extracted
+    texts are cached by file hash like in ResumeComparator.
+    """
+
+    def __init__(self, folder, similarity_threshold=0.95, backend='sequence', state_dir=None,
+                 events_path=None, workers=None, max_matches=50, cache_path=None, use_cache=True):
+        self.folder = os.path.abspath(folder)
+        self.similarity_threshold = similarity_threshold
+        # 'sequence' re-checks candidates with SequenceMatcher; 'tfidf' uses the corpus cosine
+        self.exact = backend == 'sequence'
+        self.workers = workers
+        self.max_matches = max_matches
+
+        self.state_dir = state_dir or os.path.join(self.folder, '.resume_watch')
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.state_path = os.path.join(self.state_dir, 'state.json')
+        self.events_path = events_path or os.path.join(self.state_dir, 'events.jsonl')
+        if use_cache:
+            self.cache_path = cache_path or os.path.join(DATA_DIR, 'extraction_cache.db')
+        else:
+            self.cache_path = None
+        # LSH bands tuned so files at similarity_threshold are found; a corpus
+        # created for a higher threshold is scanned in full instead
+        self.jaccard_threshold = estimate_jaccard_threshold(similarity_threshold, shingle_size=5)
+        self.corpus = ResumeCorpus(os.path.join(self.state_dir, 'corpus'), shingle_size=5,
+                                   jaccard_threshold=self.jaccard_threshold)
+        self.files = self._load_state()
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') != STATE_VERSION:
+            return {}
+        return state['files']
+
+    def _save_state(self):
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATE_VERSION, 'folder': self.folder, 'files': self.files}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _log(self, events):
+        if not events:
+            return
+        with open(self.events_path, 'a', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+
+    def _event(self, kind, file, **fields):
+        return {'time': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'event': kind, 'file': file, **fields}
+
+    def _paths_with_hash(self, file_hash, exclude=None):
+        return sorted(path for path, info in self.files.items() if info['hash'] == file_hash and path != exclude)
+
+    def _forget(self, path):
+        """Drop a path from the state, and its text from the corpus if no other file has it"""
+        info = self.files.pop(path)
+        if info['hash'] and not self._paths_with_hash(info['hash']):
+            self.corpus.remove(info['hash'])
+
+    def scan_once(self):
+        """Process every change since the last scan; returns the events written"""
+        current = scan_resume_files(self.folder)
+        events = []
+
+        for path in sorted(set(self.files) - set(current)):
+            self._forget(path)
+            events.append(self._event('removed', path))
+
+        changed = [path for path, stamp in current.items()
+                   if path not in self.files or tuple(self.files[path]['stamp']) != stamp]
+        if not changed and not events:
+            return []
+
+        # Small batches are not worth starting a process pool for
+        workers = 1 if len(changed) < 4 else self.workers
+        full_paths = [os.path.join(self.folder, path) for path in sorted(changed)]
+        logged = 0
+        for done, result in enumerate(extract_files(full_paths, workers=workers, cache_path=self.cache_path), 1):
+            path = os.path.relpath(result['path'], self.folder)
+            events.extend(self._process(path, current[path], result))
+            if done % CHECKPOINT_EVERY == 0:
+                # Events first: after a crash they may repeat, but are never lost
+                self._log(events[logged:])
+                logged = len(events)
+                self._save_state()
+
+        self._log(events[logged:])
+        self._save_state()
+        return events
+
+    def _process(self, path, stamp, result):
+        previous = self.files.get(path)
+        if result['error']:
+            if previous:
+                self._forget(path)
+            self.files[path] = {'stamp': list(stamp), 'hash': None}
+            return [self._event('error', path, error=result['error'])]
+
+        file_hash = result['hash']
+        if previous and previous['hash'] == file_hash:
+            # Touched but unchanged content
+            self.files[path] = {'stamp': list(stamp), 'hash': file_hash}
+            return []
+        if previous:
+            self._forget(path)
+
+        events = [self._event('modified' if previous else 'added', path, hash=file_hash)]
+        duplicates = self._paths_with_hash(file_hash)
+        self.files[path] = {'stamp': list(stamp), 'hash': file_hash}
+        if duplicates:
+            events.append(self._event('exact_duplicate', path, hash=file_hash, duplicate_of=duplicates))
+            return events
+        if not result['text']:
+            return events
+
+        matches, _ = self.corpus.query(
+            result['text'],
+            min_similarity=self.similarity_threshold,
+            limit=self.max_matches,
+            exact=self.exact,
+            exclude_hash=file_hash,
+            jaccard_floor=self.jaccard_threshold
+        )
+        for match in matches:
+            events.append(self._event(
+                'similar', path,
+                match=self._paths_with_hash(match['hash'], exclude=path) or [match['name']],
+                similarity=round(match['similarity'] * 100, 2)
+            ))
+        self.corpus.add(path, file_hash, result['text'])
+        return events
+
+    def watch(self, interval=5.0, on_events=None):
+        """Scan every interval seconds until interrupted"""
+        while True:
+            events = self.scan_once()
+            if events and on_events:
+                on_events(events)
+            time.sleep(interval)
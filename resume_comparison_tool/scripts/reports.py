@@ -0,0 +1,320 @@
+import io
+import os
+import csv
+import json
+import uuid
+import hashlib
+from datetime import datetime
+from contextlib import contextmanager
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+REPORT_MEDIA_TYPES = {
+    'json': 'application/json',
+    'txt': 'text/plain; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pdf': 'application/pdf'
+}
+# Built in a worker process; the other formats are written incrementally while they are sent
+BUILT_FORMATS = ('docx', 'pdf')
+
+
+def result_digest(result):
+    """SHA-256 of a comparison result's canonical JSON; identifies its reports"""
+    canonical = json.dumps(result, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _timestamp():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _summary_rows(summary):
+    return [
+        ('Total Files Analyzed', str(summary['total_files'])),
+        ('Unique Files', str(summary['unique_files'])),
+        ('Exact Duplicate Groups', str(summary['exact_duplicate_groups'])),
+        ('Similar Pairs Found', str(summary['similar_pairs_found'])),
+        ('Similarity Threshold', f"{summary['similarity_threshold']}%")
+    ]
+
+
+def iter_txt_report(result):
+    """TXT report, yielded a section or pair at a time"""
+    summary = result['summary']
+    lines = ["=" * 80, "RESUME COMPARISON REPORT", "=" * 80, f"Generated: {_timestamp()}", "",
+             "SUMMARY", "-" * 80]
+    lines += [f"{key}: {value}" for key, value in _summary_rows(summary)]
+    lines += ["", "EXACT DUPLICATES", "-" * 80]
+    yield "\n".join(lines) + "\n"
+
+    if result['exact_duplicates']:
+        for i, group in enumerate(result['exact_duplicates'], 1):
+            yield f"\nDuplicate Group {i}:\n" + "".join(f"  - {file}\n" for file in group)
+    else:
+        yield "No exact duplicates found.\n"
+
+    yield "\nSIMILAR RESUMES\n" + "-" * 80 + "\n"
+    if result['similar_pairs']:
+        for pair in result['similar_pairs']:
+            yield f"\nSimilarity: {pair['similarity']}%\n  File 1: {pair['file1']}\n  File 2: {pair['file2']}\n"
+    else:
+        yield f"No similar resumes found above {summary['similarity_threshold']}% threshold.\n"
+
+    yield "\n" + "=" * 80 + "\nEND OF REPORT\n" + "=" * 80 + "\n"
+
+
+def iter_json_report(result):
+    """The result as JSON, yielded one similar pair per line"""
+    yield '{\n  "exact_duplicates": ' + json.dumps(result['exact_duplicates']) + ',\n  "similar_pairs": ['
+    for i, pair in enumerate(result['similar_pairs']):
+        yield ("," if i else "") + "\n    " + json.dumps(pair)
+    yield '\n  ],\n  "summary": ' + json.dumps(result['summary']) + '\n}\n'
+
+
+def iter_csv_report(result, rows_per_chunk=500):
+    """CSV with one row per duplicate file and per similar pair, yielded in chunks of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['type', 'group', 'similarity', 'file1', 'file2'])
+
+    def flush():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    rows = 0
+    for i, group in enumerate(result['exact_duplicates'], 1):
+        for file in group:
+            writer.writerow(['exact_duplicate', i, 100.0, file, ''])
+            rows += 1
+            if rows % rows_per_chunk == 0:
+                yield flush()
+    for pair in result['similar_pairs']:
+        writer.writerow(['similar', '', pair['similarity'], pair['file1'], pair['file2']])
+        rows += 1
+        if rows % rows_per_chunk == 0:
+            yield flush()
+    yield flush()
+
+
+REPORT_STREAMS = {'txt': iter_txt_report, 'json': iter_json_report, 'csv': iter_csv_report}
+
+
+def build_docx_report(result):
+    """DOCX report bytes"""
+    doc = Document()
+
+    title = doc.add_heading('Resume Comparison Report', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.add_paragraph(f"Generated: {_timestamp()}")
+
+    doc.add_heading('Summary', level=1)
+    summary = result['summary']
+    rows = _summary_rows(summary)
+    summary_table = doc.add_table(rows=len(rows), cols=2)
+    summary_table.style = 'Light Grid Accent 1'
+    for i, (key, value) in enumerate(rows):
+        summary_table.rows[i].cells[0].text = key
+        summary_table.rows[i].cells[1].text = value
+
+    doc.add_heading('Exact Duplicates', level=1)
+    if result['exact_duplicates']:
+        for i, group in enumerate(result['exact_duplicates'], 1):
+            doc.add_heading(f'Duplicate Group {i}', level=2)
+            for file in group:
+                doc.add_paragraph(file, style='List Bullet')
+    else:
+        doc.add_paragraph('✓ No exact duplicates found.')
+
+    doc.add_heading('Similar Resumes', level=1)
+    if result['similar_pairs']:
+        # One paragraph per pair keeps the document small for thousands of pairs
+        for pair in result['similar_pairs']:
+            p = doc.add_paragraph()
+            p.add_run(f"Similarity: {pair['similarity']}%").bold = True
+            p.add_run(f"\nFile 1: {pair['file1']}\nFile 2: {pair['file2']}")
+    else:
+        doc.add_paragraph(f"✓ No similar resumes found above {summary['similarity_threshold']}% threshold.")
+
+    file_stream = io.BytesIO()
+    doc.save(file_stream)
+    return file_stream.getvalue()
+
+
+class _PdfWriter:
+    """Line-by-line PDF drawing on a canvas; finished pages are not kept as flowables"""
+
+    def __init__(self, target):
+        self.canvas = canvas.Canvas(target, pagesize=letter)
+        self.width, self.height = letter
+        self.margin = 54
+        self.y = self.height - self.margin
+
+    def space(self, points):
+        self.y -= points
+
+    def line(self, text, font='Helvetica', size=10, color=colors.black, indent=0):
+        if self.y < self.margin + size:
+            self.canvas.showPage()
+            self.y = self.height - self.margin
+        self.canvas.setFont(font, size)
+        self.canvas.setFillColor(color)
+        self.canvas.drawString(self.margin + indent, self.y - size, text)
+        self.y -= size * 1.4
+
+    def row(self, cells, widths, font='Helvetica', size=10, fill=None, text_color=colors.black):
+        height = size * 2
+        if self.y - height < self.margin:
+            self.canvas.showPage()
+            self.y = self.height - self.margin
+        x = self.margin
+        for cell, width in zip(cells, widths):
+            if fill is not None:
+                self.canvas.setFillColor(fill)
+                self.canvas.rect(x, self.y - height, width, height, stroke=1, fill=1)
+            else:
+                self.canvas.rect(x, self.y - height, width, height, stroke=1, fill=0)
+            self.canvas.setFont(font, size)
+            self.canvas.setFillColor(text_color)
+            self.canvas.drawString(x + 6, self.y - height + size * 0.6, cell)
+            x += width
+        self.y -= height
+
+    def save(self):
+        self.canvas.save()
+
+
+def build_pdf_report(result):
+    """PDF report bytes, drawn directly on the canvas so thousands of pairs stay fast"""
+    buffer = io.BytesIO()
+    pdf = _PdfWriter(buffer)
+    heading_color = colors.HexColor('#2ca02c')
+
+    pdf.line("Resume Comparison Report", font='Helvetica-Bold', size=24, color=colors.HexColor('#1f77b4'))
+    pdf.line(f"Generated: {_timestamp()}")
+    pdf.space(16)
+
+    pdf.line("Summary", font='Helvetica-Bold', size=16, color=heading_color)
+    summary = result['summary']
+    widths = [3.5 * 72, 2 * 72]
+    pdf.row(['Metric', 'Value'], widths, font='Helvetica-Bold', size=12,
+            fill=colors.HexColor('#1f77b4'), text_color=colors.whitesmoke)
+    for key, value in _summary_rows(summary):
+        pdf.row([key, value], widths, fill=colors.beige)
+    pdf.space(20)
+
+    pdf.line("Exact Duplicates", font='Helvetica-Bold', size=16, color=heading_color)
+    if result['exact_duplicates']:
+        for i, group in enumerate(result['exact_duplicates'], 1):
+            pdf.line(f"Duplicate Group {i}:", font='Helvetica-Bold')
+            for file in group:
+                pdf.line(f"• {file}", indent=12)
+            pdf.space(6)
+    else:
+        pdf.line("No exact duplicates found.")
+    pdf.space(14)
+
+    pdf.line("Similar Resumes", font='Helvetica-Bold', size=16, color=heading_color)
+    if result['similar_pairs']:
+        for pair in result['similar_pairs']:
+            pdf.line(f"Similarity: {pair['similarity']}%", font='Helvetica-Bold')
+            pdf.line(f"File 1: {pair['file1']}", indent=12)
+            pdf.line(f"File 2: {pair['file2']}", indent=12)
+            pdf.space(6)
+    else:
+        pdf.line(f"No similar resumes found above {summary['similarity_threshold']}% threshold.")
+
+    pdf.save()
+    return buffer.getvalue()
+
+
+REPORT_BUILDERS = {'docx': build_docx_report, 'pdf': build_pdf_report}
+
+
+class ReportStore:
+    """
+    Comparison results and their rendered reports on disk, keyed by result digest.
+
+    Results are stored once as JSON in <digest>.result (<digest>.json is the
+    cached JSON report); each report is cached as <digest>.<format> and
+    written through a temporary file, so a partial report is never served.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = str(root_dir)
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _path(self, digest, extension):
+        if not all(c in '0123456789abcdef' for c in digest) or len(digest) != 64:
+            raise ValueError(f"Invalid report id: {digest}")
+        return os.path.join(self.root_dir, f"{digest}.{extension}")
+
+    def save_result(self, result):
+        """Store a result (if new) and return its digest"""
+        digest = result_digest(result)
+        path = self._path(digest, 'result')
+        if not os.path.exists(path):
+            with self.writer(path) as f:
+                f.write(json.dumps(result).encode('utf-8'))
+        return digest
+
+    def load_result(self, digest):
+        """Stored result, or None if unknown"""
+        path = self._path(digest, 'result')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def report_path(self, digest, report_format):
+        """Path of the cached report, or None if it has not been generated yet"""
+        path = self._path(digest, report_format)
+        return path if os.path.exists(path) else None
+
+    @contextmanager
+    def writer(self, path):
+        """Binary file handle whose content only appears at path once the block completes"""
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                yield f
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stream_report(self, digest, result, report_format, chunk_size=64 * 1024):
+        """Yield a TXT/JSON/CSV report as bytes (in chunks of about chunk_size) while caching it"""
+        with self.writer(self._path(digest, report_format)) as f:
+            pending, size = [], 0
+            for chunk in REPORT_STREAMS[report_format](result):
+                pending.append(chunk)
+                size += len(chunk)
+                if size >= chunk_size:
+                    data = "".join(pending).encode('utf-8')
+                    f.write(data)
+                    yield data
+                    pending, size = [], 0
+            data = "".join(pending).encode('utf-8')
+            f.write(data)
+            yield data
+
+    def build_report(self, digest, report_format):
+        """Build a DOCX/PDF report into the cache (runs in a worker process); returns its path"""
+        path = self._path(digest, report_format)
+        if not os.path.exists(path):
+            data = REPORT_BUILDERS[report_format](self.load_result(digest))
+            with self.writer(path) as f:
+                f.write(data)
+        return path
+
+
+def build_cached_report(root_dir, digest, report_format):
+    """Process-pool entry point for ReportStore.build_report"""
+    return ReportStore(root_dir).build_report(digest, report_format)
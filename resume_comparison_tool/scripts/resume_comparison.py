@@ -1,92 +1,64 @@
 import os
-import hashlib
+import sys
+import argparse
 from pathlib import Path
-from difflib import SequenceMatcher
-import PyPDF2
-import docx
+from text_extraction import DATA_DIR, DiskTextStore, extract_files
+from similarity_engine import SIMILARITY_BACKENDS, find_similar_pairs
+from folder_watcher import ResumeFolderWatcher, scan_resume_files
 
 class ResumeComparator:
-    def __init__(self, resume_folder):
+    def __init__(self, resume_folder, workers=None, cache_path=None, use_cache=True,
+                 out_of_core=False, spill_dir=None):
         self.resume_folder = resume_folder
         self.resumes = {}
+        # Number of extraction processes (None = one per CPU core)
+        self.workers = workers
+        # Extracted text is cached by file hash so unchanged files are not parsed again;
+        # the cache lives in the app data folder, never in the resume folder
+        if use_cache:
+            self.cache_path = cache_path or os.path.join(DATA_DIR, 'extraction_cache.db')
+        else:
+            self.cache_path = None
+        # Out-of-core mode keeps extracted texts on disk and reads them only to verify pairs
+        self.text_store = None
+        if out_of_core:
+            # A fresh, uniquely named spill file per run, so concurrent runs cannot truncate each other's
+            self.text_store = DiskTextStore(spill_dir or DATA_DIR)
         
-    def extract_text_from_pdf(self, pdf_path):
-        """Extract text from PDF file"""
-        text = ""
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-        except Exception as e:
-            print(f"Error reading PDF {pdf_path}: {e}")
-        return text.strip()
-    
-    def extract_text_from_docx(self, docx_path):
-        """Extract text from DOCX file"""
-        text = ""
-        try:
-            doc = docx.Document(docx_path)
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-        except Exception as e:
-            print(f"Error reading DOCX {docx_path}: {e}")
-        return text.strip()
-    
-    def extract_text_from_txt(self, txt_path):
-        """Extract text from TXT file"""
-        try:
-            with open(txt_path, 'r', encoding='utf-8') as file:
-                return file.read().strip()
-        except Exception as e:
-            print(f"Error reading TXT {txt_path}: {e}")
-            return ""
-    
-    def get_file_hash(self, file_path):
-        """Calculate MD5 hash of file for exact comparison"""
-        hash_md5 = hashlib.md5()
-        try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-        except Exception as e:
-            print(f"Error hashing file {file_path}: {e}")
-            return None
-        return hash_md5.hexdigest()
-    
-    def calculate_similarity(self, text1, text2):
-        """Calculate similarity ratio between two texts"""
-        return SequenceMatcher(None, text1, text2).ratio()
-    
     def load_resumes(self):
-        """Load all resumes from the folder"""
-        supported_formats = {'.pdf', '.docx', '.txt'}
+        """Load all resumes from the folder (parsed in parallel, cached by file hash; hidden folders skipped)"""
+        file_paths = [
+            os.path.join(self.resume_folder, path) for path in sorted(scan_resume_files(self.resume_folder))
+        ]
         
-        for file_path in Path(self.resume_folder).rglob('*'):
-            if file_path.suffix.lower() in supported_formats:
-                file_name = file_path.name
-                
-                # Extract text based on file type
-                if file_path.suffix.lower() == '.pdf':
-                    text = self.extract_text_from_pdf(file_path)
-                elif file_path.suffix.lower() == '.docx':
-                    text = self.extract_text_from_docx(file_path)
-                elif file_path.suffix.lower() == '.txt':
-                    text = self.extract_text_from_txt(file_path)
-                else:
-                    continue
-                
-                # Store resume info
-                self.resumes[file_name] = {
-                    'path': str(file_path),
-                    'text': text,
-                    'hash': self.get_file_hash(file_path)
-                }
+        cached_count = 0
+        for result in extract_files(file_paths, workers=self.workers, cache_path=self.cache_path):
+            if result['error']:
+                print(result['error'])
+            if result['cached']:
+                cached_count += 1
+            
+            # Store resume info
+            file_name = Path(result['path']).name
+            self.resumes[file_name] = {
+                'path': result['path'],
+                'hash': result['hash']
+            }
+            if self.text_store is not None:
+                self.resumes[file_name]['index'] = self.text_store.append(result['text'])
+            else:
+                self.resumes[file_name]['text'] = result['text']
         
-        print(f"Loaded {len(self.resumes)} resumes\n")
+        print(f"Loaded {len(self.resumes)} resumes "
+              f"({cached_count} from cache, {len(file_paths) - cached_count} parsed)\n")
     
-    def compare_resumes(self, similarity_threshold=0.95):
-        """Compare all resumes and find duplicates or similar ones"""
+    def compare_resumes(self, similarity_threshold=0.95, use_lsh=True, backend='sequence', top_k=None):
+        """
+        Compare all resumes and find duplicates or similar ones
+        
+        backend: 'sequence' (SequenceMatcher ratio) or 'tfidf' (cosine of TF-IDF vectors)
+        top_k: with the 'tfidf' backend, only report each resume's top_k most similar resumes
+        """
         resume_names = list(self.resumes.keys())
         duplicates = []
         similar_pairs = []
@@ -119,26 +91,26 @@ class ResumeComparator:
         print("\n" + "=" * 60)
         print(f"SIMILAR RESUMES (Similarity >= {similarity_threshold*100}%):")
         print("=" * 60)
-        similar_found = False
+        # MinHash LSH narrows the pairs down to plausible candidates before
+        # running the exact SequenceMatcher check on them (sequence backend)
+        if self.text_store is not None:
+            texts = self.text_store.select(self.resumes[name]['index'] for name in resume_names)
+            max_cached_texts = self.text_store.cache_size
+        else:
+            texts = [self.resumes[name]['text'] for name in resume_names]
+            max_cached_texts = None
+        similar_pairs, pair_stats = find_similar_pairs(
+            resume_names, texts, similarity_threshold,
+            use_lsh=use_lsh, backend=backend, top_k=top_k,
+            max_cached_texts=max_cached_texts
+        )
+        similar_found = bool(similar_pairs)
         
-        for i in range(len(resume_names)):
-            for j in range(i + 1, len(resume_names)):
-                name1, name2 = resume_names[i], resume_names[j]
-                text1 = self.resumes[name1]['text']
-                text2 = self.resumes[name2]['text']
-                
-                # Skip if both texts are empty
-                if not text1 or not text2:
-                    continue
-                
-                similarity = self.calculate_similarity(text1, text2)
-                
-                if similarity >= similarity_threshold:
-                    similar_found = True
-                    print(f"\n{name1}")
-                    print(f"  vs")
-                    print(f"{name2}")
-                    print(f"  Similarity: {similarity*100:.2f}%")
+        for pair in similar_pairs:
+            print(f"\n{pair['file1']}")
+            print(f"  vs")
+            print(f"{pair['file2']}")
+            print(f"  Similarity: {pair['similarity']*100:.2f}%")
         
         if not similar_found:
             print(f"No similar resumes found (threshold: {similarity_threshold*100}%).\n")
@@ -150,19 +122,89 @@ class ResumeComparator:
         print(f"Total resumes analyzed: {len(self.resumes)}")
         print(f"Unique resumes: {len(hash_groups)}")
         print(f"Similarity threshold: {similarity_threshold*100}%")
+        print(f"Pairs compared: {pair_stats['candidate_pairs']} of {pair_stats['total_pairs']} "
+              f"({pair_stats['method']})")
+        if pair_stats.get('skipped_by_length'):
+            print(f"Pairs skipped by the length window: {pair_stats['skipped_by_length']}")
+        if pair_stats.get('skipped_by_lsh'):
+            print(f"Pairs ruled out by MinHash LSH: {pair_stats['skipped_by_lsh']}")
+        if 'cascade' in pair_stats:
+            rejected = pair_stats['cascade']['rejected']
+            print(f"Rejected early: {rejected['length']} by length, {rejected['quick_ratio']} by quick_ratio, "
+                  f"{rejected['ngram_jaccard']} by n-gram Jaccard; "
+                  f"full ratio computed for {pair_stats['cascade']['full_ratio']}")
+        
+        return similar_pairs
+    
+    def close(self):
+        """Delete the out-of-core text spill file, if any"""
+        if self.text_store is not None:
+            self.text_store.close()
+            self.text_store = None
+
+
+def print_watch_events(events):
+    """Print watch-mode findings as they are logged"""
+    for event in events:
+        if event['event'] == 'similar':
+            print(f"[similar] {event['file']} ~ {', '.join(event['match'])} ({event['similarity']}%)")
+        elif event['event'] == 'exact_duplicate':
+            print(f"[duplicate] {event['file']} = {', '.join(event['duplicate_of'])}")
+        elif event['event'] == 'error':
+            print(f"[error] {event['error']}")
+        else:
+            print(f"[{event['event']}] {event['file']}")
+    sys.stdout.flush()
 
 
-# Example usage
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find duplicate and similar resumes in a folder")
+    parser.add_argument('folder', help="folder containing PDF, DOCX and TXT resumes")
+    parser.add_argument('--threshold', type=float, default=0.95,
+                        help="similarity threshold, 1.0 = identical (default: 0.95)")
+    parser.add_argument('--backend', choices=SIMILARITY_BACKENDS, default='sequence')
+    parser.add_argument('--workers', type=int, default=None, help="extraction processes (default: one per core)")
+    parser.add_argument('--out-of-core', action='store_true', help="keep extracted texts on disk")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and compare new or modified files incrementally")
+    parser.add_argument('--once', action='store_true',
+                        help="with --watch: process changes since the last run, then exit")
+    parser.add_argument('--interval', type=float, default=5.0, help="seconds between folder scans (default: 5)")
+    parser.add_argument('--state-dir', default=None,
+                        help="watch state, corpus and event log folder (default: FOLDER/.resume_watch)")
+    parser.add_argument('--events', default=None, help="JSONL event log path (default: STATE_DIR/events.jsonl)")
+    args = parser.parse_args(argv)
+
+    if args.watch:
+        watcher = ResumeFolderWatcher(
+            args.folder,
+            similarity_threshold=args.threshold,
+            backend=args.backend,
+            state_dir=args.state_dir,
+            events_path=args.events,
+            workers=args.workers
+        )
+        print(f"Watching {watcher.folder} ({len(watcher.files)} files already indexed); "
+              f"events are logged to {watcher.events_path}")
+        if args.once:
+            print_watch_events(watcher.scan_once())
+            return
+        try:
+            watcher.watch(interval=args.interval, on_events=print_watch_events)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+        return
+
+    comparator = ResumeComparator(args.folder, workers=args.workers, out_of_core=args.out_of_core)
+    try:
+        comparator.load_resumes()
+        comparator.compare_resumes(similarity_threshold=args.threshold, backend=args.backend)
+    finally:
+        comparator.close()
+
+
+# Example usage:
+#   python resume_comparison.py E:\resume --threshold 0.95
+#   python resume_comparison.py E:\resume --watch
 if __name__ == "__main__":
-    # Specify the folder containing your resumes
-    resume_folder = r"E:\resume"  # Change this to your folder path
-    
-    # Create comparator instance
-    comparator = ResumeComparator(resume_folder)
-    
-    # Load all resumes
-    comparator.load_resumes()
-    
-    # Compare resumes (0.95 = 95% similarity threshold)
-    # Adjust threshold as needed: 1.0 = identical, 0.8 = 80% similar
-    comparator.compare_resumes(similarity_threshold=0.95)
\ No newline at end of file
+    main()
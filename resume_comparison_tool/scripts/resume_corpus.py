@@ -0,0 +1,235 @@
+import os
+import math
+import time
+import sqlite3
+from collections import Counter
+import numpy as np
+from similarity_engine import MinHasher, LSHIndex, calculate_similarity, choose_lsh_bands, hashed_features
+
+N_FEATURES = 2 ** 20
+# SQLite's default limit on bound parameters per statement is 999
+_MAX_SQL_PARAMS = 900
+
+
+def _chunks(items, size=_MAX_SQL_PARAMS):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ResumeCorpus:
+    """
+    Persistent store of every resume seen so far, for "compare one against all" queries.
+
+    Per resume it keeps the file hash, the location of the extracted text on
+    disk, a MinHash signature (indexed in LSH band buckets) and a hashed
+    term-frequency vector; document frequencies are kept so TF-IDF weights
+    reflect the current corpus. A query only touches resumes that share an
+    LSH bucket with the new text, so it does not scan the whole corpus.
+
+    The bands are tuned so resumes whose shingle Jaccard is at least
+    jaccard_threshold become candidates with 99% probability. TF-IDF cosine
+    and SequenceMatcher ratio of near-duplicates run above their shingle
+    Jaccard, so queries with a lower min_similarity scan every resume instead.
+    """
+
+    def __init__(self, root_dir, num_perm=128, shingle_size=5, jaccard_threshold=0.5):
+        self.root_dir = str(root_dir)
+        self.text_dir = os.path.join(self.root_dir, "texts")
+        os.makedirs(self.text_dir, exist_ok=True)
+        self.db_path = os.path.join(self.root_dir, "corpus.db")
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS resumes ("
+                "hash TEXT PRIMARY KEY, name TEXT, text_path TEXT, length INTEGER, "
+                "signature BLOB, tf_features BLOB, tf_counts BLOB, added_at REAL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS lsh_buckets (band INTEGER, bucket BLOB, hash TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS lsh_bucket_index ON lsh_buckets (band, bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS lsh_hash_index ON lsh_buckets (hash)")
+            conn.execute("CREATE TABLE IF NOT EXISTS doc_freq (feature INTEGER PRIMARY KEY, df INTEGER)")
+
+            # Signature settings are fixed when the corpus is created; several
+            # processes may open a new corpus at once, so the first write wins
+            bands, rows = choose_lsh_bands(jaccard_threshold, num_perm)
+            defaults = {'num_perm': num_perm, 'shingle_size': shingle_size, 'bands': bands, 'rows': rows,
+                        'jaccard_threshold': jaccard_threshold}
+            conn.executemany("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                             [(k, str(v)) for k, v in defaults.items()])
+            stored = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+
+        self.hasher = MinHasher(num_perm=int(stored['num_perm']), shingle_size=int(stored['shingle_size']))
+        self.lsh = LSHIndex(int(stored['bands']), int(stored['rows']))
+        self.jaccard_threshold = float(stored['jaccard_threshold'])
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _text_path(self, file_hash):
+        return os.path.join(self.text_dir, file_hash[:2], f"{file_hash}.txt")
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def __contains__(self, file_hash):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM resumes WHERE hash = ?", (file_hash,)).fetchone() is not None
+
+    def get_text(self, file_hash):
+        """Extracted text of a stored resume, read from disk"""
+        with open(self._text_path(file_hash), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def get_names(self, file_hashes):
+        """Map of hash -> original file name"""
+        names = {}
+        with self._connect() as conn:
+            for chunk in _chunks(file_hashes):
+                rows = conn.execute(
+                    f"SELECT hash, name FROM resumes WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                names.update(rows)
+        return names
+
+    def add(self, name, file_hash, text):
+        """Store a resume; returns False if a resume with this hash is already stored"""
+        if file_hash in self:
+            return False
+
+        text_path = self._text_path(file_hash)
+        os.makedirs(os.path.dirname(text_path), exist_ok=True)
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+        signature = self.hasher.signature(text)
+        tf = Counter(hashed_features(text, N_FEATURES))
+        features = np.array(sorted(tf), dtype=np.int64)
+        counts = np.array([tf[f] for f in features.tolist()], dtype=np.int32)
+
+        with self._connect() as conn:
+            # Another process may have stored the same file in the meantime
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO resumes "
+                "(hash, name, text_path, length, signature, tf_features, tf_counts, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (file_hash, name, text_path, len(text), signature.tobytes(),
+                 features.tobytes(), counts.tobytes(), time.time())
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.executemany(
+                "INSERT INTO lsh_buckets (band, bucket, hash) VALUES (?, ?, ?)",
+                [(band, bucket, file_hash) for band, bucket in self.lsh.band_keys(signature)]
+            )
+            conn.executemany(
+                "INSERT INTO doc_freq (feature, df) VALUES (?, 1) "
+                "ON CONFLICT(feature) DO UPDATE SET df = df + 1",
+                [(f,) for f in features.tolist()]
+            )
+        return True
+
+    def remove(self, file_hash):
+        """Delete a resume; returns False if it is not stored"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT text_path, tf_features FROM resumes WHERE hash = ?", (file_hash,)
+            ).fetchone()
+            if row is None:
+                return False
+            text_path, tf_features = row
+            features = np.frombuffer(tf_features, dtype=np.int64).tolist()
+            conn.execute("DELETE FROM resumes WHERE hash = ?", (file_hash,))
+            conn.execute("DELETE FROM lsh_buckets WHERE hash = ?", (file_hash,))
+            conn.executemany("UPDATE doc_freq SET df = df - 1 WHERE feature = ?", [(f,) for f in features])
+            conn.execute("DELETE FROM doc_freq WHERE df <= 0")
+
+        if os.path.exists(text_path):
+            os.remove(text_path)
+        return True
+
+    def candidates(self, signature):
+        """Hashes of stored resumes sharing at least one LSH band bucket with a signature"""
+        found = set()
+        with self._connect() as conn:
+            for band, bucket in self.lsh.band_keys(signature):
+                found.update(row[0] for row in conn.execute(
+                    "SELECT hash FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+                ))
+        return found
+
+    def _idf(self, conn, features, total):
+        idf = {}
+        for chunk in _chunks(features):
+            rows = conn.execute(
+                f"SELECT feature, df FROM doc_freq WHERE feature IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            idf.update({feature: math.log((1.0 + total) / (1.0 + df)) + 1.0 for feature, df in rows})
+        return idf
+
+    def query(self, text, min_similarity=0.5, limit=20, exact=False, exclude_hash=None, jaccard_floor=None):
+        """
+        Stored resumes similar to a text, best first.
+
+        Candidates come from the LSH buckets, or are all stored resumes when
+        jaccard_floor (the shingle Jaccard the caller needs matches down to,
+        min_similarity by default) is below the threshold the buckets are
+        tuned for; each
+        is scored by TF-IDF cosine similarity. With exact=True the
+        SequenceMatcher ratio is computed as well (streaming the stored text
+        from disk) and used for ranking. Returns (matches, stats).
+        """
+        full_scan = (min_similarity if jaccard_floor is None else jaccard_floor) < self.jaccard_threshold
+        if full_scan:
+            with self._connect() as conn:
+                candidate_hashes = {row[0] for row in conn.execute("SELECT hash FROM resumes")}
+        else:
+            candidate_hashes = self.candidates(self.hasher.signature(text))
+        candidate_hashes.discard(exclude_hash)
+
+        query_tf = Counter(hashed_features(text, N_FEATURES))
+        matches = []
+        with self._connect() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+            rows = []
+            for chunk in _chunks(candidate_hashes):
+                rows.extend(conn.execute(
+                    "SELECT hash, name, tf_features, tf_counts FROM resumes "
+                    f"WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+
+            features_needed = set(query_tf)
+            decoded = []
+            for file_hash, name, tf_features, tf_counts in rows:
+                features = np.frombuffer(tf_features, dtype=np.int64).tolist()
+                counts = np.frombuffer(tf_counts, dtype=np.int32).tolist()
+                decoded.append((file_hash, name, dict(zip(features, counts))))
+                features_needed.update(features)
+            idf = self._idf(conn, features_needed, total + 1)
+
+        def weights(tf):
+            return {f: (1.0 + math.log(n)) * idf.get(f, math.log(total + 2.0) + 1.0) for f, n in tf.items()}
+
+        query_weights = weights(query_tf)
+        query_norm = math.sqrt(sum(w * w for w in query_weights.values())) or 1.0
+
+        for file_hash, name, tf in decoded:
+            candidate_weights = weights(tf)
+            norm = math.sqrt(sum(w * w for w in candidate_weights.values())) or 1.0
+            dot = sum(w * candidate_weights[f] for f, w in query_weights.items() if f in candidate_weights)
+            cosine = min(dot / (query_norm * norm), 1.0)
+
+            match = {'hash': file_hash, 'name': name, 'tfidf_similarity': cosine}
+            if exact:
+                match['similarity'] = calculate_similarity(text, self.get_text(file_hash))
+            else:
+                match['similarity'] = cosine
+            if match['similarity'] >= min_similarity:
+                matches.append(match)
+
+        matches.sort(key=lambda m: m['similarity'], reverse=True)
+        stats = {'corpus_size': total, 'candidates': len(decoded), 'full_scan': full_scan}
+        return matches[:limit], stats
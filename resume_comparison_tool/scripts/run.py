@@ -2,53 +2,250 @@
 # run.py (Optional - Run both servers with one command)
 # ============================================
 
+import argparse
+import os
+import signal
+import socket
 import subprocess
 import sys
+import threading
 import time
-import os
+import urllib.request
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Restart delays for crashed processes: doubled after each crash, reset once
+# a process has stayed up for STABLE_SECONDS
+INITIAL_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+STABLE_SECONDS = 60.0
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    with _print_lock:
+        print(message, flush=True)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def is_ready(url, timeout=1.0):
+    """True once url answers with HTTP 200"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+class ManagedProcess:
+    """A child process whose output is forwarded line by line and which is restarted with backoff when it dies"""
+
+    def __init__(self, name, command, env=None, pass_fds=()):
+        self.name = name
+        self.command = command
+        self.env = env
+        self.pass_fds = pass_fds
+        self.process = None
+        self.started_at = None
+        self.backoff = INITIAL_BACKOFF
+        self.restart_at = None
+        self.restarts = 0
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=SCRIPTS_DIR,
+            env=self.env,
+            pass_fds=self.pass_fds,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors='replace',
+            bufsize=1
+        )
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        threading.Thread(target=self._forward_output, args=(self.process,), daemon=True).start()
+
+    def _forward_output(self, process):
+        # Draining the pipe continuously keeps a chatty child from blocking on a full buffer
+        for line in process.stdout:
+            log(f"[{self.name}] {line.rstrip()}")
+        process.stdout.close()
+
+    def supervise(self):
+        """Schedule a restart if the process died; start it again once its backoff has passed"""
+        now = time.monotonic()
+        if self.restart_at is not None:
+            if now >= self.restart_at:
+                self.restarts += 1
+                log(f"🔁 Restarting {self.name} (restart #{self.restarts})")
+                self.start()
+            return
+
+        code = self.process.poll()
+        if code is None:
+            return
+        if now - self.started_at >= STABLE_SECONDS:
+            self.backoff = INITIAL_BACKOFF
+        log(f"💥 {self.name} exited with code {code}; restarting in {self.backoff:.0f}s")
+        self.restart_at = now + self.backoff
+        self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+
+    def terminate(self):
+        self.restart_at = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def stop(self, timeout=10.0):
+        """Terminate the process, killing it if it has not exited after timeout seconds"""
+        self.terminate()
+        if self.process is None or self.process.poll() is not None:
+            return
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def backend_workers(workers, host, port):
+    """
+    Backend worker processes sharing one listening socket.
+
+    The socket is bound here and its descriptor is inherited by every
+    uvicorn worker (--fd), so the kernel spreads connections across them
+    and a crashed worker restarts without the port ever closing. Platforms
+    that cannot pass descriptors (Windows) get one uvicorn process running
+    the workers itself (--workers). Returns (processes, listening socket or None).
+    """
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    # Every worker has its own process pools; split the cores between them
+    env.setdefault("RESUME_POOL_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+    # The job limit is checked against the shared jobs.db, so it must cover all
+    # pools together (app.py's default is four jobs per pool process)
+    env.setdefault("RESUME_MAX_ACTIVE_JOBS", str(4 * int(env["RESUME_POOL_WORKERS"]) * workers))
+
+    if os.name != 'posix':
+        command = [sys.executable, "-m", "uvicorn", "app:app", "--host", host, "--port", str(port)]
+        if workers > 1:
+            log(f"⚠️  No shared sockets on this system: uvicorn runs the {workers} workers itself. "
+                f"Backend output is not prefixed per worker.")
+            command += ["--workers", str(workers)]
+        return [ManagedProcess("backend", command, env=env)], None
+
+    listener = socket.create_server((host, port), backlog=2048)
+    fd = listener.fileno()
+    command = [sys.executable, "-m", "uvicorn", "app:app", "--fd", str(fd)]
+    processes = [
+        ManagedProcess(f"backend-{i + 1}", command, env=env, pass_fds=(fd,))
+        for i in range(workers)
+    ]
+    return processes, listener
+
+
+def run_servers(workers=None, host="0.0.0.0", port=8000, frontend_port=8501,
+                frontend=True, ready_timeout=60.0):
+    """Run the FastAPI workers and, once the API is healthy, the Streamlit frontend"""
+    workers = max(1, workers or os.cpu_count() or 1)
+    local_host = "127.0.0.1" if host in ("0.0.0.0", "") else host
+    api_url = f"http://{local_host}:{port}"
 
-def run_servers():
-    """Run both FastAPI and Streamlit servers"""
     print("🚀 Starting Resume Comparison Tool...")
     print("=" * 60)
-    
-    # Start FastAPI backend
-    print("\n📡 Starting FastAPI backend on http://localhost:8000")
-    backend_process = subprocess.Popen(
-        [sys.executable, "app.py"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    
-    # Wait for backend to start
-    time.sleep(3)
-    
-    # Start Streamlit frontend
-    print("🎨 Starting Streamlit frontend on http://localhost:8501")
-    frontend_process = subprocess.Popen(
-        [sys.executable, "-m", "streamlit", "run", "streamlit_app.py"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    
-    print("\n" + "=" * 60)
-    print("✅ Both servers are running!")
-    print("=" * 60)
-    print("📡 FastAPI Backend: http://localhost:8000")
-    print("📡 API Docs: http://localhost:8000/docs")
-    print("🎨 Streamlit Frontend: http://localhost:8501")
-    print("\n⚠️  Press Ctrl+C to stop both servers")
-    print("=" * 60)
-    
+
+    # Make SIGTERM (e.g. from a container runtime) shut down as cleanly as Ctrl+C
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    started = time.monotonic()
+    backends, listener = backend_workers(workers, host, port)
+    print(f"\n📡 Starting {workers} FastAPI backend worker(s) on http://{local_host}:{port}")
+    for process in backends:
+        process.start()
+
+    frontend_process = None
+    if frontend:
+        frontend_process = ManagedProcess(
+            "frontend",
+            [sys.executable, "-m", "streamlit", "run", "streamlit_app.py", "--server.port", str(frontend_port)],
+            env=dict(os.environ, PYTHONUNBUFFERED="1", RESUME_API_URL=api_url)
+        )
+    processes = list(backends)
+
+    backend_ready = frontend_ready = False
+    announced = slow_warned = False
     try:
-        # Keep script running
-        backend_process.wait()
-        frontend_process.wait()
+        while True:
+            for process in processes:
+                process.supervise()
+
+            if not backend_ready and is_ready(f"{api_url}/health"):
+                backend_ready = True
+                log(f"✅ Backend ready in {time.monotonic() - started:.1f}s")
+                if frontend_process is not None:
+                    log(f"🎨 Starting Streamlit frontend on http://localhost:{frontend_port}")
+                    frontend_process.start()
+                    processes.append(frontend_process)
+
+            if backend_ready and frontend_process is not None and not frontend_ready \
+                    and is_ready(f"http://127.0.0.1:{frontend_port}/"):
+                frontend_ready = True
+
+            if backend_ready and (frontend_ready or frontend_process is None) and not announced:
+                announced = True
+                log("\n" + "=" * 60)
+                log(f"✅ All services are running! (ready in {time.monotonic() - started:.1f}s)")
+                log("=" * 60)
+                log(f"📡 FastAPI Backend: {api_url} ({workers} worker(s))")
+                log(f"📡 API Docs: {api_url}/docs")
+                if frontend_process is not None:
+                    log(f"🎨 Streamlit Frontend: http://localhost:{frontend_port}")
+                log("\n⚠️  Press Ctrl+C to stop all servers")
+                log("=" * 60)
+            elif not announced and not slow_warned and time.monotonic() - started > ready_timeout:
+                slow_warned = True
+                log(f"⚠️  Services are not ready after {ready_timeout:.0f}s; still waiting (check the logs above)")
+
+            # Poll quickly until everything is up, then just watch for crashes
+            time.sleep(1.0 if announced else 0.2)
     except KeyboardInterrupt:
-        print("\n\n🛑 Shutting down servers...")
-        backend_process.terminate()
-        frontend_process.terminate()
-        print("✅ Servers stopped successfully!")
+        log("\n\n🛑 Shutting down servers...")
+        # Signal everything first so the processes shut down in parallel
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.stop()
+        if listener is not None:
+            listener.close()
+        log("✅ Servers stopped successfully!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Resume Comparison Tool API workers and frontend")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("RESUME_BACKEND_WORKERS", 0)) or None,
+                        help="Backend worker processes (default: one per CPU core)")
+    parser.add_argument("--host", default="0.0.0.0", help="Backend bind address")
+    parser.add_argument("--port", type=int, default=8000, help="Backend port")
+    parser.add_argument("--frontend-port", type=int, default=8501, help="Streamlit port")
+    parser.add_argument("--backend-only", action="store_true", help="Do not start the Streamlit frontend")
+    parser.add_argument("--ready-timeout", type=float, default=60.0,
+                        help="Seconds after which slow startup is reported (the supervisor keeps waiting)")
+    args = parser.parse_args()
+
+    run_servers(
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        frontend_port=args.frontend_port,
+        frontend=not args.backend_only,
+        ready_timeout=args.ready_timeout
+    )
+
 
 if __name__ == "__main__":
-    run_servers()
\ No newline at end of file
+    main()
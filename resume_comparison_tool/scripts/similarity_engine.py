@@ -0,0 +1,517 @@
+import re
+import zlib
+import bisect
+from collections import Counter, OrderedDict
+from difflib import SequenceMatcher
+import numpy as np
+from scipy import sparse
+
+SIMILARITY_BACKENDS = ('sequence', 'tfidf')
+
+_WORD_RE = re.compile(r"\w+")
+
+# Mersenne prime 2^31 - 1: a * hash + b stays below 2^64 for 32-bit shingle hashes
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def calculate_similarity(text1, text2):
+    """Calculate similarity ratio between two texts"""
+    return SequenceMatcher(None, text1, text2).ratio()
+
+
+def estimate_jaccard_threshold(similarity_threshold, shingle_size):
+    """
+    Map a SequenceMatcher ratio threshold to a conservative shingle Jaccard threshold.
+
+    Assumes the differing characters are scattered single edits, each of
+    which breaks up to `shingle_size` shingles (the worst case for Jaccard).
+    """
+    intact = max(0.0, 1.0 - shingle_size * (1.0 - similarity_threshold))
+    return max(0.05, intact / (2.0 - intact))
+
+
+# With fewer rows per band too many pairs collide in some band (the
+# conservative Jaccard floor is <= 0.6 for thresholds <= 0.95): banding removes
+# only about a quarter of the pairs inside the length window, which costs more
+# in signatures than it saves in the length / quick_ratio cascade
+LSH_MIN_ROWS = 4
+
+
+def choose_lsh_bands(jaccard_threshold, num_perm, min_recall=0.99):
+    """
+    Pick (bands, rows) for LSH banding.
+
+    Uses the most rows per band (fewest false positives) for which a pair at
+    `jaccard_threshold` still becomes a candidate with probability >= min_recall.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        recall = 1.0 - (1.0 - jaccard_threshold ** rows) ** bands
+        if recall >= min_recall:
+            best = (bands, rows)
+        else:
+            break
+    return best
+
+
+def lsh_parameters(similarity_threshold, num_perm=128, shingle_size=5, jaccard_threshold=None):
+    """(bands, rows) of the LSH banding used for a SequenceMatcher threshold"""
+    if jaccard_threshold is None:
+        jaccard_threshold = estimate_jaccard_threshold(similarity_threshold, shingle_size)
+    return choose_lsh_bands(jaccard_threshold, num_perm)
+
+
+class MinHasher:
+    """Character shingling + MinHash signatures (vectorised with NumPy)"""
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+    def shingles(self, text):
+        """Set of character shingles of a whitespace-normalised, lowercased text"""
+        text = " ".join(text.lower().split())
+        k = self.shingle_size
+        if len(text) <= k:
+            return {text} if text else set()
+        return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+    def signature(self, text):
+        """MinHash signature (uint32 array of length num_perm) of a text"""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in self.shingles(text)),
+            dtype=np.uint64
+        )
+        if hashes.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        # (num_perm, num_shingles) matrix of permuted hashes, minimum per permutation
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing over MinHash signatures"""
+
+    def __init__(self, bands, rows):
+        self.bands = bands
+        self.rows = rows
+        self.buckets = {}
+
+    def band_keys(self, signature):
+        """Hashable (band, bytes) keys for each band of a signature"""
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, key, signature):
+        for band_key in self.band_keys(signature):
+            self.buckets.setdefault(band_key, []).append(key)
+
+    def query(self, signature):
+        """Keys sharing at least one band with the signature"""
+        found = set()
+        for band_key in self.band_keys(signature):
+            found.update(self.buckets.get(band_key, ()))
+        return found
+
+    def candidate_pairs(self):
+        """All (i, j) key pairs, i < j, that share at least one band bucket"""
+        pairs = set()
+        for members in self.buckets.values():
+            if len(members) < 2:
+                continue
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    a, b = members[x], members[y]
+                    pairs.add((a, b) if a < b else (b, a))
+        return pairs
+
+
+def generate_candidate_pairs(texts, similarity_threshold, num_perm=128, shingle_size=5,
+                             jaccard_threshold=None):
+    """
+    Candidate (i, j) index pairs that may reach similarity_threshold.
+
+    Texts are shingled and MinHashed, and LSH banding tuned to the Jaccard
+    equivalent of the threshold keeps only pairs that collide in some band.
+    This is a recall-oriented filter; survivors still need the exact check.
+    """
+    bands, rows = lsh_parameters(similarity_threshold, num_perm, shingle_size, jaccard_threshold)
+
+    hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+    index = LSHIndex(bands, rows)
+    for i, text in enumerate(texts):
+        if text:
+            index.add(i, hasher.signature(text))
+    return index.candidate_pairs()
+
+
+def stream_candidate_pairs(texts, similarity_threshold, num_perm=128, shingle_size=5,
+                           jaccard_threshold=None):
+    """
+    Candidates of generate_candidate_pairs that also pass the length bound of
+    length_window_pairs, without materialising the pair set.
+
+    Only the MinHash signatures and, per band, a sorted array of 64-bit band
+    hashes stay in memory; the pairs of each text j are produced on demand.
+    Returns (number of candidate pairs, iterator of (i, j) ordered by j then i).
+    """
+    bands, rows = lsh_parameters(similarity_threshold, num_perm, shingle_size, jaccard_threshold)
+
+    hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+    lengths = text_lengths(texts)
+    keys = np.array([i for i, length in enumerate(lengths) if length], dtype=np.int64)
+    key_lengths = np.array([lengths[i] for i in keys.tolist()], dtype=np.float64)
+    factor = length_factor(similarity_threshold)
+    signatures = np.empty((len(keys), num_perm), dtype=np.uint32)
+    for row, i in enumerate(keys.tolist()):
+        signatures[row] = hasher.signature(texts[i])
+
+    # Per band: positions sorted by band hash, and each position's [start, end) group in that order
+    orders, starts, ends = [], [], []
+    for band in range(bands):
+        band_hash = np.zeros(len(keys), dtype=np.uint64)
+        for column in range(band * rows, (band + 1) * rows):
+            band_hash = band_hash * np.uint64(1000003) ^ signatures[:, column].astype(np.uint64)
+        order = np.argsort(band_hash, kind='stable')
+        sorted_hash = band_hash[order]
+        orders.append(order.astype(np.int32))
+        starts.append(np.searchsorted(sorted_hash, band_hash, side='left').astype(np.int32))
+        ends.append(np.searchsorted(sorted_hash, band_hash, side='right').astype(np.int32))
+    del signatures
+    starts, ends = np.stack(starts, axis=1), np.stack(ends, axis=1)
+    shared = np.flatnonzero((ends - starts > 1).any(axis=1))
+
+    def earlier_neighbours(position):
+        found = set()
+        for band in np.flatnonzero(ends[position] - starts[position] > 1).tolist():
+            group = orders[band][starts[position, band]:ends[position, band]]
+            group = group[group < position]
+            # Same bound as length_window_pairs: the longer text is at most factor times the shorter
+            shorter = np.minimum(key_lengths[group], key_lengths[position])
+            longer = np.maximum(key_lengths[group], key_lengths[position])
+            found.update(group[longer <= shorter * factor].tolist())
+        return sorted(found)
+
+    count = sum(len(earlier_neighbours(position)) for position in shared.tolist())
+
+    def pairs():
+        for position in shared.tolist():
+            j = int(keys[position])
+            for neighbour in earlier_neighbours(position):
+                yield int(keys[neighbour]), j
+
+    return count, pairs()
+
+
+def hashed_features(text, n_features=2 ** 20):
+    """Hashed feature ids of a text's word unigrams and bigrams (one entry per occurrence)"""
+    tokens = _WORD_RE.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return [zlib.crc32(f.encode('utf-8')) % n_features for f in features]
+
+
+def build_tfidf_matrix(texts, n_features=2 ** 20, max_df=0.5, max_df_min_texts=1000):
+    """
+    Hashed TF-IDF matrix (one L2-normalised row per text) over word unigrams and bigrams.
+
+    Features are hashed into n_features columns, so no vocabulary has to be
+    kept; tf is sublinear (1 + log tf) and idf is smoothed. In batches of at
+    least max_df_min_texts texts, features found in more than max_df of the
+    texts are dropped: their idf is near zero, but they would make every
+    pair's product non-zero.
+    """
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        features = hashed_features(text, n_features)
+        rows.extend([row] * len(features))
+        cols.extend(features)
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(texts), n_features)
+    )
+    counts.sum_duplicates()
+
+    # Sublinear tf, smoothed idf
+    counts.data = 1.0 + np.log(counts.data)
+    doc_freq = np.bincount(counts.indices, minlength=n_features)
+    idf = np.log((1.0 + len(texts)) / (1.0 + doc_freq)) + 1.0
+    if len(texts) >= max_df_min_texts:
+        idf[doc_freq > max_df * len(texts)] = 0.0
+    tfidf = counts.multiply(idf.astype(np.float32)).tocsr()
+    tfidf.eliminate_zeros()
+
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(tfidf).tocsr()
+
+
+def tfidf_similar_pairs(texts, similarity_threshold, top_k=None, block_size=1024):
+    """
+    (i, j, cosine) triples with i < j and cosine >= similarity_threshold.
+
+    Cosine similarities are computed block by block (block_size rows of the
+    TF-IDF matrix against the whole matrix) so memory stays bounded. With
+    top_k, only each text's top_k most similar neighbours are kept.
+    """
+    matrix = build_tfidf_matrix(texts)
+    matrix_t = matrix.T.tocsr()
+    found = {}
+
+    for start in range(0, matrix.shape[0], block_size):
+        block = matrix[start:start + block_size].dot(matrix_t).tocoo()
+        rows = block.row + start
+        keep = (block.data >= similarity_threshold) & (rows != block.col)
+        rows, cols, values = rows[keep], block.col[keep], block.data[keep]
+
+        if top_k is not None:
+            order = np.lexsort((-values, rows))
+            rows, cols, values = rows[order], cols[order], values[order]
+            rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+            keep = rank < top_k
+            rows, cols, values = rows[keep], cols[keep], values[keep]
+
+        for i, j, value in zip(rows.tolist(), cols.tolist(), values.tolist()):
+            found[(min(i, j), max(i, j))] = min(value, 1.0)
+
+    return [(i, j, found[(i, j)]) for i, j in sorted(found)]
+
+
+def text_lengths(texts):
+    """Character length of each text; out-of-core stores provide these without reading the texts"""
+    lengths = getattr(texts, 'lengths', None)
+    return lengths if lengths is not None else [len(text) for text in texts]
+
+
+def length_factor(similarity_threshold):
+    """
+    Largest length ratio (longer / shorter) of two texts that can still reach
+    similarity_threshold, since 2 * min(len) / (len1 + len2) >= threshold
+    """
+    if similarity_threshold <= 0:
+        return float('inf')
+    # Slightly loose; the exact bound is re-checked pair by pair
+    return (2.0 - similarity_threshold) / similarity_threshold * (1 + 1e-9)
+
+
+def length_window_pairs(texts, similarity_threshold):
+    """
+    Pairs (i, j), i < j, of non-empty texts that pass the length bound.
+
+    2 * min(len) / (len1 + len2) is an upper bound of the SequenceMatcher
+    ratio (it is real_quick_ratio), so after sorting by length each text only
+    needs pairing with the next texts up to len * (2 - t) / t. Returns
+    (pair generator, number of pairs skipped by the bound).
+    """
+    text_length = text_lengths(texts)
+    order = sorted((i for i, length in enumerate(text_length) if length), key=lambda i: text_length[i])
+    lengths = [text_length[i] for i in order]
+    factor = length_factor(similarity_threshold)
+    ends = [bisect.bisect_right(lengths, length * factor, lo=p + 1) for p, length in enumerate(lengths)]
+
+    total = len(order) * (len(order) - 1) // 2
+    in_window = sum(end - p - 1 for p, end in enumerate(ends))
+
+    def pairs():
+        for p, end in enumerate(ends):
+            a = order[p]
+            for q in range(p + 1, end):
+                b = order[q]
+                yield (a, b) if a < b else (b, a)
+
+    return pairs(), total - in_window
+
+
+class SimilarityCascade:
+    """
+    Threshold-aware SequenceMatcher ratio with cheap rejection stages.
+
+    Stages, cheapest first:
+      1. length: 2 * min(len) / total length (this is real_quick_ratio)
+      2. quick_ratio: character multiset overlap from precomputed counts
+      3. ngram_jaccard: character n-gram Jaccard floor (off unless ngram_jaccard_floor is set)
+      4. full_ratio: SequenceMatcher.ratio() on the survivors
+    Stages 1 and 2 are upper bounds of ratio(), so with the default settings
+    the result is identical to running ratio() on every pair. Stage 3 is a
+    heuristic and can drop true matches, hence it is opt-in.
+
+    With max_cached_texts, at most that many per-text character counts and
+    n-gram sets are kept (least recently used are dropped), so memory does
+    not grow with the number of texts.
+    """
+
+    STAGES = ('length', 'quick_ratio', 'ngram_jaccard', 'full_ratio')
+
+    def __init__(self, texts, similarity_threshold, ngram_size=3, ngram_jaccard_floor=None,
+                 max_cached_texts=None):
+        self.texts = texts
+        self.lengths = text_lengths(texts)
+        self.threshold = similarity_threshold
+        self.ngram_size = ngram_size
+        self.ngram_jaccard_floor = ngram_jaccard_floor
+        self.max_cached_texts = max_cached_texts
+        self.rejected = {stage: 0 for stage in self.STAGES[:-1]}
+        self.full_ratio_count = 0
+        self._char_counts = OrderedDict()
+        self._ngrams = OrderedDict()
+        self._matcher = SequenceMatcher(None)
+
+    def _cached(self, cache, i, build):
+        if i in cache:
+            cache.move_to_end(i)
+            return cache[i]
+        cache[i] = value = build(self.texts[i])
+        if self.max_cached_texts is not None and len(cache) > self.max_cached_texts:
+            cache.popitem(last=False)
+        return value
+
+    def _counts(self, i):
+        return self._cached(self._char_counts, i, Counter)
+
+    def _ngram_set(self, i):
+        k = self.ngram_size
+        return self._cached(self._ngrams, i, lambda text: {text[p:p + k] for p in range(max(1, len(text) - k + 1))})
+
+    def similarity(self, i, j):
+        """SequenceMatcher(None, texts[i], texts[j]).ratio(), or None if a stage rejects the pair"""
+        length1, length2 = self.lengths[i], self.lengths[j]
+        total_length = length1 + length2
+
+        # Decided from the lengths alone, before any text is read
+        if 2.0 * min(length1, length2) / total_length < self.threshold:
+            self.rejected['length'] += 1
+            return None
+
+        counts1, counts2 = self._counts(i), self._counts(j)
+        if len(counts1) > len(counts2):
+            counts1, counts2 = counts2, counts1
+        overlap = sum(min(n, counts2[c]) for c, n in counts1.items() if c in counts2)
+        if 2.0 * overlap / total_length < self.threshold:
+            self.rejected['quick_ratio'] += 1
+            return None
+
+        if self.ngram_jaccard_floor is not None:
+            ngrams1, ngrams2 = self._ngram_set(i), self._ngram_set(j)
+            jaccard = len(ngrams1 & ngrams2) / len(ngrams1 | ngrams2)
+            if jaccard < self.ngram_jaccard_floor:
+                self.rejected['ngram_jaccard'] += 1
+                return None
+
+        # set_seq2 is a no-op when text2 is the same object as last time,
+        # so consecutive pairs sharing j reuse the analysed second sequence
+        self._matcher.set_seq2(self.texts[j])
+        self._matcher.set_seq1(self.texts[i])
+        self.full_ratio_count += 1
+        return self._matcher.ratio()
+
+    def stats(self):
+        return {'rejected': dict(self.rejected), 'full_ratio': self.full_ratio_count}
+
+
+def find_similar_pairs(names, texts, similarity_threshold, use_lsh=True, backend='sequence',
+                       top_k=None, ngram_jaccard_floor=None, progress_callback=None,
+                       progress_every=1000, max_cached_texts=None):
+    """
+    Find pairs of texts whose similarity is >= similarity_threshold.
+
+    backend 'sequence' uses the SequenceMatcher ratio (on MinHash LSH
+    candidates when use_lsh is set and the threshold allows at least
+    LSH_MIN_ROWS rows per band; otherwise on every pair that passes the
+    length bound), evaluated through a SimilarityCascade
+    that rejects pairs which provably cannot reach the threshold before the
+    full ratio() runs; backend 'tfidf' uses cosine similarity
+    of hashed TF-IDF vectors computed with sparse matrix products, optionally
+    limited to each text's top_k neighbours.
+
+    progress_callback(done, total), if given, is called every progress_every
+    pairs with the number of pairs compared so far; it may raise to abort.
+
+    texts may be any indexable sequence, such as a DiskTextStore; texts are
+    then read on demand and max_cached_texts bounds the per-text data the
+    cascade keeps, so memory depends on the signatures, not the corpus size.
+
+    Returns (similar_pairs, stats). similar_pairs is a list of dicts with
+    file1, file2 and similarity (0-1), ordered like the brute-force i < j loop.
+    stats reports total_pairs, candidate_pairs (pairs actually compared) and
+    skipped_by_length (pairs the length window excluded without comparing,
+    the same with or without LSH); skipped_by_lsh counts the pairs inside the
+    window that LSH ruled out, and lsh_skipped is set when use_lsh was
+    ignored for this threshold.
+    """
+    if backend not in SIMILARITY_BACKENDS:
+        raise ValueError(f"Unknown similarity backend: {backend}")
+
+    n = len(texts)
+    total_pairs = n * (n - 1) // 2
+    lengths = text_lengths(texts)
+
+    if backend == 'tfidf':
+        if progress_callback:
+            progress_callback(0, total_pairs)
+        similar_pairs = [
+            {'file1': names[i], 'file2': names[j], 'similarity': similarity}
+            for i, j, similarity in tfidf_similar_pairs(texts, similarity_threshold, top_k=top_k)
+            if lengths[i] and lengths[j]
+        ]
+        stats = {'total_pairs': total_pairs, 'candidate_pairs': total_pairs, 'method': 'tfidf_cosine'}
+        if progress_callback:
+            progress_callback(total_pairs, total_pairs)
+        return similar_pairs, stats
+
+    cascade = SimilarityCascade(texts, similarity_threshold, ngram_jaccard_floor=ngram_jaccard_floor,
+                                max_cached_texts=max_cached_texts)
+
+    lsh_skipped = use_lsh and lsh_parameters(similarity_threshold)[1] < LSH_MIN_ROWS
+    if lsh_skipped:
+        use_lsh = False
+
+    # The length bound applies to both methods, so skipped_by_length means the same in either
+    candidates, skipped_by_length = length_window_pairs(texts, similarity_threshold)
+    non_empty = sum(1 for length in lengths if length)
+    expected = in_window = non_empty * (non_empty - 1) // 2 - skipped_by_length
+    if use_lsh:
+        # Grouped by second text so the cascade can reuse its SequenceMatcher analysis
+        expected, candidates = stream_candidate_pairs(texts, similarity_threshold)
+
+    found = []
+    candidate_count = 0
+    done = 0
+    for i, j in candidates:
+        if progress_callback and done % progress_every == 0:
+            progress_callback(done, expected)
+        done += 1
+
+        # Skip if both texts are empty
+        if not lengths[i] or not lengths[j]:
+            continue
+
+        candidate_count += 1
+        similarity = cascade.similarity(i, j)
+        if similarity is not None and similarity >= similarity_threshold:
+            found.append((i, j, similarity))
+
+    if progress_callback:
+        progress_callback(done, expected)
+
+    similar_pairs = [
+        {'file1': names[i], 'file2': names[j], 'similarity': similarity}
+        for i, j, similarity in sorted(found)
+    ]
+    stats = {
+        'total_pairs': total_pairs,
+        'candidate_pairs': candidate_count,
+        'skipped_by_length': skipped_by_length,
+        'method': 'minhash_lsh' if use_lsh else 'all_pairs',
+        'cascade': cascade.stats()
+    }
+    if use_lsh:
+        stats['skipped_by_lsh'] = in_window - expected
+    if lsh_skipped:
+        stats['lsh_skipped'] = True
+    return similar_pairs, stats
@@ -2,17 +2,8 @@ import streamlit as st
 import requests
 from typing import List
 import time
-from datetime import datetime
-import json
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-import io
+import hashlib
+import os
 
 # Page configuration
 st.set_page_config(
@@ -109,7 +100,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # API Configuration
-API_URL = "http://localhost:8000"
+API_URL = os.getenv("RESUME_API_URL", "http://localhost:8000")
 
 def check_api_health():
     """Check if the API is running"""
@@ -119,224 +110,155 @@ def check_api_health():
     except:
         return False
 
-def compare_resumes_api(files: List, threshold: float):
-    """Call the FastAPI backend to compare resumes"""
+def api_error_message(response):
+    """Extract the error detail from an API error response"""
     try:
-        files_data = []
-        for uploaded_file in files:
+        return f"Error: {response.json().get('detail', 'Unknown error')}"
+    except ValueError:
+        return f"Error: HTTP {response.status_code}"
+
+def file_hash(uploaded_file):
+    """MD5 of an uploaded file's bytes (the server identifies stored uploads by it)"""
+    return hashlib.md5(uploaded_file.getvalue()).hexdigest()
+
+def upload_missing_files_api(files: List):
+    """
+    Send only the files the backend has not stored yet.
+    
+    Returns the (name, hash) reference of every file.
+    """
+    refs = [(uploaded_file.name, file_hash(uploaded_file)) for uploaded_file in files]
+    response = requests.post(
+        f"{API_URL}/uploads/check",
+        json={"hashes": [h for _, h in refs]},
+        timeout=30
+    )
+    if response.status_code != 200:
+        raise RuntimeError(api_error_message(response))
+    
+    missing = set(response.json()['missing'])
+    files_data = []
+    for uploaded_file, (_, h) in zip(files, refs):
+        if h in missing:
+            missing.discard(h)
             files_data.append(
                 ('files', (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type))
             )
-        
+    
+    if files_data:
+        response = requests.post(f"{API_URL}/uploads", files=files_data, timeout=120)
+        if response.status_code != 200:
+            raise RuntimeError(api_error_message(response))
+    return refs
+
+def submit_comparison_job_api(files: List, threshold: float):
+    """Submit a background comparison job, uploading only files the backend has not seen"""
+    try:
+        refs = upload_missing_files_api(files)
         response = requests.post(
-            f"{API_URL}/compare-resumes",
-            files=files_data,
-            params={"similarity_threshold": threshold}
+            f"{API_URL}/jobs/by-hash",
+            json={"files": [{"name": name, "hash": h} for name, h in refs]},
+            params={"similarity_threshold": threshold},
+            timeout=30
         )
         
-        if response.status_code == 200:
-            return response.json(), None
+        if response.status_code == 202:
+            return response.json()['job_id'], None
         else:
-            return None, f"Error: {response.json().get('detail', 'Unknown error')}"
+            return None, api_error_message(response)
     except requests.exceptions.ConnectionError:
         return None, "Cannot connect to API. Please ensure the FastAPI backend is running."
+    except RuntimeError as e:
+        return None, str(e)
     except Exception as e:
         return None, f"Error: {str(e)}"
 
-def generate_txt_report(result):
-    """Generate TXT report"""
-    report = []
-    report.append("=" * 80)
-    report.append("RESUME COMPARISON REPORT")
-    report.append("=" * 80)
-    report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append("")
-    
-    # Summary
-    summary = result['summary']
-    report.append("SUMMARY")
-    report.append("-" * 80)
-    report.append(f"Total Files Analyzed: {summary['total_files']}")
-    report.append(f"Unique Files: {summary['unique_files']}")
-    report.append(f"Exact Duplicate Groups: {summary['exact_duplicate_groups']}")
-    report.append(f"Similar Pairs Found: {summary['similar_pairs_found']}")
-    report.append(f"Similarity Threshold: {summary['similarity_threshold']}%")
-    report.append("")
-    
-    # Exact Duplicates
-    report.append("EXACT DUPLICATES")
-    report.append("-" * 80)
-    if result['exact_duplicates']:
-        for i, group in enumerate(result['exact_duplicates'], 1):
-            report.append(f"\nDuplicate Group {i}:")
-            for file in group:
-                report.append(f"  - {file}")
-    else:
-        report.append("No exact duplicates found.")
-    report.append("")
-    
-    # Similar Pairs
-    report.append("SIMILAR RESUMES")
-    report.append("-" * 80)
-    if result['similar_pairs']:
-        for pair in result['similar_pairs']:
-            report.append(f"\nSimilarity: {pair['similarity']}%")
-            report.append(f"  File 1: {pair['file1']}")
-            report.append(f"  File 2: {pair['file2']}")
-    else:
-        report.append(f"No similar resumes found above {summary['similarity_threshold']}% threshold.")
-    
-    report.append("")
-    report.append("=" * 80)
-    report.append("END OF REPORT")
-    report.append("=" * 80)
-    
-    return "\n".join(report)
+def get_job_status_api(job_id: str):
+    """Fetch the status and progress of a comparison job"""
+    try:
+        response = requests.get(f"{API_URL}/jobs/{job_id}", timeout=5)
+        if response.status_code == 200:
+            return response.json(), None
+        return None, api_error_message(response)
+    except requests.exceptions.RequestException as e:
+        return None, f"Error: {str(e)}"
 
-def generate_docx_report(result):
-    """Generate DOCX report"""
-    doc = Document()
-    
-    # Title
-    title = doc.add_heading('Resume Comparison Report', 0)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    # Timestamp
-    doc.add_paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    doc.add_paragraph()
-    
-    # Summary Section
-    doc.add_heading('Summary', level=1)
-    summary = result['summary']
-    summary_table = doc.add_table(rows=5, cols=2)
-    summary_table.style = 'Light Grid Accent 1'
-    
-    summary_data = [
-        ('Total Files Analyzed', str(summary['total_files'])),
-        ('Unique Files', str(summary['unique_files'])),
-        ('Exact Duplicate Groups', str(summary['exact_duplicate_groups'])),
-        ('Similar Pairs Found', str(summary['similar_pairs_found'])),
-        ('Similarity Threshold', f"{summary['similarity_threshold']}%")
-    ]
-    
-    for i, (key, value) in enumerate(summary_data):
-        summary_table.rows[i].cells[0].text = key
-        summary_table.rows[i].cells[1].text = value
-    
-    doc.add_paragraph()
-    
-    # Exact Duplicates
-    doc.add_heading('Exact Duplicates', level=1)
-    if result['exact_duplicates']:
-        for i, group in enumerate(result['exact_duplicates'], 1):
-            doc.add_heading(f'Duplicate Group {i}', level=2)
-            for file in group:
-                doc.add_paragraph(file, style='List Bullet')
-    else:
-        doc.add_paragraph('✓ No exact duplicates found.')
-    
-    doc.add_paragraph()
-    
-    # Similar Resumes
-    doc.add_heading('Similar Resumes', level=1)
-    if result['similar_pairs']:
-        for pair in result['similar_pairs']:
-            p = doc.add_paragraph()
-            p.add_run(f"Similarity: {pair['similarity']}%\n").bold = True
-            p.add_run(f"File 1: {pair['file1']}\n")
-            p.add_run(f"File 2: {pair['file2']}")
-            doc.add_paragraph()
-    else:
-        doc.add_paragraph(f"✓ No similar resumes found above {summary['similarity_threshold']}% threshold.")
-    
-    # Save to bytes
-    file_stream = io.BytesIO()
-    doc.save(file_stream)
-    file_stream.seek(0)
-    return file_stream.getvalue()
+def get_job_result_api(job_id: str):
+    """Fetch the result of a completed comparison job"""
+    try:
+        response = requests.get(f"{API_URL}/jobs/{job_id}/result", timeout=30)
+        if response.status_code == 200:
+            return response.json(), None
+        return None, api_error_message(response)
+    except requests.exceptions.RequestException as e:
+        return None, f"Error: {str(e)}"
 
-def generate_pdf_report(result):
-    """Generate PDF report"""
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    story = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1f77b4'),
-        spaceAfter=30,
-        alignment=1  # Center
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#2ca02c'),
-        spaceAfter=12
-    )
-    
-    # Title
-    story.append(Paragraph("Resume Comparison Report", title_style))
-    story.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Summary
-    story.append(Paragraph("Summary", heading_style))
-    summary = result['summary']
-    summary_data = [
-        ['Metric', 'Value'],
-        ['Total Files Analyzed', str(summary['total_files'])],
-        ['Unique Files', str(summary['unique_files'])],
-        ['Exact Duplicate Groups', str(summary['exact_duplicate_groups'])],
-        ['Similar Pairs Found', str(summary['similar_pairs_found'])],
-        ['Similarity Threshold', f"{summary['similarity_threshold']}%"]
-    ]
-    
-    summary_table = Table(summary_data, colWidths=[3.5*inch, 2*inch])
-    summary_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(summary_table)
-    story.append(Spacer(1, 0.3*inch))
-    
-    # Exact Duplicates
-    story.append(Paragraph("Exact Duplicates", heading_style))
-    if result['exact_duplicates']:
-        for i, group in enumerate(result['exact_duplicates'], 1):
-            story.append(Paragraph(f"<b>Duplicate Group {i}:</b>", styles['Normal']))
-            for file in group:
-                story.append(Paragraph(f"• {file}", styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-    else:
-        story.append(Paragraph("✓ No exact duplicates found.", styles['Normal']))
-    story.append(Spacer(1, 0.2*inch))
-    
-    # Similar Resumes
-    story.append(Paragraph("Similar Resumes", heading_style))
-    if result['similar_pairs']:
-        for pair in result['similar_pairs']:
-            story.append(Paragraph(f"<b>Similarity: {pair['similarity']}%</b>", styles['Normal']))
-            story.append(Paragraph(f"File 1: {pair['file1']}", styles['Normal']))
-            story.append(Paragraph(f"File 2: {pair['file2']}", styles['Normal']))
-            story.append(Spacer(1, 0.15*inch))
+def cancel_job_api(job_id: str):
+    """Ask the backend to cancel a comparison job"""
+    try:
+        requests.delete(f"{API_URL}/jobs/{job_id}", timeout=5)
+    except requests.exceptions.RequestException:
+        pass
+
+def describe_job_progress(job):
+    """Human-readable status line for a job"""
+    if job['status'] == 'queued':
+        return "⏳ Waiting for a free worker..."
+    if job['stage'] == 'parsing':
+        return f"📄 Reading files... ({job['files_done']}/{job['files_total']})"
+    if job['stage'] == 'comparing':
+        return f"📊 Calculating similarities... ({job['pairs_done']:,}/{job['pairs_total']:,} pairs)"
+    return "✅ Finalizing results..."
+
+def track_comparison_job(job_id: str):
+    """Show real job progress until the job finishes, with a cancel button"""
+    if st.button("✖ Cancel Comparison", use_container_width=True):
+        cancel_job_api(job_id)
+        st.session_state.job_id = None
+        st.warning("Comparison cancelled.")
+        return
+    
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    while True:
+        job, error = get_job_status_api(job_id)
+        if error:
+            break
+        progress_bar.progress(min(int(job['progress'] * 100), 100))
+        status_text.text(describe_job_progress(job))
+        if job['status'] in ('completed', 'failed', 'cancelled'):
+            break
+        time.sleep(0.5)
+    
+    progress_bar.empty()
+    status_text.empty()
+    st.session_state.job_id = None
+    
+    if error:
+        st.error(error)
+    elif job['status'] == 'completed':
+        result, error = get_job_result_api(job_id)
+        if error:
+            st.error(error)
+        else:
+            st.session_state.result = result
+            st.success("✅ Analysis complete! Check the Results tab.")
+            st.balloons()
+    elif job['status'] == 'failed':
+        st.error(f"Error: {job['error']}")
     else:
-        story.append(Paragraph(f"✓ No similar resumes found above {summary['similarity_threshold']}% threshold.", styles['Normal']))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
+        st.warning("Comparison cancelled.")
+
+def register_report_api(result):
+    """Store the result on the backend for report downloads; returns (report_id, error)"""
+    try:
+        response = requests.post(f"{API_URL}/reports", json=result, timeout=60)
+        if response.status_code == 200:
+            return response.json()['report_id'], None
+        return None, api_error_message(response)
+    except requests.exceptions.RequestException as e:
+        return None, f"Error: {str(e)}"
 
 def main():
     # Header
@@ -454,35 +376,15 @@ def main():
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 if st.button("🚀 Compare Resumes", type="primary", use_container_width=True):
-                    with st.spinner("🔄 Analyzing resumes..."):
-                        # Progress bar
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        
-                        for i in range(100):
-                            time.sleep(0.01)
-                            progress_bar.progress(i + 1)
-                            if i < 30:
-                                status_text.text("📄 Reading files...")
-                            elif i < 60:
-                                status_text.text("🔍 Detecting duplicates...")
-                            elif i < 90:
-                                status_text.text("📊 Calculating similarities...")
-                            else:
-                                status_text.text("✅ Finalizing results...")
-                        
-                        # Call API
-                        result, error = compare_resumes_api(uploaded_files, similarity_threshold / 100)
-                        
-                        progress_bar.empty()
-                        status_text.empty()
-                        
-                        if error:
-                            st.error(error)
-                        else:
-                            st.session_state.result = result
-                            st.success("✅ Analysis complete! Check the Results tab.")
-                            st.balloons()
+                    job_id, error = submit_comparison_job_api(uploaded_files, similarity_threshold / 100)
+                    if error:
+                        st.error(error)
+                    else:
+                        st.session_state.job_id = job_id
+                
+                # Keeps tracking across reruns until the job finishes or is cancelled
+                if st.session_state.get('job_id'):
+                    track_comparison_job(st.session_state.job_id)
         else:
             st.info("⚠️ Please upload at least 2 resume files to compare")
     
@@ -495,6 +397,20 @@ def main():
     with tab3:
         display_about()
 
+def fetch_report_api(report_id: str, report_format: str):
+    """Download a report from the backend; returns (content bytes, mime type, error)"""
+    try:
+        response = requests.get(
+            f"{API_URL}/reports/{report_id}",
+            params={"format": report_format},
+            timeout=120
+        )
+        if response.status_code == 200:
+            return response.content, response.headers.get('content-type', 'application/octet-stream'), None
+        return None, None, api_error_message(response)
+    except requests.exceptions.RequestException as e:
+        return None, None, f"Error: {str(e)}"
+
 def display_results(result):
     """Display comparison results"""
     st.header("📊 Comparison Results")
@@ -514,51 +430,40 @@ def display_results(result):
     
     st.markdown("---")
     
-    # Download buttons
+    # Download buttons: reports are generated, streamed and cached by the backend
     st.subheader("📥 Download Report")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    with col1:
-        json_data = json.dumps(result, indent=2)
-        st.download_button(
-            label="📄 JSON",
-            data=json_data,
-            file_name=f"resume_report_{timestamp}.json",
-            mime="application/json",
-            use_container_width=True
-        )
-    
-    with col2:
-        txt_data = generate_txt_report(result)
-        st.download_button(
-            label="📝 TXT",
-            data=txt_data,
-            file_name=f"resume_report_{timestamp}.txt",
-            mime="text/plain",
-            use_container_width=True
-        )
-    
-    with col3:
-        docx_data = generate_docx_report(result)
-        st.download_button(
-            label="📘 DOCX",
-            data=docx_data,
-            file_name=f"resume_report_{timestamp}.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            use_container_width=True
-        )
-    
-    with col4:
-        pdf_data = generate_pdf_report(result)
-        st.download_button(
-            label="📕 PDF",
-            data=pdf_data,
-            file_name=f"resume_report_{timestamp}.pdf",
-            mime="application/pdf",
-            use_container_width=True
-        )
+    if st.session_state.get('report_result') is not result:
+        st.session_state.report_id, report_error = register_report_api(result)
+        st.session_state.report_result = result
+        st.session_state.report_files = {}
+        if report_error:
+            st.warning(f"Reports are unavailable: {report_error}")
+    
+    report_id = st.session_state.get('report_id')
+    if report_id:
+        # Reports are fetched by this server when first requested, so the
+        # browser only ever talks to Streamlit, wherever the API runs
+        report_files = st.session_state.report_files
+        formats = [("📄 JSON", "json"), ("📝 TXT", "txt"), ("📊 CSV", "csv"), ("📘 DOCX", "docx"), ("📕 PDF", "pdf")]
+        for col, (label, report_format) in zip(st.columns(len(formats)), formats):
+            with col:
+                if report_format in report_files:
+                    content, mime = report_files[report_format]
+                    st.download_button(
+                        label=f"⬇️ {label}",
+                        data=content,
+                        file_name=f"resume_report_{report_id[:12]}.{report_format}",
+                        mime=mime,
+                        use_container_width=True
+                    )
+                elif st.button(label, key=f"report_{report_format}", use_container_width=True):
+                    with st.spinner(f"Preparing {report_format.upper()} report..."):
+                        content, mime, error = fetch_report_api(report_id, report_format)
+                    if error:
+                        st.error(error)
+                    else:
+                        report_files[report_format] = (content, mime)
+                        st.rerun()
     
     st.markdown("---")
     
@@ -677,5 +582,7 @@ if __name__ == "__main__":
     # Initialize session state
     if 'result' not in st.session_state:
         st.session_state.result = None
+    if 'job_id' not in st.session_state:
+        st.session_state.job_id = None
     
     main()
\ No newline at end of file
@@ -0,0 +1,313 @@
+import io
+import os
+import hashlib
+import sqlite3
+import tempfile
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import PyPDF2
+import docx
+
+SUPPORTED_FORMATS = {'.pdf', '.docx', '.txt'}
+
+# App state (caches, jobs, corpus); RESUME_DATA_DIR overrides the default next to the scripts
+DATA_DIR = os.getenv("RESUME_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+
+
+def extract_text_from_pdf_bytes(file_content):
+    """Extract text from PDF bytes"""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text()
+    return text.strip()
+
+
+def extract_text_from_docx_bytes(file_content):
+    """Extract text from DOCX bytes"""
+    doc = docx.Document(io.BytesIO(file_content))
+    return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
+
+
+def extract_text_from_txt_bytes(file_content):
+    """Extract text from TXT bytes"""
+    return file_content.decode('utf-8').strip()
+
+
+def extract_text_from_bytes(file_name, file_content):
+    """Extract text from file bytes based on the file extension (raises on unreadable files)"""
+    suffix = os.path.splitext(file_name)[1].lower()
+    if suffix == '.pdf':
+        return extract_text_from_pdf_bytes(file_content)
+    if suffix == '.docx':
+        return extract_text_from_docx_bytes(file_content)
+    if suffix == '.txt':
+        return extract_text_from_txt_bytes(file_content)
+    raise ValueError(f"Unsupported file format: {suffix}")
+
+
+def get_content_hash(file_content):
+    """Calculate MD5 hash of file bytes for exact comparison"""
+    return hashlib.md5(file_content).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent cache of extracted text keyed by file content hash (SQLite).
+
+    Each entry records when it was last stored or asked for by missing(), so
+    evict() can drop entries nobody has used for a while.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extracted_text ("
+                "hash TEXT PRIMARY KEY, text TEXT NOT NULL, used_at REAL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(extracted_text)")}
+            if 'used_at' not in columns:
+                try:
+                    conn.execute("ALTER TABLE extracted_text ADD COLUMN used_at REAL")
+                except sqlite3.OperationalError:
+                    # Another process added it first
+                    pass
+                # Existing entries start their eviction clock now
+                conn.execute("UPDATE extracted_text SET used_at = ? WHERE used_at IS NULL", (time.time(),))
+            conn.execute("CREATE INDEX IF NOT EXISTS extracted_text_used_at ON extracted_text (used_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, file_hash):
+        """Return cached text for a hash, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT text FROM extracted_text WHERE hash = ?", (file_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, file_hashes):
+        """Return a dict of hash -> text for the hashes that are cached"""
+        file_hashes = list(file_hashes)
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(file_hashes), 900):
+                chunk = file_hashes[start:start + 900]
+                found.update(conn.execute(
+                    f"SELECT hash, text FROM extracted_text WHERE hash IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall())
+        return found
+
+    def missing(self, file_hashes):
+        """Hashes (in input order, without repeats) that are not cached; the cached ones are marked as used"""
+        file_hashes = list(dict.fromkeys(file_hashes))
+        known = set()
+        now = time.time()
+        with self._connect() as conn:
+            for start in range(0, len(file_hashes), 900):
+                chunk = file_hashes[start:start + 900]
+                placeholders = ','.join('?' * len(chunk))
+                known.update(row[0] for row in conn.execute(
+                    f"SELECT hash FROM extracted_text WHERE hash IN ({placeholders})", chunk
+                ))
+                conn.execute(f"UPDATE extracted_text SET used_at = ? WHERE hash IN ({placeholders})", (now, *chunk))
+        return [file_hash for file_hash in file_hashes if file_hash not in known]
+
+    def put_many(self, items):
+        """Store (hash, text) pairs"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO extracted_text (hash, text, used_at) VALUES (?, ?, ?)",
+                [(file_hash, text, now) for file_hash, text in items]
+            )
+
+    def evict(self, max_age_seconds=None, max_entries=None):
+        """
+        Delete entries unused for more than max_age_seconds, then the least
+        recently used ones beyond max_entries; returns how many were deleted.
+        """
+        deleted = 0
+        with self._connect() as conn:
+            if max_age_seconds is not None:
+                deleted += conn.execute(
+                    "DELETE FROM extracted_text WHERE used_at < ?", (time.time() - max_age_seconds,)
+                ).rowcount
+            if max_entries is not None:
+                deleted += conn.execute(
+                    "DELETE FROM extracted_text WHERE hash IN ("
+                    "SELECT hash FROM extracted_text ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (max_entries,)
+                ).rowcount
+        return deleted
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM extracted_text").fetchone()[0]
+
+
+class DiskTextStore:
+    """
+    Append-only on-disk list of texts for out-of-core comparisons.
+
+    Texts are written UTF-8 encoded to a uniquely named temporary file in
+    directory (the system temp folder by default), so concurrent runs never
+    share one; only their byte offsets and character lengths stay in memory
+    (16 bytes per text). Reading a text seeks into the file; the most
+    recently read cache_size texts are kept.
+    """
+
+    def __init__(self, directory=None, cache_size=64):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=directory, prefix='resume_texts-', suffix='.spill')
+        self.path = self._file.name
+        self._offsets = array('q', [0])
+        self.lengths = array('q')
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def append(self, text):
+        """Write a text to the end of the store and return its index"""
+        data = text.encode('utf-8')
+        self._file.seek(self._offsets[-1])
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        self.lengths.append(len(text))
+        return len(self.lengths) - 1
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if index in self._cache:
+            self._cache.move_to_end(index)
+            return self._cache[index]
+
+        self._file.seek(self._offsets[index])
+        text = self._file.read(self._offsets[index + 1] - self._offsets[index]).decode('utf-8')
+        self._cache[index] = text
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def select(self, indices):
+        """Read-only view of the texts at the given indices, in that order"""
+        return TextStoreView(self, indices)
+
+    def close(self):
+        """Close and delete the spill file"""
+        self._file.close()
+
+
+class TextStoreView:
+    """Subset of a DiskTextStore, indexed 0..n-1"""
+
+    def __init__(self, store, indices):
+        self.store = store
+        self.indices = array('q', indices)
+        self.lengths = array('q', (store.lengths[i] for i in self.indices))
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        return self.store[self.indices[index]]
+
+    def __iter__(self):
+        for index in self.indices:
+            yield self.store[index]
+
+
+# Per-process cache handle, opened once by the pool initializer
+_worker_cache = None
+
+
+def _init_worker(cache_path):
+    global _worker_cache
+    _worker_cache = ExtractionCache(cache_path) if cache_path else None
+
+
+def extract_file(file_path):
+    """
+    Read a file once, hash those bytes and extract its text.
+
+    Returns a dict with path, hash, text, cached (text came from the cache)
+    and error (message if the file could not be read or parsed).
+    """
+    result = {'path': str(file_path), 'hash': None, 'text': "", 'cached': False, 'error': None}
+    try:
+        with open(file_path, 'rb') as f:
+            file_content = f.read()
+    except Exception as e:
+        result['error'] = f"Error reading file {file_path}: {e}"
+        return result
+
+    result['hash'] = get_content_hash(file_content)
+
+    if _worker_cache is not None:
+        cached_text = _worker_cache.get(result['hash'])
+        if cached_text is not None:
+            result['text'] = cached_text
+            result['cached'] = True
+            return result
+
+    try:
+        result['text'] = extract_text_from_bytes(str(file_path), file_content)
+    except Exception as e:
+        result['error'] = f"Error extracting text from {file_path}: {e}"
+    return result
+
+
+def extract_files(file_paths, workers=None, cache_path=None, chunksize=16):
+    """
+    Extract text from many files in a process pool.
+
+    Files whose hash is already in the cache at cache_path are not parsed
+    again; newly parsed texts are written back to the cache. Yields the
+    extract_file() result for each path, in input order.
+    """
+    file_paths = list(file_paths)
+    cache = ExtractionCache(cache_path) if cache_path else None
+
+    if workers == 1:
+        _init_worker(cache_path)
+        results = map(extract_file, file_paths)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(cache_path,)
+        )
+        results = executor.map(extract_file, file_paths, chunksize=chunksize)
+
+    pending = []
+    try:
+        for result in results:
+            if cache is not None and not result['cached'] and result['error'] is None:
+                pending.append((result['hash'], result['text']))
+                if len(pending) >= 500:
+                    cache.put_many(pending)
+                    pending = []
+            yield result
+    finally:
+        if cache is not None and pending:
+            cache.put_many(pending)
+        if executor is not None:
+            executor.shutdown()